@@ -0,0 +1,96 @@
+"""Taxas de falta por aluno e turma, mantidas por contadores atualizados a cada registro novo."""
+import threading
+from collections import namedtuple
+
+COMANDO_LISTAR_FREQUENCIA = "LISTAR_FREQUENCIA"
+
+# --- Regras de Frequência ---
+LIMITE_FALTAS = 0.25  # Acima disso o aluno reprova por falta
+LIMITE_ALERTA = 0.20  # A partir daqui o aluno entra na lista de risco
+MIN_AULAS_ALERTA = 3  # Com menos aulas registradas, uma falta isolada não é alarme
+
+SITUACOES_FREQUENCIA = ("Regular", "Em risco", "Reprovado por falta")
+REGULAR, EM_RISCO, REPROVADO_FALTA = SITUACOES_FREQUENCIA
+
+TaxaFalta = namedtuple("TaxaFalta", "id_aluno id_turma aulas presencas faltas percentual situacao")
+
+
+def _situacao(aulas, percentual):
+    if aulas < MIN_AULAS_ALERTA:
+        return REGULAR
+    if percentual > LIMITE_FALTAS:
+        return REPROVADO_FALTA
+    return EM_RISCO if percentual >= LIMITE_ALERTA else REGULAR
+
+
+class QuadroFrequencia:
+    """Presenças e faltas por (aluno, turma), atualizadas a cada registro novo.
+
+    O arquivo de frequência do servidor só cresce no fim, então o quadro
+    guarda quantas linhas já leu e sincronizar() pede só as seguintes
+    (LISTAR_FREQUENCIA;DESDE;n). Cada linha mexe apenas nos contadores do
+    seu aluno; uma chamada refeita no mesmo dia troca o status anterior em
+    vez de contar a aula duas vezes. Pode ser usado de qualquer thread.
+    """
+    def __init__(self):
+        self.linhas_lidas = 0
+        self._status = {}  # (id_turma, id_aluno, data) -> "P" ou "F"
+        self._contadores = {}  # (id_aluno, id_turma) -> [presenças, faltas]
+        self._lock = threading.Lock()  # Protege os contadores; é segurado só por instantes
+        self._lock_sincronizacao = threading.Lock()  # Segurado durante a ida ao servidor
+
+    def aplicar(self, registros):
+        """Conta registros Frequencia lidos do servidor, na ordem do arquivo."""
+        with self._lock:
+            self._aplicar(registros)
+
+    def _aplicar(self, registros):
+        for registro in registros:
+            self.linhas_lidas += 1
+            if registro.status not in ("P", "F"):
+                continue
+            dia = (registro.id_turma, registro.id_aluno, registro.data)
+            anterior = self._status.get(dia)
+            if anterior == registro.status:
+                continue
+            self._status[dia] = registro.status
+            contadores = self._contadores.setdefault((registro.id_aluno, registro.id_turma), [0, 0])
+            if anterior is not None:
+                contadores[anterior == "F"] -= 1
+            contadores[registro.status == "F"] += 1
+
+    def sincronizar(self, consultar):
+        """Lê e aplica as linhas gravadas desde a última leitura.
+
+        consultar(comando) retorna (tipo, registros), como
+        ClienteServidor._consultar_registros, e o mesmo par é retornado; VAZIO
+        quer dizer que não havia nada novo. Duas sincronizações não correm ao
+        mesmo tempo, para que nenhuma linha seja contada duas vezes, mas as
+        consultas seguem respondendo enquanto uma delas espera o servidor.
+        """
+        with self._lock_sincronizacao:
+            tipo, dados = consultar(f"{COMANDO_LISTAR_FREQUENCIA};DESDE;{self.linhas_lidas}")
+            if tipo == "DADOS":
+                self.aplicar(dados)
+            return tipo, dados
+
+    # --- Consultas ---
+    def taxas(self, turmas=None):
+        """TaxaFalta de cada (aluno, turma), opcionalmente só das turmas indicadas."""
+        turmas = set(turmas) if turmas is not None else None
+        with self._lock:
+            contadores = [(chave, tuple(valores)) for chave, valores in self._contadores.items()
+                          if turmas is None or chave[1] in turmas]
+        taxas = []
+        for (id_aluno, id_turma), (presencas, faltas) in contadores:
+            aulas = presencas + faltas
+            if aulas:
+                percentual = faltas / aulas
+                taxas.append(TaxaFalta(id_aluno, id_turma, aulas, presencas, faltas, percentual,
+                                       _situacao(aulas, percentual)))
+        return taxas
+
+    def em_risco(self, turmas=None):
+        """Alunos em risco ou já reprovados por falta, dos mais faltosos para os menos."""
+        return sorted((t for t in self.taxas(turmas) if t.situacao != REGULAR),
+                      key=lambda t: t.percentual, reverse=True)
@@ -0,0 +1,61 @@
+"""Utilitários de arquivo do cliente: gravação atômica e travas entre processos."""
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def escrever_atomicamente(caminho, texto):
+    """Grava o texto num arquivo temporário e o renomeia sobre o destino.
+
+    Quem lê o arquivo vê sempre a versão antiga completa ou a nova completa,
+    nunca uma gravação pela metade, mesmo que o processo caia no meio.
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    descritor, temporario = tempfile.mkstemp(prefix=".tmp_", dir=diretorio)
+    try:
+        with os.fdopen(descritor, "w", encoding="utf-8") as f:
+            f.write(texto)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+class TravaArquivo:
+    """Trava consultiva exclusiva, compartilhada entre processos, para um arquivo de dados.
+
+    A trava fica num arquivo auxiliar '<arquivo>.lock' porque o arquivo de dados
+    é substituído por rename a cada gravação atômica, e uma trava no inode
+    antigo não protegeria o novo.
+    """
+    def __init__(self, caminho):
+        self.caminho = caminho + ".lock"
+        self._arquivo = None
+
+    def __enter__(self):
+        self._arquivo = open(self.caminho, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_EX)
+        else:
+            self._arquivo.seek(0)
+            msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                self._arquivo.seek(0)
+                msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._arquivo.close()
+            self._arquivo = None
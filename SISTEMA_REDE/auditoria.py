@@ -0,0 +1,144 @@
+"""Log de auditoria do cliente: entradas enfileiradas e enviadas em lotes por uma thread própria."""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from rede import MAX_COMANDOS_LOTE, SEPARADOR_LOTE
+
+COMANDO_LOG = "LOG"
+COMANDO_LOG_DATADO = "LOG_DATADO"
+ARQUIVO_AUDITORIA_PENDENTE = "auditoria_pendente.csv"
+FORMATO_DATA_HORA = "%Y-%m-%d %H:%M:%S"
+INTERVALO_ENVIO = 2.0  # Segundos entre envios da fila
+ESPERA_SEM_SERVIDOR = 30.0  # Depois de uma falha, segundos até tentar o servidor de novo
+ESPERA_ENCERRAMENTO = 3.0
+
+_registro = logging.getLogger(__name__)
+
+
+def _limpar(mensagem):
+    # Quebras de linha, '|' e o separador de lote desmontariam o log ou o LOTE.
+    for caractere in ("\r", "\n", "|", SEPARADOR_LOTE):
+        mensagem = mensagem.replace(caractere, " ")
+    return mensagem
+
+
+class Auditoria:
+    """Envia as entradas de auditoria ao servidor sem bloquear quem as registra.
+
+    registrar() só põe a entrada na fila, com a hora local, e retorna na hora;
+    uma thread própria manda a fila a cada INTERVALO_ENVIO segundos num único
+    LOTE de LOG_DATADO (que grava a hora do cliente, não a do envio). Se o
+    servidor não responde, as entradas vão para um arquivo local e seguem,
+    antes das novas, quando ele voltar; uma entrada que o servidor recusa é
+    descartada, com aviso em 'ao_descartar(mensagem)' (por padrão, no
+    logging), e não segura as seguintes. 'enviar_lote' é ClienteServidor._enviar_lote: comandos ->
+    respostas na mesma ordem; 'sem_conexao' é a resposta que ele dá quando
+    não há servidor.
+    """
+    def __init__(self, enviar_lote, sem_conexao, ao_descartar=None, arquivo=ARQUIVO_AUDITORIA_PENDENTE,
+                 intervalo=INTERVALO_ENVIO):
+        self._enviar_lote = enviar_lote
+        self._sem_conexao = sem_conexao
+        self._ao_descartar = ao_descartar or _registro.warning
+        self.arquivo = arquivo
+        self.intervalo = intervalo
+        self._fila = []  # (data e hora, mensagem)
+        self._condicao = threading.Condition()
+        self._encerrando = False
+        self._datado_suportado = True  # Vira False se o servidor for antigo e só conhecer LOG
+        self._thread = threading.Thread(target=self._executar, name="conectapro-auditoria", daemon=True)
+        self._thread.start()
+
+    def registrar(self, mensagem):
+        entrada = (datetime.now().strftime(FORMATO_DATA_HORA), _limpar(mensagem))
+        with self._condicao:
+            self._fila.append(entrada)
+            if len(self._fila) >= MAX_COMANDOS_LOTE:
+                self._condicao.notify()  # Lote cheio: não espera o intervalo
+
+    def encerrar(self, espera=ESPERA_ENCERRAMENTO):
+        """Faz um último envio; o que não chegar ao servidor fica no arquivo local."""
+        with self._condicao:
+            self._encerrando = True
+            self._condicao.notify()
+        self._thread.join(espera)
+        with self._condicao:
+            restantes, self._fila = self._fila, []
+        if restantes:
+            self._guardar(restantes)
+
+    # --- Envio (thread de auditoria) ---
+    def _executar(self):
+        sem_servidor_ate = 0.0
+        while True:
+            with self._condicao:
+                if not self._encerrando:
+                    self._condicao.wait(self.intervalo)
+                encerrando = self._encerrando
+                entradas, self._fila = self._fila, []
+
+            if time.monotonic() < sem_servidor_ate and not encerrando:
+                self._guardar(entradas)  # Não adianta tentar ainda; não perde as entradas
+            else:
+                guardadas = self._ler_guardadas()
+                nao_entregues = self._entregar(guardadas + entradas)
+                if guardadas or nao_entregues:
+                    self._substituir_guardadas(nao_entregues)
+                sem_servidor_ate = time.monotonic() + ESPERA_SEM_SERVIDOR if nao_entregues else 0.0
+            if encerrando:
+                return
+
+    def _entregar(self, entradas):
+        """Envia as entradas em lotes, na ordem; retorna as que não chegaram ao servidor, para reenviar."""
+        for inicio in range(0, len(entradas), MAX_COMANDOS_LOTE):
+            lote = entradas[inicio:inicio + MAX_COMANDOS_LOTE]
+            respostas = self._enviar_lote([self._comando(entrada) for entrada in lote])
+            if self._datado_suportado and respostas and respostas[0].startswith(f"ERRO;Comando '{COMANDO_LOG_DATADO}'"):
+                self._datado_suportado = False  # Servidor antigo: grava com a hora dele
+                respostas = self._enviar_lote([self._comando(entrada) for entrada in lote])
+            for i, resposta in enumerate(respostas):
+                if resposta == self._sem_conexao:
+                    return entradas[inicio + i:]  # As anteriores já foram gravadas
+                if not resposta.startswith("SUCESSO"):
+                    self._ao_descartar(f"entrada '{lote[i][1][:60]}' recusada pelo servidor: {resposta.split(';', 1)[-1]}")
+        return []
+
+    def _comando(self, entrada):
+        data_hora, mensagem = entrada
+        if self._datado_suportado:
+            return f"{COMANDO_LOG_DATADO};{data_hora};{mensagem}"
+        return f"{COMANDO_LOG};{mensagem}"
+
+    # --- Arquivo local ---
+    # Uma entrada por linha: "data e hora;mensagem". Só a thread de
+    # auditoria mexe no arquivo, e encerrar, quando ela já terminou ou travou.
+    def _guardar(self, entradas):
+        if not entradas:
+            return
+        try:
+            with open(self.arquivo, "a", encoding="utf-8") as f:
+                f.writelines(f"{data_hora};{mensagem}\n" for data_hora, mensagem in entradas)
+        except OSError:
+            pass  # Sem disco também não há onde avisar; a ação auditada já aconteceu
+
+    def _ler_guardadas(self):
+        try:
+            with open(self.arquivo, encoding="utf-8") as f:
+                return [tuple(linha.rstrip("\n").split(";", 1)) for linha in f if ";" in linha]
+        except OSError:
+            return []
+
+    def _substituir_guardadas(self, entradas):
+        try:
+            if not entradas:
+                os.remove(self.arquivo)
+                return
+            temporario = f"{self.arquivo}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                f.writelines(f"{data_hora};{mensagem}\n" for data_hora, mensagem in entradas)
+            os.replace(temporario, self.arquivo)
+        except OSError:
+            pass
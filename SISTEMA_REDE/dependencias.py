@@ -0,0 +1,66 @@
+"""Bibliotecas opcionais carregadas só no primeiro uso, e tempos de inicialização do cliente."""
+import importlib
+import importlib.util
+import threading
+import time
+
+_INICIO = time.perf_counter()
+_marcos = []  # (evento, segundos desde _INICIO)
+_importacoes = []  # (módulo, segundos gastos na importação)
+
+
+def marcar(evento):
+    """Registra um marco da inicialização para o relatório de tempos."""
+    _marcos.append((evento, time.perf_counter() - _INICIO))
+
+
+def relatorio_inicializacao():
+    linhas = ["--- Tempos de inicialização ---"]
+    linhas += [f"{segundos * 1000:8.1f} ms  {evento}" for evento, segundos in _marcos]
+    if _importacoes:
+        linhas.append("Importações adiadas:")
+        linhas += [f"{segundos * 1000:8.1f} ms  {modulo}" for modulo, segundos in _importacoes]
+    else:
+        linhas.append("Nenhuma biblioteca opcional foi importada.")
+    return "\n".join(linhas)
+
+
+class DependenciaOpcional:
+    """Biblioteca opcional cuja presença é verificada sem importá-la.
+
+    find_spec só procura o pacote nos caminhos de importação; a importação de
+    fato (que no matplotlib custa centenas de milissegundos) acontece em
+    carregar(), no primeiro uso. Pode ser chamada de qualquer thread.
+    """
+    def __init__(self, pacote, *modulos):
+        self.pacote = pacote
+        self.modulos = modulos or (pacote,)
+        self._disponivel = None
+        self._carregados = None
+        self._lock = threading.Lock()
+
+    def disponivel(self):
+        if self._disponivel is None:
+            try:
+                self._disponivel = importlib.util.find_spec(self.pacote) is not None
+            except (ImportError, ValueError):
+                self._disponivel = False
+        return self._disponivel
+
+    def carregar(self):
+        """Importa os módulos e os retorna numa tupla, ou None se a biblioteca não puder ser usada."""
+        if self._carregados is not None or not self.disponivel():
+            return self._carregados
+        with self._lock:
+            if self._carregados is None and self._disponivel:
+                carregados = []
+                try:
+                    for nome in self.modulos:
+                        inicio = time.perf_counter()
+                        carregados.append(importlib.import_module(nome))
+                        _importacoes.append((nome, time.perf_counter() - inicio))
+                except ImportError:
+                    self._disponivel = False  # Instalação incompleta
+                    return None
+                self._carregados = tuple(carregados)
+        return self._carregados
@@ -59,6 +59,167 @@
 #define MAX_LINHA 1024
 #define MAX_ALUNOS 500
 
+// --- Enquadramento de Mensagens (conexões persistentes) ---
+// Cada mensagem é precedida por 4 bytes com o seu tamanho (big-endian).
+// Nenhum comando legado começa com byte nulo, então o primeiro byte recebido
+// basta para distinguir clientes com enquadramento dos clientes antigos.
+#define TAMANHO_CABECALHO 4
+#define MAX_FRAME (16 * 1024 * 1024)
+
+// --- Lotes de Comandos ---
+// "LOTE;cmd1<RS>cmd2<RS>..." executa vários comandos numa única requisição e
+// responde "LOTE;resp1<RS>resp2<RS>...", na mesma ordem. O separador (ASCII RS)
+// não aparece nos dados dos CSVs nem nos comandos do cliente.
+#define SEPARADOR_LOTE '\x1e'
+#define MAX_COMANDOS_LOTE 64
+
+// --- Contagens Agregadas ---
+// "CONTAR;<agrupamento>" responde "DADOS;valor;quantidade|..." com uma linha
+// por valor distinto da coluna, ou "DADOS;TOTAL;n" quando não há coluna.
+// Só as contagens trafegam, em vez das listagens inteiras.
+typedef struct {
+    const char* nome;
+    const char* arquivo;
+    int coluna; // -1: apenas o total de linhas
+} Agrupamento;
+
+static const Agrupamento AGRUPAMENTOS[] = {
+    {"CURSOS", ARQUIVO_CURSOS, -1},
+    {"MATERIAS", ARQUIVO_MATERIAS, -1},
+    {"TURMAS", ARQUIVO_TURMAS, -1},
+    {"ALUNOS", ARQUIVO_ALUNOS, -1},
+    {"ALUNOS_POR_TURMA", ARQUIVO_ALUNOS, 5},
+    {"MATERIAS_POR_CURSO", ARQUIVO_MATERIAS, 2},
+    {"FINANCEIRO_POR_STATUS", ARQUIVO_FINANCEIRO, 4},
+    {"FREQUENCIA_POR_STATUS", ARQUIVO_FREQUENCIA, 3},
+};
+#define TOTAL_AGRUPAMENTOS (sizeof(AGRUPAMENTOS) / sizeof(AGRUPAMENTOS[0]))
+
+typedef struct {
+    char valor[100];
+    int quantidade;
+} Contagem;
+
+// --- Frequência em Partes ---
+// "REGISTRAR_FREQUENCIA_PARTE;chave;turma;data;parte;total;id,S|id,S..." grava
+// uma parte de uma chamada. A chave identifica o envio; o servidor lembra as
+// partes já gravadas e responde SUCESSO sem gravar de novo quando o cliente
+// reenvia uma parte cuja confirmação se perdeu.
+#define TAMANHO_CHAVE_ENVIO 64
+#define MAX_PARTES_LEMBRADAS 1024
+
+typedef struct {
+    char chave[TAMANHO_CHAVE_ENVIO];
+    int parte;
+} ParteGravada;
+
+static ParteGravada g_partes_gravadas[MAX_PARTES_LEMBRADAS]; // Fila circular, protegida por g_file_mutex
+static int g_proxima_parte_gravada = 0;
+
+// --- Leitura Paginada do Log ---
+// "LISTAR_LOGS;ANTES;cursor;limite;de;ate" lê do fim para o começo, a partir
+// do byte 'cursor' (-1: fim do arquivo), até 'limite' entradas cuja data
+// começa entre 'de' e 'ate' (prefixos de AAAA-MM-DD; vazios: sem limite).
+// "LISTAR_LOGS;DESDE;cursor;limite" lê, em ordem, o que foi gravado a partir
+// do byte 'cursor'. O primeiro registro da resposta é "CURSOR;a;b": em ANTES,
+// 'a' é onde a próxima página termina (0: não há mais) e 'b' o tamanho do
+// arquivo; em DESDE, 'a' é de onde a leitura partiu (0 se o log foi limpo) e
+// 'b' de onde a próxima deve partir. Sem argumentos, lista o arquivo inteiro.
+#define TAMANHO_BLOCO_LOG 4096
+#define PAGINA_LOG_PADRAO 100
+#define LIMITE_PAGINA_LOG 1000
+
+// --- Réplica Local dos Clientes ---
+// Cada escrita bem-sucedida avança a sequência de alterações do servidor e
+// anota o número dessa alteração na tabela afetada; as que reescrevem o CSV
+// (exclusões, pagamento, limpeza) anotam também a última reescrita.
+// "LER_TABELA;tabela;epoca;sequencia;cursor" devolve as linhas gravadas a
+// partir do byte 'cursor': sem alterações, só o fim do arquivo é consultado.
+// Se a tabela foi reescrita depois da última alteração que o cliente viu, ou
+// se o servidor foi reiniciado (outra época), a leitura recomeça do byte 0.
+// Um arquivo menor que o cursor também é lido de novo. O primeiro registro
+// da resposta é "CURSOR;inicio;fim;epoca;sequencia": 'inicio' é de onde a
+// leitura partiu (0: o cliente deve descartar o que tinha) e 'fim' é o
+// cursor da próxima leitura.
+typedef struct {
+    const char* nome;
+    const char* arquivo;
+    long alteracao; // Sequência da última escrita na tabela
+    long reescrita; // Sequência da última escrita que reescreveu o arquivo
+} TabelaReplicada;
+
+static TabelaReplicada g_tabelas[] = { // Protegidas por g_file_mutex
+    {"CURSOS", ARQUIVO_CURSOS, 0, 0},
+    {"MATERIAS", ARQUIVO_MATERIAS, 0, 0},
+    {"TURMAS", ARQUIVO_TURMAS, 0, 0},
+    {"ALUNOS", ARQUIVO_ALUNOS, 0, 0},
+    {"NOTAS", ARQUIVO_NOTAS, 0, 0},
+    {"FREQUENCIA", ARQUIVO_FREQUENCIA, 0, 0},
+    {"FINANCEIRO", ARQUIVO_FINANCEIRO, 0, 0},
+    {"MENSAGENS", ARQUIVO_MENSAGENS, 0, 0},
+    {"ATIVIDADES", ARQUIVO_ATIVIDADES, 0, 0},
+};
+#define TOTAL_TABELAS (sizeof(g_tabelas) / sizeof(g_tabelas[0]))
+
+typedef struct {
+    const char* comando;
+    const char* tabela;
+    int reescreve;
+} EfeitoEscrita;
+
+static const EfeitoEscrita EFEITOS_ESCRITA[] = {
+    {"CADASTRAR_CURSO", "CURSOS", 0},
+    {"EXCLUIR_CURSO", "CURSOS", 1},
+    {"CADASTRAR_MATERIA", "MATERIAS", 0},
+    {"CADASTRAR_TURMA", "TURMAS", 0},
+    {"EXCLUIR_TURMA", "TURMAS", 1},
+    {"CADASTRAR_ALUNO", "ALUNOS", 0},
+    {"EXCLUIR_ALUNO", "ALUNOS", 1},
+    {"CADASTRAR_NOTA", "NOTAS", 0},
+    {"LIMPAR_NOTAS", "NOTAS", 1},
+    {"REGISTRAR_FREQUENCIA", "FREQUENCIA", 0},
+    {"REGISTRAR_FREQUENCIA_PARTE", "FREQUENCIA", 0},
+    {"GERAR_MENSALIDADES", "FINANCEIRO", 0},
+    {"PAGAR_MENSALIDADE", "FINANCEIRO", 1},
+    {"POSTAR_MENSAGEM", "MENSAGENS", 0},
+    {"LIMPAR_MENSAGENS", "MENSAGENS", 1},
+    {"CADASTRAR_ATIVIDADE", "ATIVIDADES", 0},
+};
+#define TOTAL_EFEITOS_ESCRITA (sizeof(EFEITOS_ESCRITA) / sizeof(EFEITOS_ESCRITA[0]))
+
+static long g_epoca = 0; // Hora de início do servidor: as sequências recomeçam a cada execução
+static long g_sequencia = 0; // Protegida por g_file_mutex
+
+// --- Avisos de Alteração ---
+// "AGUARDAR_ALTERACOES;epoca;sequencia;espera_ms" fica pendente até alguma
+// escrita passar da 'sequencia' informada ou até 'espera_ms' acabar, e
+// responde "DADOS;CURSOR;epoca;sequencia|TABELA;alteracao|..." com as
+// tabelas alteradas depois dela (todas, se a época for outra). Cada cliente
+// mantém um pedido sempre pendente numa conexão só dele e recebe as
+// alterações assim que acontecem, sem consultar de tempos em tempos. A
+// espera usa um mutex próprio: não segura g_file_mutex, então não pode ir
+// dentro de um LOTE, que o segura.
+#define ESPERA_ALTERACOES_PADRAO 25000
+#define LIMITE_ESPERA_ALTERACOES 60000
+
+#ifdef _WIN32
+CRITICAL_SECTION g_alteracoes_mutex;
+CONDITION_VARIABLE g_alteracoes_cond;
+#else
+pthread_mutex_t g_alteracoes_mutex = PTHREAD_MUTEX_INITIALIZER;
+pthread_cond_t g_alteracoes_cond = PTHREAD_COND_INITIALIZER;
+#endif
+static long g_sequencia_publicada = 0; // Cópia de g_sequencia protegida por g_alteracoes_mutex
+
+// --- Buffer Dinâmico para Respostas ---
+// Cresce conforme a necessidade (dobrando a capacidade), de modo que listagens
+// de qualquer tamanho não estouram buffers fixos nem custam strcat repetido.
+typedef struct {
+    char* dados;
+    size_t tamanho;
+    size_t capacidade;
+} BufferResposta;
+
 // --- Estrutura para Análise de IA ---
 typedef struct {
     int id;
@@ -73,7 +234,7 @@ typedef struct {
 #ifdef _WIN32
 CRITICAL_SECTION g_file_mutex;
 #else
-pthread_mutex_t g_file_mutex = PTHREAD_MUTEX_INITIALIZER;
+pthread_mutex_t g_file_mutex; // Recursivo: um LOTE o mantém enquanto chama os handlers
 #endif
 
 
@@ -86,13 +247,23 @@ unsigned __stdcall connection_handler_win(void *socket_desc);
 void *connection_handler(void *socket_desc);
 #endif
 void processar_cliente(int client_socket);
+void processar_cliente_enquadrado(int client_socket);
+int receber_completo(int sock, char* destino, int tamanho);
+int enviar_completo(int sock, const char* origem, int tamanho);
+int enviar_frame(int sock, const char* dados);
 
 
 // --- Protótipos das Funções Utilitárias ---
+void buffer_iniciar(BufferResposta* buffer, const char* prefixo);
+void buffer_anexar(BufferResposta* buffer, const char* texto);
+char* buffer_finalizar(BufferResposta* buffer);
 int id_existe(const char* nome_arquivo, int id_para_verificar);
 int gerar_id_unico(const char* nome_arquivo);
 int verificar_alunos_na_turma(int id_turma);
 int verificar_materias_no_curso(int id_curso);
+int extrair_campo(const char* linha, int coluna, char* destino, size_t tamanho);
+int iguais_sem_caixa(const char* a, const char* b);
+char* listar_filtrado_handler(const char* nome_arquivo, int coluna, const char* valor, const char* msg_vazio);
 
 
 // --- MÓDULO DE CURSOS: Protótipos ---
@@ -113,6 +284,8 @@ char* excluir_turma_handler(char* args);
 char* cadastrar_aluno_handler(char* args);
 char* listar_alunos_handler();
 char* excluir_aluno_handler(char* args);
+char* listar_alunos_turma_handler(char* args);
+char* buscar_aluno_handler(char* args);
 
 // --- MÓDULO DE ATIVIDADES: Protótipos ---
 char* cadastrar_atividade_handler(char* args);
@@ -121,6 +294,7 @@ char* listar_atividades_handler();
 // --- MÓDULO DE NOTAS: Protótipos ---
 char* cadastrar_nota_handler(char* args);
 char* listar_notas_handler();
+char* listar_notas_aluno_handler(char* args);
 
 // --- MÓDULO DE DIÁRIO: Protótipos ---
 char* registrar_aula_handler(char* args);
@@ -129,9 +303,11 @@ char* listar_diario_handler(char* args);
 // --- MÓDULO DE MENSAGENS: Protótipos ---
 char* postar_mensagem_handler(char* args);
 char* listar_mensagens_handler();
+char* listar_mensagens_turma_handler(char* args);
 
 // --- MÓDULO DE FREQUÊNCIA: Protótipos ---
 char* registrar_frequencia_handler(char* args);
+char* registrar_frequencia_parte_handler(char* args);
 char* listar_frequencia_handler(char* args);
 
 // --- MÓDULO FINANCEIRO: Protótipos ---
@@ -141,17 +317,36 @@ char* pagar_mensalidade_handler(char* args);
 
 // --- MÓDULO DE SISTEMA (IA, LOG, BACKUP): Protótipos ---
 char* analisar_desempenho_ia_handler();
+char* ping_handler();
+char* lote_handler(char* args);
+char* contar_handler(char* args);
 char* log_handler(char* args);
-char* listar_logs_handler();
+char* log_datado_handler(char* args);
+char* listar_logs_handler(char* args);
 char* backup_handler();
 char* limpar_arquivo_handler(const char* nome_arquivo);
 
+// --- MÓDULO DE RÉPLICA: Protótipos ---
+static const EfeitoEscrita* buscar_efeito_escrita(const char* comando);
+static void registrar_alteracao(const EfeitoEscrita* efeito);
+char* ler_tabela_handler(char* args);
+char* aguardar_alteracoes_handler(char* args);
+
 
 // --- Função Principal ---
 int main() {
     srand(time(NULL));
+    g_epoca = (long) time(NULL);
     #ifdef _WIN32
     InitializeCriticalSection(&g_file_mutex);
+    InitializeCriticalSection(&g_alteracoes_mutex);
+    InitializeConditionVariable(&g_alteracoes_cond);
+    #else
+    pthread_mutexattr_t atributos;
+    pthread_mutexattr_init(&atributos);
+    pthread_mutexattr_settype(&atributos, PTHREAD_MUTEX_RECURSIVE);
+    pthread_mutex_init(&g_file_mutex, &atributos);
+    pthread_mutexattr_destroy(&atributos);
     #endif
     iniciar_servidor();
     return 0;
@@ -177,6 +372,10 @@ void iniciar_servidor() {
         exit(EXIT_FAILURE);
     }
 
+    // Permite reiniciar o servidor mesmo com conexões persistentes em TIME_WAIT.
+    int reutilizar = 1;
+    setsockopt(server_fd, SOL_SOCKET, SO_REUSEADDR, (const char*)&reutilizar, sizeof(reutilizar));
+
     address.sin_family = AF_INET;
     address.sin_addr.s_addr = INADDR_ANY;
     address.sin_port = htons(PORTA);
@@ -249,20 +448,26 @@ void *connection_handler(void *socket_desc) {
 #endif
 
 void processar_cliente(int client_socket) {
-    char buffer[TAMANHO_BUFFER] = {0};
-    int bytes_lidos;
+    char primeiro_byte;
 
-    while ((bytes_lidos = recv(client_socket, buffer, TAMANHO_BUFFER, 0)) > 0) {
-        buffer[bytes_lidos] = '\0';
-        printf("Comando recebido: %s\n", buffer);
+    if (recv(client_socket, &primeiro_byte, 1, MSG_PEEK) == 1 && primeiro_byte == '\0') {
+        processar_cliente_enquadrado(client_socket);
+    } else {
+        char buffer[TAMANHO_BUFFER] = {0};
+        int bytes_lidos;
 
-        char* resposta = processar_comando(buffer);
-        
-        send(client_socket, resposta, strlen(resposta), 0);
-        printf("Resposta enviada.\n");
+        while ((bytes_lidos = recv(client_socket, buffer, TAMANHO_BUFFER - 1, 0)) > 0) {
+            buffer[bytes_lidos] = '\0';
+            printf("Comando recebido: %s\n", buffer);
 
-        free(resposta);
-        memset(buffer, 0, TAMANHO_BUFFER);
+            char* resposta = processar_comando(buffer);
+            
+            enviar_completo(client_socket, resposta, (int)strlen(resposta));
+            printf("Resposta enviada.\n");
+
+            free(resposta);
+            memset(buffer, 0, TAMANHO_BUFFER);
+        }
     }
 
     printf("Cliente desconectado.\n");
@@ -273,16 +478,103 @@ void processar_cliente(int client_socket) {
 #endif
 }
 
+// Atende vários comandos na mesma conexão até o cliente encerrá-la.
+void processar_cliente_enquadrado(int client_socket) {
+    unsigned char cabecalho[TAMANHO_CABECALHO];
+
+    while (receber_completo(client_socket, (char*)cabecalho, TAMANHO_CABECALHO)) {
+        unsigned int tamanho = ((unsigned int)cabecalho[0] << 24) | ((unsigned int)cabecalho[1] << 16) |
+                               ((unsigned int)cabecalho[2] << 8) | (unsigned int)cabecalho[3];
+        if (tamanho == 0 || tamanho > MAX_FRAME) {
+            printf("Frame invalido (%u bytes). Encerrando conexao.\n", tamanho);
+            break;
+        }
+
+        char* comando = malloc(tamanho + 1);
+        if (!receber_completo(client_socket, comando, (int)tamanho)) {
+            free(comando);
+            break;
+        }
+        comando[tamanho] = '\0';
+        printf("Comando recebido: %s\n", comando);
+
+        char* resposta = processar_comando(comando);
+        free(comando);
+
+        int enviado = enviar_frame(client_socket, resposta);
+        free(resposta);
+        if (!enviado) break;
+        printf("Resposta enviada.\n");
+    }
+}
+
+int receber_completo(int sock, char* destino, int tamanho) {
+    int recebidos = 0;
+    while (recebidos < tamanho) {
+        int n = recv(sock, destino + recebidos, tamanho - recebidos, 0);
+        if (n <= 0) return 0;
+        recebidos += n;
+    }
+    return 1;
+}
+
+int enviar_completo(int sock, const char* origem, int tamanho) {
+    int enviados = 0;
+    while (enviados < tamanho) {
+        int n = send(sock, origem + enviados, tamanho - enviados, 0);
+        if (n <= 0) return 0;
+        enviados += n;
+    }
+    return 1;
+}
+
+int enviar_frame(int sock, const char* dados) {
+    // Cabeçalho e dados vão num único envio para não esbarrar no algoritmo de Nagle.
+    unsigned int tamanho = (unsigned int)strlen(dados);
+    unsigned char* frame = malloc(TAMANHO_CABECALHO + tamanho);
+    if (frame == NULL) return 0;
+    frame[0] = (tamanho >> 24) & 0xFF;
+    frame[1] = (tamanho >> 16) & 0xFF;
+    frame[2] = (tamanho >> 8) & 0xFF;
+    frame[3] = tamanho & 0xFF;
+    memcpy(frame + TAMANHO_CABECALHO, dados, tamanho);
+    int enviado = enviar_completo(sock, (const char*)frame, TAMANHO_CABECALHO + (int)tamanho);
+    free(frame);
+    return enviado;
+}
+
 char* processar_comando(char* buffer) {
-    char buffer_copia[TAMANHO_BUFFER];
+    // Cópia dinâmica: comandos enquadrados podem exceder TAMANHO_BUFFER.
+    char* buffer_copia = malloc(strlen(buffer) + 1);
     strcpy(buffer_copia, buffer);
 
     char* comando = strtok(buffer_copia, ";");
     char* args = strtok(NULL, "");
     char* resposta = NULL;
 
+    if (comando == NULL) {
+        free(buffer_copia);
+        resposta = malloc(50);
+        strcpy(resposta, "ERRO;Comando vazio.");
+        return resposta;
+    }
+
+    // Escritas em tabelas replicadas seguram o mutex até a sequência ser
+    // anotada: quem ler a tabela depois vê a escrita e o número dela juntos.
+    const EfeitoEscrita* efeito = buscar_efeito_escrita(comando);
+    if (efeito != NULL) {
+#ifdef _WIN32
+        EnterCriticalSection(&g_file_mutex);
+#else
+        pthread_mutex_lock(&g_file_mutex);
+#endif
+    }
+
     // Roteamento de comandos para os handlers apropriados
-    if (strcmp(comando, "LISTAR_CURSOS") == 0) resposta = listar_cursos_handler();
+    if (strcmp(comando, "PING") == 0) resposta = ping_handler();
+    else if (strcmp(comando, "LOTE") == 0) resposta = lote_handler(args);
+    else if (strcmp(comando, "CONTAR") == 0) resposta = contar_handler(args);
+    else if (strcmp(comando, "LISTAR_CURSOS") == 0) resposta = listar_cursos_handler();
     else if (strcmp(comando, "CADASTRAR_CURSO") == 0) resposta = cadastrar_curso_handler(args);
     else if (strcmp(comando, "EXCLUIR_CURSO") == 0) resposta = excluir_curso_handler(args);
     else if (strcmp(comando, "LISTAR_MATERIAS") == 0) resposta = listar_materias_handler();
@@ -293,15 +585,20 @@ char* processar_comando(char* buffer) {
     else if (strcmp(comando, "LISTAR_ALUNOS") == 0) resposta = listar_alunos_handler();
     else if (strcmp(comando, "CADASTRAR_ALUNO") == 0) resposta = cadastrar_aluno_handler(args);
     else if (strcmp(comando, "EXCLUIR_ALUNO") == 0) resposta = excluir_aluno_handler(args);
+    else if (strcmp(comando, "LISTAR_ALUNOS_TURMA") == 0) resposta = listar_alunos_turma_handler(args);
+    else if (strcmp(comando, "BUSCAR_ALUNO") == 0) resposta = buscar_aluno_handler(args);
     else if (strcmp(comando, "CADASTRAR_ATIVIDADE") == 0) resposta = cadastrar_atividade_handler(args);
     else if (strcmp(comando, "LISTAR_ATIVIDADES") == 0) resposta = listar_atividades_handler();
     else if (strcmp(comando, "CADASTRAR_NOTA") == 0) resposta = cadastrar_nota_handler(args);
     else if (strcmp(comando, "LISTAR_NOTAS_TODOS") == 0) resposta = listar_notas_handler();
+    else if (strcmp(comando, "LISTAR_NOTAS_ALUNO") == 0) resposta = listar_notas_aluno_handler(args);
     else if (strcmp(comando, "REGISTRAR_AULA") == 0) resposta = registrar_aula_handler(args);
     else if (strcmp(comando, "POSTAR_MENSAGEM") == 0) resposta = postar_mensagem_handler(args);
     else if (strcmp(comando, "LISTAR_MENSAGENS") == 0) resposta = listar_mensagens_handler();
+    else if (strcmp(comando, "LISTAR_MENSAGENS_TURMA") == 0) resposta = listar_mensagens_turma_handler(args);
     else if (strcmp(comando, "LOG") == 0) resposta = log_handler(args);
-    else if (strcmp(comando, "LISTAR_LOGS") == 0) resposta = listar_logs_handler();
+    else if (strcmp(comando, "LOG_DATADO") == 0) resposta = log_datado_handler(args);
+    else if (strcmp(comando, "LISTAR_LOGS") == 0) resposta = listar_logs_handler(args);
     else if (strcmp(comando, "BACKUP") == 0) resposta = backup_handler();
     else if (strcmp(comando, "ANALISAR_IA") == 0) resposta = analisar_desempenho_ia_handler();
     else if (strcmp(comando, "LIMPAR_NOTAS") == 0) resposta = limpar_arquivo_handler(ARQUIVO_NOTAS);
@@ -310,16 +607,30 @@ char* processar_comando(char* buffer) {
     else if (strcmp(comando, "LISTAR_DIARIO") == 0) resposta = listar_diario_handler(args);
     // NOVOS COMANDOS DE FREQUENCIA
     else if (strcmp(comando, "REGISTRAR_FREQUENCIA") == 0) resposta = registrar_frequencia_handler(args);
+    else if (strcmp(comando, "REGISTRAR_FREQUENCIA_PARTE") == 0) resposta = registrar_frequencia_parte_handler(args);
     else if (strcmp(comando, "LISTAR_FREQUENCIA") == 0) resposta = listar_frequencia_handler(args);
     // NOVOS COMANDOS FINANCEIROS
     else if (strcmp(comando, "GERAR_MENSALIDADES") == 0) resposta = gerar_mensalidades_handler(args);
     else if (strcmp(comando, "LISTAR_FINANCEIRO") == 0) resposta = listar_financeiro_handler(args);
     else if (strcmp(comando, "PAGAR_MENSALIDADE") == 0) resposta = pagar_mensalidade_handler(args);
+    // REPLICA LOCAL DOS CLIENTES
+    else if (strcmp(comando, "LER_TABELA") == 0) resposta = ler_tabela_handler(args);
+    else if (strcmp(comando, "AGUARDAR_ALTERACOES") == 0) resposta = aguardar_alteracoes_handler(args);
     else {
         resposta = malloc(100);
-        sprintf(resposta, "ERRO;Comando '%s' nao reconhecido.", comando);
+        snprintf(resposta, 100, "ERRO;Comando '%s' nao reconhecido.", comando);
+    }
+
+    if (efeito != NULL) {
+        if (strncmp(resposta, "SUCESSO", 7) == 0) registrar_alteracao(efeito);
+#ifdef _WIN32
+        LeaveCriticalSection(&g_file_mutex);
+#else
+        pthread_mutex_unlock(&g_file_mutex);
+#endif
     }
     
+    free(buffer_copia);
     return resposta;
 }
 
@@ -377,14 +688,14 @@ char* listar_cursos_handler() {
         return resp;
     }
     
-    char* resposta = malloc(TAMANHO_BUFFER * 2);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
 
     while (fgets(linha, sizeof(linha), arquivo)) {
         linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+        buffer_anexar(&resposta, linha);
+        buffer_anexar(&resposta, "|");
     }
     fclose(arquivo);
 
@@ -394,11 +705,7 @@ char* listar_cursos_handler() {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if(strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
-    }
-    
-    return resposta;
+    return buffer_finalizar(&resposta);
 }
 
 char* excluir_curso_handler(char* args) {
@@ -511,13 +818,13 @@ char* listar_materias_handler() {
         return resp;
     }
     
-    char* resposta = malloc(TAMANHO_BUFFER * 3);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
     while (fgets(linha, sizeof(linha), arquivo)) {
         linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+        buffer_anexar(&resposta, linha);
+        buffer_anexar(&resposta, "|");
     }
     fclose(arquivo);
 
@@ -527,11 +834,7 @@ char* listar_materias_handler() {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if(strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
-    }
-    
-    return resposta;
+    return buffer_finalizar(&resposta);
 }
 
 
@@ -587,14 +890,14 @@ char* listar_turmas_handler() {
         return resp;
     }
     
-    char* resposta = malloc(TAMANHO_BUFFER * 2);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
 
     while (fgets(linha, sizeof(linha), arquivo)) {
         linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+        buffer_anexar(&resposta, linha);
+        buffer_anexar(&resposta, "|");
     }
     fclose(arquivo);
 
@@ -604,11 +907,7 @@ char* listar_turmas_handler() {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if(strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
-    }
-    
-    return resposta;
+    return buffer_finalizar(&resposta);
 }
 
 char* excluir_turma_handler(char* args) {
@@ -725,14 +1024,14 @@ char* listar_alunos_handler() {
         return resp;
     }
     
-    char* resposta = malloc(TAMANHO_BUFFER * 5);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
 
     while (fgets(linha, sizeof(linha), arquivo)) {
         linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+        buffer_anexar(&resposta, linha);
+        buffer_anexar(&resposta, "|");
     }
     fclose(arquivo);
 
@@ -742,11 +1041,7 @@ char* listar_alunos_handler() {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if (strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
-    }
-    
-    return resposta;
+    return buffer_finalizar(&resposta);
 }
 
 char* excluir_aluno_handler(char* args) {
@@ -798,6 +1093,64 @@ char* excluir_aluno_handler(char* args) {
 }
 
 
+// Consulta filtrada: apenas os alunos da turma informada (coluna 5 de alunos.csv).
+char* listar_alunos_turma_handler(char* args) {
+    if (args == NULL || args[0] == '\0') {
+        char* resp = malloc(50);
+        strcpy(resp, "ERRO;ID de turma invalido.");
+        return resp;
+    }
+    return listar_filtrado_handler(ARQUIVO_ALUNOS, 5, args, "VAZIO;Nenhum aluno cadastrado.");
+}
+
+// Busca um aluno pelo nome (sem diferenciar maiúsculas) ou pela matrícula (RA).
+char* buscar_aluno_handler(char* args) {
+    if (args == NULL || args[0] == '\0') {
+        char* resp = malloc(50);
+        strcpy(resp, "ERRO;Informe o nome ou RA do aluno.");
+        return resp;
+    }
+
+#ifdef _WIN32
+    EnterCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_lock(&g_file_mutex);
+#endif
+    FILE *arquivo = fopen(ARQUIVO_ALUNOS, "r");
+    if (arquivo == NULL) {
+#ifdef _WIN32
+        LeaveCriticalSection(&g_file_mutex);
+#else
+        pthread_mutex_unlock(&g_file_mutex);
+#endif
+        char* resp = malloc(50);
+        strcpy(resp, "VAZIO;Nenhum aluno cadastrado.");
+        return resp;
+    }
+
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
+    char linha[MAX_LINHA], nome[MAX_LINHA], matricula[MAX_LINHA];
+    while (fgets(linha, sizeof(linha), arquivo)) {
+        linha[strcspn(linha, "\n")] = 0;
+        if ((extrair_campo(linha, 1, nome, sizeof(nome)) && iguais_sem_caixa(nome, args)) ||
+            (extrair_campo(linha, 3, matricula, sizeof(matricula)) && strcmp(matricula, args) == 0)) {
+            buffer_anexar(&resposta, linha);
+            buffer_anexar(&resposta, "|");
+        }
+    }
+    fclose(arquivo);
+
+#ifdef _WIN32
+    LeaveCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_unlock(&g_file_mutex);
+#endif
+
+    return buffer_finalizar(&resposta);
+}
+
+
 // --- GESTÃO DE ATIVIDADES ---
 char* cadastrar_atividade_handler(char* args) {
     int id_turma;
@@ -856,13 +1209,13 @@ char* listar_atividades_handler() {
         return resp;
     }
     
-    char* resposta = malloc(TAMANHO_BUFFER * 3);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
     while (fgets(linha, sizeof(linha), arquivo)) {
         linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+        buffer_anexar(&resposta, linha);
+        buffer_anexar(&resposta, "|");
     }
     fclose(arquivo);
 
@@ -872,11 +1225,7 @@ char* listar_atividades_handler() {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if(strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
-    }
-    
-    return resposta;
+    return buffer_finalizar(&resposta);
 }
 
 
@@ -938,14 +1287,14 @@ char* listar_notas_handler(){
         return resp;
     }
     
-    char* resposta = malloc(TAMANHO_BUFFER * 5);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
 
     while (fgets(linha, sizeof(linha), arquivo)) {
         linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+        buffer_anexar(&resposta, linha);
+        buffer_anexar(&resposta, "|");
     }
     fclose(arquivo);
 
@@ -955,11 +1304,17 @@ char* listar_notas_handler(){
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if (strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
+    return buffer_finalizar(&resposta);
+}
+
+// Consulta filtrada: apenas as notas do aluno informado (coluna 0 de notas.csv).
+char* listar_notas_aluno_handler(char* args) {
+    if (args == NULL || args[0] == '\0') {
+        char* resp = malloc(50);
+        strcpy(resp, "ERRO;ID do aluno invalido.");
+        return resp;
     }
-    
-    return resposta;
+    return listar_filtrado_handler(ARQUIVO_NOTAS, 0, args, "VAZIO;Nenhuma nota cadastrada.");
 }
 
 
@@ -1029,13 +1384,13 @@ char* listar_diario_handler(char* args) {
         return resp;
     }
     
-    char* resposta = malloc(TAMANHO_BUFFER * 5);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
     while (fgets(linha, sizeof(linha), arquivo)) {
         linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+        buffer_anexar(&resposta, linha);
+        buffer_anexar(&resposta, "|");
     }
     fclose(arquivo);
 
@@ -1045,11 +1400,7 @@ char* listar_diario_handler(char* args) {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if(strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
-    }
-    
-    return resposta;
+    return buffer_finalizar(&resposta);
 }
 
 char* postar_mensagem_handler(char* args) {
@@ -1102,14 +1453,14 @@ char* listar_mensagens_handler() {
         return resp;
     }
     
-    char* resposta = malloc(TAMANHO_BUFFER * 5);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
 
     while (fgets(linha, sizeof(linha), arquivo)) {
         linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+        buffer_anexar(&resposta, linha);
+        buffer_anexar(&resposta, "|");
     }
     fclose(arquivo);
 
@@ -1119,16 +1470,180 @@ char* listar_mensagens_handler() {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if (strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
+    return buffer_finalizar(&resposta);
+}
+
+
+// Consulta filtrada: apenas as mensagens do mural da turma informada.
+char* listar_mensagens_turma_handler(char* args) {
+    if (args == NULL || args[0] == '\0') {
+        char* resp = malloc(50);
+        strcpy(resp, "ERRO;ID de turma invalido.");
+        return resp;
     }
-    
-    return resposta;
+    return listar_filtrado_handler(ARQUIVO_MENSAGENS, 0, args, "VAZIO;Nenhuma mensagem no mural.");
 }
 
 
 // --- GESTÃO DE SISTEMA (LOG, BACKUP, IA) ---
-char* log_handler(char* args) {
+// Verificação de saúde usada pelo pool de conexões do cliente.
+char* ping_handler() {
+    char* resp = malloc(20);
+    strcpy(resp, "SUCESSO;PONG");
+    return resp;
+}
+
+// Executa os comandos do lote em sequência com o mutex de arquivos obtido, de
+// modo que as respostas formam um retrato consistente dos CSVs. Consultas
+// repetidas no mesmo lote leem o arquivo uma única vez.
+char* lote_handler(char* args) {
+    if (args == NULL || *args == '\0') {
+        char* resp = malloc(50);
+        strcpy(resp, "ERRO;Lote vazio.");
+        return resp;
+    }
+
+    char* comandos[MAX_COMANDOS_LOTE];
+    char* respostas[MAX_COMANDOS_LOTE];
+    int total = 0;
+    char* inicio = args;
+    while (1) {
+        if (total == MAX_COMANDOS_LOTE) {
+            char* resp = malloc(80);
+            snprintf(resp, 80, "ERRO;Lote excede %d comandos.", MAX_COMANDOS_LOTE);
+            return resp;
+        }
+        comandos[total++] = inicio;
+        char* separador = strchr(inicio, SEPARADOR_LOTE);
+        if (separador == NULL) break;
+        *separador = '\0';
+        inicio = separador + 1;
+    }
+
+#ifdef _WIN32
+    EnterCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_lock(&g_file_mutex);
+#endif
+    // Consultas repetidas reaproveitam a resposta anterior, mas só desde o último
+    // comando que não é consulta: uma escrita no meio do lote muda a listagem.
+    int reaproveitar_desde = 0;
+    for (int i = 0; i < total; i++) {
+        respostas[i] = NULL;
+        int consulta = strncmp(comandos[i], "LISTAR_", 7) == 0 || strncmp(comandos[i], "BUSCAR_", 7) == 0;
+        if (!consulta) reaproveitar_desde = i + 1;
+        if (consulta) {
+            for (int j = reaproveitar_desde; j < i; j++) {
+                if (strcmp(comandos[j], comandos[i]) == 0) {
+                    respostas[i] = malloc(strlen(respostas[j]) + 1);
+                    strcpy(respostas[i], respostas[j]);
+                    break;
+                }
+            }
+        }
+        if (respostas[i] != NULL) continue;
+
+        if (strncmp(comandos[i], "LOTE", 4) == 0 && (comandos[i][4] == ';' || comandos[i][4] == '\0')) {
+            respostas[i] = malloc(50);
+            strcpy(respostas[i], "ERRO;Lote dentro de lote.");
+        } else if (strncmp(comandos[i], "AGUARDAR_ALTERACOES", 19) == 0) {
+            respostas[i] = malloc(60);
+            strcpy(respostas[i], "ERRO;AGUARDAR_ALTERACOES nao pode ir num lote.");
+        } else {
+            respostas[i] = processar_comando(comandos[i]);
+        }
+    }
+#ifdef _WIN32
+    LeaveCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_unlock(&g_file_mutex);
+#endif
+
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "LOTE;");
+    char separador[2] = {SEPARADOR_LOTE, '\0'};
+    for (int i = 0; i < total; i++) {
+        if (i > 0) buffer_anexar(&resposta, separador);
+        buffer_anexar(&resposta, respostas[i]);
+        free(respostas[i]);
+    }
+    // Sem buffer_finalizar: um '|' no fim pertenceria à última resposta.
+    return resposta.dados;
+}
+
+// Conta as linhas do CSV do agrupamento, agrupadas pelo valor da sua coluna.
+char* contar_handler(char* args) {
+    const Agrupamento* agrupamento = NULL;
+    for (size_t i = 0; args != NULL && i < TOTAL_AGRUPAMENTOS; i++) {
+        if (strcmp(AGRUPAMENTOS[i].nome, args) == 0) {
+            agrupamento = &AGRUPAMENTOS[i];
+            break;
+        }
+    }
+    if (agrupamento == NULL) {
+        char* resp = malloc(150);
+        snprintf(resp, 150, "ERRO;Agrupamento '%s' desconhecido para CONTAR.", args ? args : "");
+        return resp;
+    }
+
+    Contagem* contagens = NULL;
+    int total_valores = 0, capacidade = 0, total_linhas = 0;
+#ifdef _WIN32
+    EnterCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_lock(&g_file_mutex);
+#endif
+    FILE* arquivo = fopen(agrupamento->arquivo, "r");
+    if (arquivo != NULL) {
+        char linha[MAX_LINHA], campo[100];
+        while (fgets(linha, sizeof(linha), arquivo)) {
+            linha[strcspn(linha, "\r\n")] = 0;
+            if (linha[0] == '\0') continue;
+            total_linhas++;
+            if (agrupamento->coluna < 0 || !extrair_campo(linha, agrupamento->coluna, campo, sizeof(campo))) continue;
+
+            int i = 0;
+            while (i < total_valores && strcmp(contagens[i].valor, campo) != 0) i++;
+            if (i == total_valores) {
+                if (total_valores == capacidade) {
+                    capacidade = capacidade ? capacidade * 2 : 16;
+                    contagens = realloc(contagens, capacidade * sizeof(Contagem));
+                }
+                strcpy(contagens[i].valor, campo);
+                contagens[i].quantidade = 0;
+                total_valores++;
+            }
+            contagens[i].quantidade++;
+        }
+        fclose(arquivo);
+    }
+#ifdef _WIN32
+    LeaveCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_unlock(&g_file_mutex);
+#endif
+
+    BufferResposta resposta;
+    char item[150];
+    if (agrupamento->coluna < 0) {
+        buffer_iniciar(&resposta, "DADOS;");
+        snprintf(item, sizeof(item), "TOTAL;%d", total_linhas);
+        buffer_anexar(&resposta, item);
+    } else if (total_valores == 0) {
+        buffer_iniciar(&resposta, "VAZIO;Nenhum registro para contar.");
+    } else {
+        buffer_iniciar(&resposta, "DADOS;");
+        for (int i = 0; i < total_valores; i++) {
+            snprintf(item, sizeof(item), "%s;%d|", contagens[i].valor, contagens[i].quantidade);
+            buffer_anexar(&resposta, item);
+        }
+    }
+    free(contagens);
+    return buffer_finalizar(&resposta);
+}
+
+// Acrescenta "data e hora;mensagem" ao log.
+static char* gravar_log(const char* timestamp, const char* mensagem) {
 #ifdef _WIN32
     EnterCriticalSection(&g_file_mutex);
 #else
@@ -1146,12 +1661,7 @@ char* log_handler(char* args) {
         return resp;
     }
 
-    time_t t = time(NULL);
-    struct tm *tm_info = localtime(&t);
-    char timestamp[26];
-    strftime(timestamp, 26, "%Y-%m-%d %H:%M:%S", tm_info);
-
-    fprintf(arquivo, "%s;%s\n", timestamp, args);
+    fprintf(arquivo, "%s;%s\n", timestamp, mensagem);
     fclose(arquivo);
 
 #ifdef _WIN32
@@ -1165,13 +1675,142 @@ char* log_handler(char* args) {
     return resp;
 }
 
-char* listar_logs_handler() {
+char* log_handler(char* args) {
+    time_t t = time(NULL);
+    struct tm *tm_info = localtime(&t);
+    char timestamp[26];
+    strftime(timestamp, 26, "%Y-%m-%d %H:%M:%S", tm_info);
+    return gravar_log(timestamp, args ? args : "");
+}
+
+// "LOG_DATADO;AAAA-MM-DD HH:MM:SS;mensagem": grava com a hora em que a ação
+// aconteceu no cliente, que pode enviar as entradas em lotes e com atraso.
+char* log_datado_handler(char* args) {
+    int ano, mes, dia, hora, minuto, segundo;
+    char fim;
+    if (args == NULL || strlen(args) < 20 || args[19] != ';' ||
+        sscanf(args, "%4d-%2d-%2d %2d:%2d:%2d%c", &ano, &mes, &dia, &hora, &minuto, &segundo, &fim) != 7) {
+        char* resp = malloc(60);
+        strcpy(resp, "ERRO;Data e hora invalidas para LOG_DATADO.");
+        return resp;
+    }
+    char timestamp[20];
+    memcpy(timestamp, args, 19);
+    timestamp[19] = '\0';
+    return gravar_log(timestamp, args + 20);
+}
+
+// Entradas do fim para o começo: lê o arquivo em blocos de trás para frente,
+// então o custo depende do tamanho da página, não do histórico.
+static char* listar_logs_antes(FILE* arquivo, long cursor, int limite, const char* de, const char* ate) {
+    fseek(arquivo, 0, SEEK_END);
+    long tamanho = ftell(arquivo);
+    if (cursor < 0 || cursor > tamanho) cursor = tamanho;
+
+    BufferResposta linhas;
+    buffer_iniciar(&linhas, "");
+    char* janela = NULL; // Bytes a partir de 'inicio' ainda não consumidos (o começo de uma linha)
+    size_t ocupado = 0;
+    long inicio = cursor, proximo = 0;
+    int enviadas = 0, terminou = 0;
+
+    while (!terminou && inicio > 0) {
+        long leitura = inicio > TAMANHO_BLOCO_LOG ? TAMANHO_BLOCO_LOG : inicio;
+        janela = realloc(janela, leitura + ocupado + 1);
+        memmove(janela + leitura, janela, ocupado);
+        inicio -= leitura;
+        fseek(arquivo, inicio, SEEK_SET);
+        if (fread(janela, 1, leitura, arquivo) != (size_t)leitura) break;
+        ocupado += leitura;
+
+        size_t fim = ocupado;
+        for (long i = (long)ocupado - 1; i >= -1 && !terminou; i--) {
+            if (i >= 0 && janela[i] != '\n') continue;
+            if (i < 0 && inicio > 0) break; // A linha continua no bloco anterior
+
+            size_t comeco = i + 1, comprimento = fim - comeco;
+            fim = i < 0 ? 0 : i;
+            if (comprimento > 0 && janela[comeco + comprimento - 1] == '\r') comprimento--;
+            if (comprimento == 0) continue;
+
+            char linha[MAX_LINHA];
+            if (comprimento >= sizeof(linha)) comprimento = sizeof(linha) - 1;
+            memcpy(linha, janela + comeco, comprimento);
+            linha[comprimento] = '\0';
+
+            // Sem parada antecipada em 'de': entradas de LOG_DATADO chegam com
+            // atraso e ficam fora da ordem cronológica do arquivo.
+            if (ate[0] && strncmp(linha, ate, strlen(ate)) > 0) continue;
+            if (de[0] && strncmp(linha, de, strlen(de)) < 0) continue;
+            buffer_anexar(&linhas, linha);
+            buffer_anexar(&linhas, "|");
+            proximo = inicio + comeco;
+            if (++enviadas >= limite) terminou = 1;
+        }
+        ocupado = fim;
+    }
+    free(janela);
+    if (!terminou) proximo = 0; // Chegou ao começo: não há mais páginas
+
+    char cabecalho[64];
+    snprintf(cabecalho, sizeof(cabecalho), "DADOS;CURSOR;%ld;%ld|", proximo, tamanho);
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, cabecalho);
+    buffer_anexar(&resposta, linhas.dados);
+    free(linhas.dados);
+    return buffer_finalizar(&resposta);
+}
+
+// Entradas gravadas a partir de 'cursor', em ordem (modo de acompanhamento).
+static char* listar_logs_desde(FILE* arquivo, long cursor, int limite) {
+    fseek(arquivo, 0, SEEK_END);
+    long tamanho = ftell(arquivo);
+    if (cursor < 0 || cursor > tamanho) cursor = 0; // O log foi limpo: recomeça do início
+    fseek(arquivo, cursor, SEEK_SET);
+
+    BufferResposta linhas;
+    buffer_iniciar(&linhas, "");
+    char linha[MAX_LINHA];
+    long proximo = cursor;
+    int enviadas = 0;
+    while (enviadas < limite && fgets(linha, sizeof(linha), arquivo)) {
+        proximo = ftell(arquivo);
+        linha[strcspn(linha, "\r\n")] = 0;
+        if (linha[0] == '\0') continue;
+        buffer_anexar(&linhas, linha);
+        buffer_anexar(&linhas, "|");
+        enviadas++;
+    }
+
+    char cabecalho[64];
+    snprintf(cabecalho, sizeof(cabecalho), "DADOS;CURSOR;%ld;%ld|", cursor, proximo);
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, cabecalho);
+    buffer_anexar(&resposta, linhas.dados);
+    free(linhas.dados);
+    return buffer_finalizar(&resposta);
+}
+
+char* listar_logs_handler(char* args) {
+    char modo[8] = "", campo[24], de[11] = "", ate[11] = "";
+    long cursor = -1;
+    int limite = PAGINA_LOG_PADRAO;
+    if (args != NULL) {
+        extrair_campo(args, 0, modo, sizeof(modo));
+        if (extrair_campo(args, 1, campo, sizeof(campo)) && campo[0]) cursor = atol(campo);
+        if (extrair_campo(args, 2, campo, sizeof(campo)) && atoi(campo) > 0) limite = atoi(campo);
+        extrair_campo(args, 3, de, sizeof(de));
+        extrair_campo(args, 4, ate, sizeof(ate));
+    }
+    if (limite > LIMITE_PAGINA_LOG) limite = LIMITE_PAGINA_LOG;
+    int antes = strcmp(modo, "ANTES") == 0, desde = strcmp(modo, "DESDE") == 0;
+
 #ifdef _WIN32
     EnterCriticalSection(&g_file_mutex);
 #else
     pthread_mutex_lock(&g_file_mutex);
 #endif
-    FILE* arquivo = fopen(ARQUIVO_LOG, "r");
+    FILE* arquivo = fopen(ARQUIVO_LOG, (antes || desde) ? "rb" : "r");
     if (arquivo == NULL) {
 #ifdef _WIN32
         LeaveCriticalSection(&g_file_mutex);
@@ -1179,17 +1818,25 @@ char* listar_logs_handler() {
         pthread_mutex_unlock(&g_file_mutex);
 #endif
         char* resp = malloc(50);
-        strcpy(resp, "VAZIO;Nenhum log encontrado.");
+        strcpy(resp, (antes || desde) ? "DADOS;CURSOR;0;0" : "VAZIO;Nenhum log encontrado.");
         return resp;
     }
 
-    char* resposta = malloc(TAMANHO_BUFFER * 10);
-    strcpy(resposta, "DADOS;");
-    char linha[MAX_LINHA];
-    while(fgets(linha, sizeof(linha), arquivo)) {
-        linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+    char* resultado;
+    if (antes) {
+        resultado = listar_logs_antes(arquivo, cursor, limite, de, ate);
+    } else if (desde) {
+        resultado = listar_logs_desde(arquivo, cursor, limite);
+    } else {
+        BufferResposta resposta;
+        buffer_iniciar(&resposta, "DADOS;");
+        char linha[MAX_LINHA];
+        while(fgets(linha, sizeof(linha), arquivo)) {
+            linha[strcspn(linha, "\n")] = 0;
+            buffer_anexar(&resposta, linha);
+            buffer_anexar(&resposta, "|");
+        }
+        resultado = buffer_finalizar(&resposta);
     }
     fclose(arquivo);
 
@@ -1199,10 +1846,7 @@ char* listar_logs_handler() {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
     
-    if (strlen(resposta) > 6) {
-        resposta[strlen(resposta)-1] = '\0';
-    }
-    return resposta;
+    return resultado;
 }
 
 char* backup_handler() {
@@ -1340,8 +1984,8 @@ char* analisar_desempenho_ia_handler() {
         fclose(arq_notas);
     }
 
-    char* resposta = malloc(TAMANHO_BUFFER * 2);
-    strcpy(resposta, "IA_RESULTADO;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "IA_RESULTADO;");
     int encontrou_risco = 0;
 
     for (int i = 0; i < num_alunos; i++) {
@@ -1368,7 +2012,7 @@ char* analisar_desempenho_ia_handler() {
 
                 char linha_resp[512];
                 sprintf(linha_resp, "%d,%s,%s,%s|", alunos[i].id, alunos[i].nome, nivel_risco, justificativa);
-                strcat(resposta, linha_resp);
+                buffer_anexar(&resposta, linha_resp);
                 encontrou_risco = 1;
             }
         }
@@ -1380,13 +2024,11 @@ char* analisar_desempenho_ia_handler() {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if (encontrou_risco) {
-        resposta[strlen(resposta) - 1] = '\0';
-    } else {
-        strcat(resposta, "NENHUM");
+    if (!encontrou_risco) {
+        buffer_anexar(&resposta, "NENHUM");
     }
 
-    return resposta;
+    return buffer_finalizar(&resposta);
 }
 
 
@@ -1432,7 +2074,90 @@ char* registrar_frequencia_handler(char* args) {
     return resposta;
 }
 
+// Grava uma parte de uma chamada de uma vez: ou todas as linhas da parte
+// são válidas e vão para o arquivo, ou nenhuma vai.
+char* registrar_frequencia_parte_handler(char* args) {
+    char chave[TAMANHO_CHAVE_ENVIO], data[20];
+    int id_turma, parte, total, inicio_itens = 0;
+    char* resposta = malloc(256);
+
+    if (args == NULL || sscanf(args, "%63[^;];%d;%19[^;];%d;%d;%n", chave, &id_turma, data, &parte, &total, &inicio_itens) != 5
+        || inicio_itens == 0 || parte < 1 || parte > total) {
+        sprintf(resposta, "ERRO;Formato de argumentos invalido para REGISTRAR_FREQUENCIA_PARTE.");
+        return resposta;
+    }
+
+    // Valida a parte inteira antes de gravar qualquer linha.
+    BufferResposta linhas;
+    buffer_iniciar(&linhas, "");
+    int quantidade = 0;
+    char* itens = args + inicio_itens;
+    char* saveptr;
+    char linha[128];
+    for (char* item = strtok_r(itens, "|", &saveptr); item != NULL; item = strtok_r(NULL, "|", &saveptr)) {
+        int id_aluno;
+        char status;
+        if (sscanf(item, "%d,%c", &id_aluno, &status) != 2 || (status != 'P' && status != 'F')) {
+            snprintf(resposta, 256, "ERRO;Item '%.40s' invalido na parte %d/%d.", item, parte, total);
+            free(linhas.dados);
+            return resposta;
+        }
+        snprintf(linha, sizeof(linha), "%d;%d;%s;%c\n", id_turma, id_aluno, data, status);
+        buffer_anexar(&linhas, linha);
+        quantidade++;
+    }
+
+#ifdef _WIN32
+    EnterCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_lock(&g_file_mutex);
+#endif
+    int repetida = 0;
+    for (int i = 0; i < MAX_PARTES_LEMBRADAS; i++) {
+        if (g_partes_gravadas[i].parte == parte && strcmp(g_partes_gravadas[i].chave, chave) == 0) {
+            repetida = 1;
+            break;
+        }
+    }
+
+    if (repetida) {
+        sprintf(resposta, "SUCESSO;Parte %d/%d ja registrada.", parte, total);
+    } else {
+        FILE* arquivo = fopen(ARQUIVO_FREQUENCIA, "a");
+        if (arquivo == NULL) {
+            sprintf(resposta, "ERRO;Nao foi possivel abrir o arquivo de frequencia.");
+        } else {
+            int falhou = fputs(linhas.dados, arquivo) == EOF;
+            falhou = fclose(arquivo) != 0 || falhou;
+            if (falhou) {
+                sprintf(resposta, "ERRO;Falha ao gravar a parte %d/%d.", parte, total);
+            } else {
+                ParteGravada* registro = &g_partes_gravadas[g_proxima_parte_gravada];
+                strcpy(registro->chave, chave);
+                registro->parte = parte;
+                g_proxima_parte_gravada = (g_proxima_parte_gravada + 1) % MAX_PARTES_LEMBRADAS;
+                sprintf(resposta, "SUCESSO;Parte %d/%d registrada (%d aluno(s)).", parte, total, quantidade);
+            }
+        }
+    }
+#ifdef _WIN32
+    LeaveCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_unlock(&g_file_mutex);
+#endif
+    free(linhas.dados);
+    return resposta;
+}
+
+// "LISTAR_FREQUENCIA;TODOS" lista o arquivo inteiro; "LISTAR_FREQUENCIA;DESDE;n"
+// pula as n primeiras linhas. O arquivo só cresce no fim, então quem já leu
+// n linhas pede apenas as novas. Linhas vazias não são enviadas nem contadas.
 char* listar_frequencia_handler(char* args) {
+    long desde = 0;
+    if (args != NULL && strncmp(args, "DESDE;", 6) == 0) {
+        desde = atol(args + 6);
+        if (desde < 0) desde = 0;
+    }
 #ifdef _WIN32
     EnterCriticalSection(&g_file_mutex);
 #else
@@ -1451,13 +2176,16 @@ char* listar_frequencia_handler(char* args) {
         return resp;
     }
 
-    char* resposta = malloc(TAMANHO_BUFFER * 5);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
+    long numero = 0, enviadas = 0;
     while (fgets(linha, sizeof(linha), arquivo)) {
-        linha[strcspn(linha, "\n")] = 0;
-        strcat(resposta, linha);
-        strcat(resposta, "|");
+        linha[strcspn(linha, "\r\n")] = 0;
+        if (linha[0] == '\0' || numero++ < desde) continue;
+        buffer_anexar(&resposta, linha);
+        buffer_anexar(&resposta, "|");
+        enviadas++;
     }
     fclose(arquivo);
 
@@ -1466,11 +2194,14 @@ char* listar_frequencia_handler(char* args) {
 #else
     pthread_mutex_unlock(&g_file_mutex);
 #endif
-    
-    if (strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
+
+    if (enviadas == 0) {
+        free(buffer_finalizar(&resposta));
+        char* resp = malloc(50);
+        strcpy(resp, desde > 0 ? "VAZIO;Nenhuma frequencia nova." : "VAZIO;Nenhuma frequencia registrada.");
+        return resp;
     }
-    return resposta;
+    return buffer_finalizar(&resposta);
 }
 
 
@@ -1540,8 +2271,8 @@ char* listar_financeiro_handler(char* args) {
         return resp;
     }
 
-    char* resposta = malloc(TAMANHO_BUFFER * 5);
-    strcpy(resposta, "DADOS;");
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
     char linha[MAX_LINHA];
 
     int id_filtro = -1;
@@ -1555,8 +2286,8 @@ char* listar_financeiro_handler(char* args) {
         
         if(id_filtro == -1 || id_aluno_atual == id_filtro) {
             linha[strcspn(linha, "\n")] = 0;
-            strcat(resposta, linha);
-            strcat(resposta, "|");
+            buffer_anexar(&resposta, linha);
+            buffer_anexar(&resposta, "|");
         }
     }
     fclose(arquivo);
@@ -1567,10 +2298,7 @@ char* listar_financeiro_handler(char* args) {
     pthread_mutex_unlock(&g_file_mutex);
 #endif
 
-    if (strlen(resposta) > 6) {
-        resposta[strlen(resposta) - 1] = '\0';
-    }
-    return resposta;
+    return buffer_finalizar(&resposta);
 }
 
 char* pagar_mensalidade_handler(char* args) {
@@ -1630,7 +2358,193 @@ char* pagar_mensalidade_handler(char* args) {
 }
 
 
+// --- NOVAS FUNÇÕES: RÉPLICA LOCAL DOS CLIENTES ---
+static TabelaReplicada* buscar_tabela(const char* nome) {
+    for (size_t i = 0; i < TOTAL_TABELAS; i++) {
+        if (strcmp(g_tabelas[i].nome, nome) == 0) return &g_tabelas[i];
+    }
+    return NULL;
+}
+
+static const EfeitoEscrita* buscar_efeito_escrita(const char* comando) {
+    for (size_t i = 0; i < TOTAL_EFEITOS_ESCRITA; i++) {
+        if (strcmp(EFEITOS_ESCRITA[i].comando, comando) == 0) return &EFEITOS_ESCRITA[i];
+    }
+    return NULL;
+}
+
+// Chamada com g_file_mutex obtido, logo depois da escrita.
+static void registrar_alteracao(const EfeitoEscrita* efeito) {
+    TabelaReplicada* tabela = buscar_tabela(efeito->tabela);
+    g_sequencia++;
+    tabela->alteracao = g_sequencia;
+    if (efeito->reescreve) tabela->reescrita = g_sequencia;
+
+#ifdef _WIN32
+    EnterCriticalSection(&g_alteracoes_mutex);
+    g_sequencia_publicada = g_sequencia;
+    WakeAllConditionVariable(&g_alteracoes_cond);
+    LeaveCriticalSection(&g_alteracoes_mutex);
+#else
+    pthread_mutex_lock(&g_alteracoes_mutex);
+    g_sequencia_publicada = g_sequencia;
+    pthread_cond_broadcast(&g_alteracoes_cond);
+    pthread_mutex_unlock(&g_alteracoes_mutex);
+#endif
+}
+
+char* ler_tabela_handler(char* args) {
+    char nome[32];
+    long epoca, sequencia, cursor;
+    if (args == NULL || sscanf(args, "%31[^;];%ld;%ld;%ld", nome, &epoca, &sequencia, &cursor) != 4) {
+        char* resp = malloc(80);
+        strcpy(resp, "ERRO;Formato de argumentos invalido para LER_TABELA.");
+        return resp;
+    }
+    TabelaReplicada* tabela = buscar_tabela(nome);
+    if (tabela == NULL) {
+        char* resp = malloc(100);
+        snprintf(resp, 100, "ERRO;Tabela '%s' desconhecida para LER_TABELA.", nome);
+        return resp;
+    }
+
+#ifdef _WIN32
+    EnterCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_lock(&g_file_mutex);
+#endif
+    long inicio = cursor;
+    if (epoca != g_epoca || sequencia < tabela->reescrita || sequencia > g_sequencia || cursor < 0) inicio = 0;
+
+    FILE* arquivo = fopen(tabela->arquivo, "rb");
+    long fim = 0;
+    BufferResposta linhas;
+    buffer_iniciar(&linhas, "");
+    if (arquivo != NULL) {
+        fseek(arquivo, 0, SEEK_END);
+        if (inicio > ftell(arquivo)) inicio = 0; // Arquivo menor que o cursor: foi trocado por fora
+        fseek(arquivo, inicio, SEEK_SET);
+        char linha[MAX_LINHA];
+        while (fgets(linha, sizeof(linha), arquivo)) {
+            linha[strcspn(linha, "\r\n")] = 0;
+            if (linha[0] == '\0') continue;
+            buffer_anexar(&linhas, "|");
+            buffer_anexar(&linhas, linha);
+        }
+        fim = ftell(arquivo);
+        fclose(arquivo);
+    } else {
+        inicio = 0;
+    }
+    long alteracao = tabela->alteracao;
+#ifdef _WIN32
+    LeaveCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_unlock(&g_file_mutex);
+#endif
+
+    char cabecalho[128];
+    snprintf(cabecalho, sizeof(cabecalho), "DADOS;CURSOR;%ld;%ld;%ld;%ld", inicio, fim, g_epoca, alteracao);
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, cabecalho);
+    buffer_anexar(&resposta, linhas.dados);
+    free(linhas.dados);
+    return resposta.dados;
+}
+
+// Espera uma escrita depois de 'sequencia' por até 'espera' ms; retorna logo se já houve.
+static void esperar_alteracao(long sequencia, long espera) {
+#ifdef _WIN32
+    EnterCriticalSection(&g_alteracoes_mutex);
+    DWORD inicio = GetTickCount();
+    while (g_sequencia_publicada <= sequencia) {
+        DWORD passado = GetTickCount() - inicio;
+        if (passado >= (DWORD) espera ||
+            !SleepConditionVariableCS(&g_alteracoes_cond, &g_alteracoes_mutex, (DWORD) espera - passado)) break;
+    }
+    LeaveCriticalSection(&g_alteracoes_mutex);
+#else
+    struct timespec limite;
+    clock_gettime(CLOCK_REALTIME, &limite);
+    limite.tv_sec += espera / 1000;
+    limite.tv_nsec += (espera % 1000) * 1000000L;
+    if (limite.tv_nsec >= 1000000000L) {
+        limite.tv_sec++;
+        limite.tv_nsec -= 1000000000L;
+    }
+    pthread_mutex_lock(&g_alteracoes_mutex);
+    while (g_sequencia_publicada <= sequencia) {
+        if (pthread_cond_timedwait(&g_alteracoes_cond, &g_alteracoes_mutex, &limite) != 0) break;
+    }
+    pthread_mutex_unlock(&g_alteracoes_mutex);
+#endif
+}
+
+char* aguardar_alteracoes_handler(char* args) {
+    long epoca, sequencia, espera = ESPERA_ALTERACOES_PADRAO;
+    if (args == NULL || sscanf(args, "%ld;%ld;%ld", &epoca, &sequencia, &espera) < 2) {
+        char* resp = malloc(80);
+        strcpy(resp, "ERRO;Formato de argumentos invalido para AGUARDAR_ALTERACOES.");
+        return resp;
+    }
+    if (espera < 0) espera = 0;
+    if (espera > LIMITE_ESPERA_ALTERACOES) espera = LIMITE_ESPERA_ALTERACOES;
+
+    if (epoca == g_epoca) esperar_alteracao(sequencia, espera);
+
+#ifdef _WIN32
+    EnterCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_lock(&g_file_mutex);
+#endif
+    char linha[64];
+    BufferResposta resposta;
+    snprintf(linha, sizeof(linha), "DADOS;CURSOR;%ld;%ld", g_epoca, g_sequencia);
+    buffer_iniciar(&resposta, linha);
+    for (size_t i = 0; i < TOTAL_TABELAS; i++) {
+        if (epoca != g_epoca || g_tabelas[i].alteracao > sequencia) {
+            snprintf(linha, sizeof(linha), "|%s;%ld", g_tabelas[i].nome, g_tabelas[i].alteracao);
+            buffer_anexar(&resposta, linha);
+        }
+    }
+#ifdef _WIN32
+    LeaveCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_unlock(&g_file_mutex);
+#endif
+    return resposta.dados;
+}
+
+
 // --- Funções Utilitárias ---
+void buffer_iniciar(BufferResposta* buffer, const char* prefixo) {
+    buffer->capacidade = TAMANHO_BUFFER;
+    buffer->tamanho = 0;
+    buffer->dados = malloc(buffer->capacidade);
+    buffer->dados[0] = '\0';
+    buffer_anexar(buffer, prefixo);
+}
+
+void buffer_anexar(BufferResposta* buffer, const char* texto) {
+    size_t tamanho_texto = strlen(texto);
+    if (buffer->tamanho + tamanho_texto + 1 > buffer->capacidade) {
+        while (buffer->tamanho + tamanho_texto + 1 > buffer->capacidade) {
+            buffer->capacidade *= 2;
+        }
+        buffer->dados = realloc(buffer->dados, buffer->capacidade);
+    }
+    memcpy(buffer->dados + buffer->tamanho, texto, tamanho_texto + 1);
+    buffer->tamanho += tamanho_texto;
+}
+
+// Remove o separador '|' final (se houver) e entrega a string ao chamador.
+char* buffer_finalizar(BufferResposta* buffer) {
+    if (buffer->tamanho > 0 && buffer->dados[buffer->tamanho - 1] == '|') {
+        buffer->dados[--buffer->tamanho] = '\0';
+    }
+    return buffer->dados;
+}
+
 int id_existe(const char* nome_arquivo, int id_para_verificar) {
     FILE* arquivo = fopen(nome_arquivo, "r");
     if (arquivo == NULL) return 0;
@@ -1688,3 +2602,81 @@ int verificar_materias_no_curso(int id_curso_busca) {
     fclose(arquivo);
     return 0;
 }
+
+// Copia o campo `coluna` (0 = primeiro) de uma linha separada por ';'.
+int extrair_campo(const char* linha, int coluna, char* destino, size_t tamanho) {
+    const char* inicio = linha;
+    for (int i = 0; i < coluna; i++) {
+        inicio = strchr(inicio, ';');
+        if (inicio == NULL) return 0;
+        inicio++;
+    }
+    size_t comprimento = strcspn(inicio, ";");
+    if (comprimento >= tamanho) comprimento = tamanho - 1;
+    memcpy(destino, inicio, comprimento);
+    destino[comprimento] = '\0';
+    return 1;
+}
+
+// Compara sem diferenciar maiúsculas nas letras ASCII e nas acentuadas do
+// Latin-1 em UTF-8: À-Þ (0xC3 0x80-0x9E, exceto o sinal de vezes 0x97) valem
+// como à-þ (0xC3 0xA0-0xBE). A troca mantém o tamanho em bytes, então as duas
+// strings são percorridas juntas; mesma regra de rede.iguais_sem_caixa.
+static unsigned char minuscula_utf8(const unsigned char* inicio, const unsigned char* c) {
+    if (*c < 0x80) return (unsigned char) tolower(*c);
+    if (c > inicio && c[-1] == 0xC3 && *c >= 0x80 && *c <= 0x9E && *c != 0x97) return *c + 0x20;
+    return *c;
+}
+
+int iguais_sem_caixa(const char* a, const char* b) {
+    const unsigned char* inicio_a = (const unsigned char*) a;
+    const unsigned char* inicio_b = (const unsigned char*) b;
+    const unsigned char* x = inicio_a;
+    const unsigned char* y = inicio_b;
+    while (*x && *y) {
+        if (minuscula_utf8(inicio_a, x) != minuscula_utf8(inicio_b, y)) return 0;
+        x++;
+        y++;
+    }
+    return *x == *y;
+}
+
+// Lista apenas as linhas cujo campo `coluna` é igual a `valor`.
+char* listar_filtrado_handler(const char* nome_arquivo, int coluna, const char* valor, const char* msg_vazio) {
+#ifdef _WIN32
+    EnterCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_lock(&g_file_mutex);
+#endif
+    FILE *arquivo = fopen(nome_arquivo, "r");
+    if (arquivo == NULL) {
+#ifdef _WIN32
+        LeaveCriticalSection(&g_file_mutex);
+#else
+        pthread_mutex_unlock(&g_file_mutex);
+#endif
+        char* resp = malloc(strlen(msg_vazio) + 1);
+        strcpy(resp, msg_vazio);
+        return resp;
+    }
+
+    BufferResposta resposta;
+    buffer_iniciar(&resposta, "DADOS;");
+    char linha[MAX_LINHA], campo[MAX_LINHA];
+    while (fgets(linha, sizeof(linha), arquivo)) {
+        linha[strcspn(linha, "\n")] = 0;
+        if (extrair_campo(linha, coluna, campo, sizeof(campo)) && strcmp(campo, valor) == 0) {
+            buffer_anexar(&resposta, linha);
+            buffer_anexar(&resposta, "|");
+        }
+    }
+    fclose(arquivo);
+
+#ifdef _WIN32
+    LeaveCriticalSection(&g_file_mutex);
+#else
+    pthread_mutex_unlock(&g_file_mutex);
+#endif
+
+    return buffer_finalizar(&resposta);
+}
@@ -0,0 +1,138 @@
+"""Registro de frequência em partes confirmadas, com chave de idempotência, e importação de CSV."""
+import csv
+import uuid
+from datetime import datetime
+
+COMANDO_REGISTRAR_PARTE = "REGISTRAR_FREQUENCIA_PARTE"
+TAMANHO_PARTE = 100  # Alunos por parte: cerca de 1 KB, abaixo do buffer do servidor
+TENTATIVAS_ENVIO = 3
+PARALELISMO_IMPORTACAO = 4  # Lotes enviados ao mesmo tempo; igual ao tamanho do pool de conexões
+
+STATUS_FREQUENCIA = {"Presente": "P", "Falta": "F"}
+
+# --- Importação de CSV ---
+# Uma linha por aluno e dia: aluno;data;status. O cabeçalho é opcional, o
+# separador pode ser ';' ou ',' e o aluno pode vir pelo ID ou pela matrícula (RA).
+FORMATO_DATA = "%d/%m/%Y"
+FORMATOS_DATA_ACEITOS = (FORMATO_DATA, "%Y-%m-%d", "%d-%m-%Y")
+STATUS_IMPORTACAO = {"p": "P", "presente": "P", "1": "P", "f": "F", "falta": "F", "ausente": "F", "0": "F"}
+MAX_ERROS_EXIBIDOS = 10
+
+
+class EnvioFrequencia:
+    """Chamada de uma turma numa data, dividida em partes confirmadas uma a uma.
+
+    A chave (turma, data e um identificador deste envio) vai em cada parte;
+    o servidor lembra as partes já gravadas com ela, então reenviar uma parte
+    cuja confirmação se perdeu não duplica linhas. Se o envio for
+    interrompido, enviar de novo o mesmo objeto manda só as partes pendentes.
+    """
+    def __init__(self, id_turma, data, frequencias, tamanho_parte=TAMANHO_PARTE):
+        self.id_turma = id_turma
+        self.data = data
+        self.chave = f"{id_turma}-{data.replace('/', '')}-{uuid.uuid4().hex[:12]}"
+        itens = [f"{id_aluno},{status}" for id_aluno, status in frequencias]
+        self.partes = [itens[i:i + tamanho_parte] for i in range(0, len(itens), tamanho_parte)]
+        self.total_alunos = len(itens)
+        self.confirmadas = set()  # Índices das partes que o servidor confirmou
+        self.ultimo_erro = None
+
+    def pendentes(self):
+        return [i for i in range(len(self.partes)) if i not in self.confirmadas]
+
+    def comando(self, indice):
+        return (f"{COMANDO_REGISTRAR_PARTE};{self.chave};{self.id_turma};{self.data};"
+                f"{indice + 1};{len(self.partes)};" + "|".join(self.partes[indice]))
+
+    def confirmar(self, indice, resposta):
+        """Registra a resposta do servidor para a parte. Retorna True se ela foi gravada."""
+        if resposta.startswith("SUCESSO"):
+            self.confirmadas.add(indice)
+            return True
+        self.ultimo_erro = resposta.split(";", 1)[-1]
+        return False
+
+    def alunos_confirmados(self):
+        return sum(len(self.partes[i]) for i in self.confirmadas)
+
+    def concluido(self):
+        return len(self.confirmadas) == len(self.partes)
+
+    def mesma_chamada(self, id_turma, data, frequencias):
+        """Indica se a chamada exibida ainda é a deste envio (para retomar em vez de recomeçar)."""
+        itens = [f"{id_aluno},{status}" for id_aluno, status in frequencias]
+        return (id_turma, data) == (self.id_turma, self.data) and itens == [i for parte in self.partes for i in parte]
+
+
+def _normalizar_data(texto):
+    for formato in FORMATOS_DATA_ACEITOS:
+        try:
+            return datetime.strptime(texto, formato).strftime(FORMATO_DATA)
+        except ValueError:
+            pass
+    return None
+
+
+def _parece_cabecalho(campos):
+    campos = [c.strip() for c in campos] + ["", ""]
+    return _normalizar_data(campos[1]) is None and campos[2].lower() not in STATUS_IMPORTACAO
+
+
+class ImportacaoFrequencia:
+    """Chamadas lidas de um CSV, já validadas e agrupadas por (turma, data).
+
+    'alunos' são os registros de LISTAR_ALUNOS; cada aluno do arquivo é
+    procurado pelo ID ou pela matrícula, e a turma da chamada é a dele.
+    Linhas inválidas não impedem a importação das demais: ficam em 'erros'
+    como (número da linha, motivo).
+    """
+    def __init__(self, linhas, alunos, tamanho_parte=TAMANHO_PARTE):
+        por_id = {a.id: a for a in alunos}
+        por_matricula = {a.matricula: a for a in alunos}
+        chamadas = {}  # (turma, data) -> {id_aluno: status}; a última linha do aluno no dia prevalece
+        self.erros = []
+        for numero, campos in linhas:
+            campos = [c.strip() for c in campos]
+            if len(campos) < 3:
+                self.erros.append((numero, "esperado aluno, data e status"))
+                continue
+            aluno = por_id.get(campos[0]) or por_matricula.get(campos[0])
+            data = _normalizar_data(campos[1])
+            status = STATUS_IMPORTACAO.get(campos[2].lower())
+            if aluno is None:
+                self.erros.append((numero, f"aluno '{campos[0]}' não encontrado"))
+            elif data is None:
+                self.erros.append((numero, f"data '{campos[1]}' inválida"))
+            elif status is None:
+                self.erros.append((numero, f"status '{campos[2]}' inválido"))
+            else:
+                chamadas.setdefault((aluno.id_turma, data), {})[aluno.id] = status
+        self.envios = [EnvioFrequencia(id_turma, data, frequencias.items(), tamanho_parte)
+                       for (id_turma, data), frequencias in chamadas.items()]
+        self.total_alunos = sum(envio.total_alunos for envio in self.envios)
+
+    @classmethod
+    def de_arquivo(cls, caminho, alunos):
+        with open(caminho, newline="", encoding="utf-8-sig") as f:
+            amostra = f.read(4096)
+            f.seek(0)
+            try:
+                leitor = csv.reader(f, csv.Sniffer().sniff(amostra, delimiters=";,"))
+            except csv.Error:
+                leitor = csv.reader(f, delimiter=";")
+            linhas = [(numero, campos) for numero, campos in enumerate(leitor, 1) if any(campos)]
+        if linhas and _parece_cabecalho(linhas[0][1]):
+            linhas = linhas[1:]
+        return cls(linhas, alunos)
+
+    def alunos_confirmados(self):
+        return sum(envio.alunos_confirmados() for envio in self.envios)
+
+    def concluida(self):
+        return all(envio.concluido() for envio in self.envios)
+
+    def resumo_erros(self):
+        linhas = [f"Linha {numero}: {motivo}" for numero, motivo in self.erros[:MAX_ERROS_EXIBIDOS]]
+        if len(self.erros) > MAX_ERROS_EXIBIDOS:
+            linhas.append(f"... e mais {len(self.erros) - MAX_ERROS_EXIBIDOS} linha(s).")
+        return "\n".join(linhas)
@@ -0,0 +1,55 @@
+"""Gráficos do painel: figura e canvas criados uma única vez e atualizados no lugar."""
+
+
+class GraficoBarras:
+    """Gráfico de barras matplotlib embutido num frame Tk, reaproveitado entre atualizações.
+
+    Recebe os módulos matplotlib.figure e backend_tkagg já carregados (a
+    importação é adiada, ver dependencias.py). atualizar() só mexe nos
+    artistas que mudaram e pede o redesenho com draw_idle, que o Tk executa
+    uma única vez quando fica ocioso.
+    """
+    def __init__(self, master, figura, backend_tkagg, titulo, rotulo_x, rotulo_y,
+                 cor_barras, cor_texto, cor_fundo, texto_vazio="Sem dados."):
+        self.cor_barras = cor_barras
+        self.fig = figura.Figure(figsize=(5, 4), dpi=100, facecolor=cor_fundo)
+        self.ax = self.fig.add_subplot(111, facecolor=cor_fundo)
+        self.ax.set_title(titulo, color=cor_texto)
+        self.ax.set_xlabel(rotulo_x, color=cor_texto)
+        self.ax.set_ylabel(rotulo_y, color=cor_texto)
+        self.ax.tick_params(axis='x', colors=cor_texto)
+        self.ax.tick_params(axis='y', colors=cor_texto)
+        self._aviso = self.ax.text(0.5, 0.5, texto_vazio, transform=self.ax.transAxes,
+                                   ha="center", va="center", color=cor_texto, visible=False)
+
+        self.canvas = backend_tkagg.FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        self._barras = None
+        self._rotulos = None
+        self._valores = None
+
+    def atualizar(self, contagens):
+        """Exibe {rótulo: valor}. Retorna False, sem redesenhar, se nada mudou."""
+        rotulos = tuple(str(r) for r in contagens)
+        valores = tuple(contagens.values())
+        if rotulos == self._rotulos and valores == self._valores:
+            return False
+
+        if rotulos == self._rotulos:
+            for barra, valor in zip(self._barras, valores):
+                barra.set_height(valor)
+        else:
+            if self._barras is not None:
+                self._barras.remove()
+            posicoes = range(len(rotulos))
+            self._barras = self.ax.bar(posicoes, valores, color=self.cor_barras)
+            self.ax.set_xticks(posicoes)
+            self.ax.set_xticklabels(rotulos)
+            self._aviso.set_visible(not rotulos)
+            self.fig.tight_layout()  # Só quando os rótulos mudam; é a parte cara
+
+        self.ax.set_ylim(0, max(valores, default=0) * 1.1 or 1)
+        self._rotulos, self._valores = rotulos, valores
+        self.canvas.draw_idle()
+        return True
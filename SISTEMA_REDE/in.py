@@ -1,27 +1,52 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
+import logging
 import socket
+import sys
 from datetime import datetime
-import os
-
-# --- TENTATIVA DE IMPORTAR BIBLIOTECAS OPCIONAIS ---
-try:
-    from fpdf import FPDF
-    FPDF_DISPONIVEL = True
-except ImportError:
-    FPDF_DISPONIVEL = False
-
-try:
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    MATPLOTLIB_DISPONIVEL = True
-except ImportError:
-    MATPLOTLIB_DISPONIVEL = False
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from auditoria import Auditoria
+from analise_frequencia import LIMITE_ALERTA, LIMITE_FALTAS, REGULAR, REPROVADO_FALTA, QuadroFrequencia
+from dependencias import DependenciaOpcional, marcar, relatorio_inicializacao
+from frequencia import (PARALELISMO_IMPORTACAO, STATUS_FREQUENCIA, TENTATIVAS_ENVIO, EnvioFrequencia,
+                        ImportacaoFrequencia)
+from graficos import GraficoBarras
+from logs import ConsultaLogs, prefixo_data_valido
+from rede import (CHAVE_TOTAL, COMANDO_CONTAR, COMANDOS_CACHEAVEIS, MAX_COMANDOS_LOTE, CacheRespostas,
+                  PoolConexoes, enviar_frame, iguais_sem_caixa, montar_lote, nome_comando, receber_frame,
+                  receber_frame_em_partes, separar_lote)
+from notas import COMANDO_LISTAR_NOTAS, COMANDO_LISTAR_NOTAS_ALUNO, IndiceNotas, QuadroNotas, formatar_nota
+from notificacoes import CanalAlteracoes, listagens_afetadas
+from registros import Aluno, Financeiro, Frequencia, Nota, iterar_registros, ler_resposta
+from replica import Replica
+from tabelas import TabelaChaveada, TabelaVirtual
+from tarefas import ExecutorTk
+from usuarios import RepositorioUsuarios, versao_registro
+
+# --- BIBLIOTECAS OPCIONAIS ---
+# Só se verifica se estão instaladas; a importação fica para o primeiro uso,
+# então sessões que nunca desenham um gráfico não pagam por ela.
+FPDF = DependenciaOpcional("fpdf")
+MATPLOTLIB = DependenciaOpcional("matplotlib", "matplotlib.figure", "matplotlib.backends.backend_tkagg")
+FPDF_DISPONIVEL = FPDF.disponivel()
+MATPLOTLIB_DISPONIVEL = MATPLOTLIB.disponivel()
+
+marcar("módulos do cliente importados")
 
 # --- Configurações do Cliente de Rede ---
 HOST = '127.0.0.1'
 PORTA = 8080
 ARQUIVO_USUARIOS = "usuarios.csv"
+RESPOSTA_SEM_CONEXAO = "ERRO;Falha na conexao"
+ARQUIVO_REGISTRO = "cliente.log"  # Avisos internos do cliente (ex.: entradas de auditoria recusadas)
+INTERVALO_AVISO_CONEXAO = 5.0 # Segundos entre avisos de servidor fora do ar
+IDADE_MAXIMA_ABA = 60.0 # Segundos até uma aba já carregada ser recarregada ao ser exibida de novo
+INTERVALO_AUTO_DASHBOARD_MS = 60000 # Atualização automática do dashboard enquanto visível (0 desliga)
+INTERVALO_ACOMPANHAR_LOG_MS = 5000 # Busca de novas entradas do log no modo de acompanhamento
+ESPERA_ENCERRAR_REPLICA = 3.0 # Segundos para a réplica local terminar uma sincronização ao fechar
+ESPERA_ENCERRAR_AVISOS = 1.0 # Segundos para o canal de avisos de alteração fechar a conexão
 
 # --- Estilos e Cores ---
 COR_FUNDO = "#2e2e2e"
@@ -36,19 +61,362 @@ FONTE_LABEL = ("Arial", 11, "bold")
 
 # --- Cliente de Rede e Funções de Login/Dados ---
 class ClienteServidor:
-    def enviar_comando(self, comando):
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((HOST, PORTA))
-                s.sendall(comando.encode('utf-8'))
-                resposta = s.recv(8192).decode('utf-8') # Aumentado o buffer de recebimento
+    def __init__(self, usar_pool=True, executor=None, usar_cache=True, usar_replica=True,
+                 usar_notificacoes=True):
+        # Com o pool, os sockets ficam abertos e são reaproveitados entre comandos.
+        self.pool = PoolConexoes(HOST, PORTA) if usar_pool else None
+        # Listagens de referência (turmas, matérias...) são reaproveitadas até expirar
+        # ou até uma escrita bem-sucedida deste cliente invalidá-las.
+        self.cache = CacheRespostas() if usar_cache else None
+        # Notas já carregadas; os lançamentos deste cliente são aplicados nelas na hora.
+        self.notas = IndiceNotas()
+        # Presenças e faltas por aluno; cada atualização lê só as linhas novas do servidor.
+        self.frequencias = QuadroFrequencia()
+        # Executor que tira as requisições da thread do Tk (ver enviar_comando_async).
+        self.executor = executor
+        self._ultimo_aviso_conexao = 0.0
+        self._lote_suportado = True  # Vira False se o servidor for antigo e não conhecer LOTE
+        # Entradas do log de atividades: vão em lotes, por uma thread própria, sem atrasar a ação auditada.
+        # Entradas recusadas vão para o logging (ver ARQUIVO_REGISTRO), nunca de volta à auditoria.
+        self.auditoria = Auditoria(self._enviar_lote, RESPOSTA_SEM_CONEXAO)
+        # Cópia local das tabelas: responde as listagens do disco, mesmo sem servidor,
+        # e guarda notas e chamadas lançadas enquanto ele está fora do ar.
+        self.replica = None
+        if usar_replica:
+            self.replica = Replica(self._enviar_lote_ao_servidor, RESPOSTA_SEM_CONEXAO,
+                                   ao_descartar=lambda mensagem: self.registrar_log(f"Replica local: {mensagem}"))
+        # Avisos de alteração: as telas assinam as tabelas que mostram e só recarregam quando elas mudam.
+        self.alteracoes = None
+        if usar_notificacoes:
+            self.alteracoes = CanalAlteracoes(HOST, PORTA)
+            self.alteracoes.assinar(None, self._ao_alterar)
+
+    def _enviar(self, comando):
+        """Envia o comando sem tocar na interface; pode ser chamado de qualquer thread."""
+        if self.replica is not None:
+            resposta = self.replica.responder(comando)
+            if resposta is not None:
                 return resposta
-        except ConnectionRefusedError:
-            messagebox.showerror("Erro de Conexão", f"Não foi possível conectar ao servidor em {HOST}:{PORTA}.\nVerifique se o programa em C (servidor) está em execução.")
-            return "ERRO;Falha na conexao"
+        if self.cache is None:
+            resposta = self._registrar_resposta(comando, self._enviar_ao_servidor(comando))
+        else:
+            resposta = self.cache.obter(comando)
+            if resposta is not None:
+                return resposta
+            geracao = self.cache.geracao(comando)
+            resposta = self._registrar_resposta(comando, self._enviar_ao_servidor(comando))
+            self.cache.registrar(comando, resposta, geracao)
+        self.notas.aplicar(comando, resposta)
+        return resposta
+
+    def _registrar_resposta(self, comando, resposta):
+        if self.replica is not None:
+            resposta = self.replica.registrar_escrita(comando, resposta)
+        if self.alteracoes is not None:
+            self.alteracoes.publicar(comando, resposta)
+        return resposta
+
+    def _enviar_ao_servidor(self, comando):
+        try:
+            if self.pool is not None:
+                return self.pool.executar(comando)
+            with socket.create_connection((HOST, PORTA)) as s:
+                enviar_frame(s, comando)
+                return receber_frame(s)
+        except OSError:  # Recusada, expirada ou derrubada: o servidor não está acessível
+            return RESPOSTA_SEM_CONEXAO
         except Exception as e:
             return f"ERRO;{e}"
 
+    def _enviar_lote(self, comandos):
+        """Como _enviar, para uma lista de comandos, numa única ida ao servidor."""
+        respostas = [None] * len(comandos)
+        geracoes = {}
+        pendentes = []
+        for i, comando in enumerate(comandos):
+            if self.replica is not None:
+                respostas[i] = self.replica.responder(comando)
+                if respostas[i] is not None:
+                    continue
+            if self.cache is not None:
+                respostas[i] = self.cache.obter(comando)
+                geracoes[i] = self.cache.geracao(comando)
+            if respostas[i] is None:
+                pendentes.append(i)
+
+        for inicio in range(0, len(pendentes), MAX_COMANDOS_LOTE):
+            indices = pendentes[inicio:inicio + MAX_COMANDOS_LOTE]
+            for i, resposta in zip(indices, self._enviar_lote_ao_servidor([comandos[i] for i in indices])):
+                respostas[i] = resposta = self._registrar_resposta(comandos[i], resposta)
+                if self.cache is not None:
+                    self.cache.registrar(comandos[i], resposta, geracoes[i])
+                self.notas.aplicar(comandos[i], resposta)
+        return respostas
+
+    def _enviar_lote_ao_servidor(self, comandos):
+        if len(comandos) == 1 or not self._lote_suportado:
+            return [self._enviar_ao_servidor(comando) for comando in comandos]
+
+        resposta = self._enviar_ao_servidor(montar_lote(comandos))
+        respostas = separar_lote(resposta, len(comandos))
+        if respostas is not None:
+            return respostas
+        if resposta.startswith("ERRO;Comando 'LOTE'"):
+            self._lote_suportado = False
+            return [self._enviar_ao_servidor(comando) for comando in comandos]
+        return [resposta] * len(comandos)  # Falha de conexão vale para o lote inteiro
+
+    def _avisar_se_sem_conexao(self, resposta):
+        # Várias requisições simultâneas falham juntas; um aviso basta.
+        agora = time.monotonic()
+        if resposta == RESPOSTA_SEM_CONEXAO and agora - self._ultimo_aviso_conexao > INTERVALO_AVISO_CONEXAO:
+            self._ultimo_aviso_conexao = agora
+            messagebox.showerror("Erro de Conexão", f"Não foi possível conectar ao servidor em {HOST}:{PORTA}.\nVerifique se o programa em C (servidor) está em execução.")
+
+    def enviar_comando(self, comando):
+        resposta = self._enviar(comando)
+        self._avisar_se_sem_conexao(resposta)
+        return resposta
+
+    def enviar_lote(self, comandos):
+        """Envia vários comandos de uma vez e retorna as respostas na mesma ordem.
+
+        Cada resposta é uma resposta comum do servidor, para processar_resposta_servidor.
+        """
+        respostas = self._enviar_lote(comandos)
+        self._avisar_se_sem_conexao(respostas[0] if respostas else None)
+        return respostas
+
+    def enviar_comando_async(self, comando, ao_concluir, chave=None):
+        """Envia o comando numa thread de apoio; ao_concluir(resposta) roda na thread do Tk.
+
+        Uma nova requisição com a mesma chave substitui a anterior ainda pendente.
+        """
+        def entregar(resposta):
+            self._avisar_se_sem_conexao(resposta)
+            ao_concluir(resposta)
+        return self.executor.submeter(self._enviar, comando, ao_concluir=entregar, chave=chave)
+
+    def enviar_comandos_async(self, comandos, ao_concluir, chave=None):
+        """Como enviar_lote, numa thread de apoio; ao_concluir recebe a lista de respostas."""
+        def entregar(respostas):
+            for resposta in respostas:
+                self._avisar_se_sem_conexao(resposta)
+            ao_concluir(respostas)
+        return self.executor.submeter(self._enviar_lote, list(comandos), ao_concluir=entregar, chave=chave)
+
+    # --- Listagens em registros tipados ---
+    def _consultar_registros(self, comando, tipo_registro):
+        """Retorna (tipo, dados) como em registros.ler_resposta, lendo a resposta direto do socket."""
+        if self.replica is not None:
+            resposta = self.replica.responder(comando)
+            if resposta is not None:
+                return ler_resposta((resposta,), tipo_registro)
+        if self.cache is not None and nome_comando(comando) in COMANDOS_CACHEAVEIS:
+            return ler_resposta((self._enviar(comando),), tipo_registro)
+        try:
+            if self.pool is not None:
+                return ler_resposta(self.pool.executar_em_partes(comando), tipo_registro)
+            with socket.create_connection((HOST, PORTA)) as s:
+                enviar_frame(s, comando)
+                return ler_resposta(receber_frame_em_partes(s), tipo_registro)
+        except OSError:  # Recusada, expirada ou derrubada: o mesmo aviso de _enviar_ao_servidor
+            return ler_resposta((RESPOSTA_SEM_CONEXAO,))
+        except Exception as e:
+            return "ERRO", str(e)
+
+    def consultar_registros_async(self, comando, tipo_registro, ao_concluir, chave=None):
+        """Lê uma listagem em registros tipados numa thread de apoio, à medida que chega.
+
+        ao_concluir(tipo, dados) roda na thread do Tk e recebe o mesmo que
+        processar_resposta_servidor retornaria, com registros no lugar das listas.
+        """
+        def entregar(resultado):
+            tipo, dados = resultado
+            if tipo != "DADOS":
+                resposta = f"{tipo};{dados}"
+                self._avisar_se_sem_conexao(resposta)
+                tipo, dados = processar_resposta_servidor(resposta)
+            ao_concluir(tipo, dados)
+        return self.executor.submeter(self._consultar_registros, comando, tipo_registro, ao_concluir=entregar, chave=chave)
+
+    # --- Notas ---
+    def quadro_notas_async(self, ao_concluir, comando=COMANDO_LISTAR_NOTAS, chave=None):
+        """Carrega as notas num QuadroNotas já calculado, tudo numa thread de apoio.
+
+        ao_concluir(quadro, materias) roda na thread do Tk; 'materias' mapeia
+        o id de cada matéria ao seu registro e 'quadro' é None se as notas não
+        puderam ser lidas (o erro já foi exibido). Um quadro ainda válido no
+        índice de notas é reaproveitado sem ir ao servidor.
+        """
+        def carregar():
+            quadro = self.notas.obter(comando)
+            if quadro is not None:
+                return "DADOS", None, quadro, self._enviar("LISTAR_MATERIAS")
+            geracao = self.notas.geracao()
+            tipo, notas = self._consultar_registros(comando, Nota)
+            if tipo in ("DADOS", "VAZIO"):
+                quadro = QuadroNotas(notas if tipo == "DADOS" else ())
+                quadro.calcular()
+                self.notas.guardar(comando, quadro, geracao)
+            return tipo, notas, quadro, self._enviar("LISTAR_MATERIAS")
+
+        def entregar(resultado):
+            tipo, notas, quadro, resposta_materias = resultado
+            if quadro is None:
+                resposta = f"{tipo};{notas}"
+                self._avisar_se_sem_conexao(resposta)
+                processar_resposta_servidor(resposta)
+            tipo_materias, materias = processar_resposta_servidor(resposta_materias)
+            ao_concluir(quadro, {m[0]: m for m in materias} if tipo_materias == "DADOS" else {})
+        return self.executor.submeter(carregar, ao_concluir=entregar, chave=chave)
+
+    # --- Frequência ---
+    def enviar_frequencias(self, envios, ao_progresso=None, tentativas=TENTATIVAS_ENVIO, paralelo=1):
+        """Envia as partes pendentes dos EnvioFrequencia e retorna se todas foram confirmadas.
+
+        As partes de todos os envios são reunidas em lotes (vários por ida ao
+        servidor), e até 'paralelo' lotes seguem ao mesmo tempo. Cada parte é
+        confirmada separadamente e as que falharem são repetidas. Pode ser
+        chamado de qualquer thread; ao_progresso(gravados, total), em alunos,
+        é chamado após cada lote.
+        """
+        total = sum(envio.total_alunos for envio in envios)
+        gravados = sum(envio.alunos_confirmados() for envio in envios)
+        with ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix="conectapro-frequencia") as executor:
+            for _ in range(tentativas):
+                pendentes = [(envio, i) for envio in envios for i in envio.pendentes()]
+                if not pendentes:
+                    break
+                lotes = [pendentes[i:i + MAX_COMANDOS_LOTE] for i in range(0, len(pendentes), MAX_COMANDOS_LOTE)]
+                comandos = [[envio.comando(i) for envio, i in lote] for lote in lotes]
+                # As threads só enviam; as confirmações são aplicadas aqui, numa única thread.
+                for lote, respostas in zip(lotes, executor.map(self._enviar_lote, comandos)):
+                    for (envio, i), resposta in zip(lote, respostas):
+                        if envio.confirmar(i, resposta):
+                            gravados += len(envio.partes[i])
+                    if ao_progresso is not None:
+                        ao_progresso(gravados, total)
+        return all(envio.concluido() for envio in envios)
+
+    def enviar_frequencias_async(self, envios, ao_concluir, ao_progresso=None, paralelo=1, chave=None):
+        """Como enviar_frequencias, numa thread de apoio; ao_concluir(concluido) e ao_progresso rodam na thread do Tk."""
+        progresso = None
+        if ao_progresso is not None:
+            progresso = lambda gravados, total: self.executor.notificar(ao_progresso, gravados, total)
+        return self.executor.submeter(self.enviar_frequencias, envios, progresso, TENTATIVAS_ENVIO, paralelo,
+                                      ao_concluir=ao_concluir, chave=chave)
+
+    def analise_frequencia_async(self, ao_concluir, chave=None):
+        """Traz o quadro de frequência em dia com o servidor, numa thread de apoio.
+
+        Só as linhas gravadas desde a última atualização são lidas e contadas.
+        ao_concluir(quadro, alunos) roda na thread do Tk; 'alunos' mapeia o id
+        de cada aluno ao seu registro e 'quadro' é None se a frequência não
+        pôde ser lida (o erro já foi exibido).
+        """
+        def carregar():
+            tipo, dados = self.frequencias.sincronizar(lambda comando: self._consultar_registros(comando, Frequencia))
+            tipo_alunos, alunos = self._consultar_registros("LISTAR_ALUNOS", Aluno)
+            return tipo, dados, {a.id: a for a in alunos} if tipo_alunos == "DADOS" else {}
+
+        def entregar(resultado):
+            tipo, dados, alunos = resultado
+            if tipo not in ("DADOS", "VAZIO"):
+                resposta = f"{tipo};{dados}"
+                self._avisar_se_sem_conexao(resposta)
+                processar_resposta_servidor(resposta)
+                ao_concluir(None, alunos)
+                return
+            ao_concluir(self.frequencias, alunos)
+        return self.executor.submeter(carregar, ao_concluir=entregar, chave=chave)
+
+    def preparar_importacao_frequencia(self, caminho):
+        """Lê e valida um CSV de frequência (ver ImportacaoFrequencia), conferindo os alunos com LISTAR_ALUNOS."""
+        tipo, alunos = self._consultar_registros("LISTAR_ALUNOS", Aluno)
+        if tipo not in ("DADOS", "VAZIO"):
+            raise ConnectionError(alunos)
+        return ImportacaoFrequencia.de_arquivo(caminho, alunos if tipo == "DADOS" else ())
+
+    # --- Consultas filtradas no servidor ---
+    # Sem ao_concluir a chamada é síncrona e retorna a resposta; com ele, roda em segundo plano.
+    def buscar_aluno(self, nome_ou_ra, ao_concluir=None, chave=None):
+        return self._consultar(f"BUSCAR_ALUNO;{nome_ou_ra}", ao_concluir, chave)
+
+    def listar_alunos_da_turma(self, id_turma, ao_concluir=None, chave=None):
+        return self._consultar(f"LISTAR_ALUNOS_TURMA;{id_turma}", ao_concluir, chave)
+
+    def listar_mensagens_da_turma(self, id_turma, ao_concluir=None, chave=None):
+        return self._consultar(f"LISTAR_MENSAGENS_TURMA;{id_turma}", ao_concluir, chave)
+
+    # --- Contagens calculadas no servidor ---
+    def contar(self, agrupamentos, ao_concluir=None, chave=None):
+        """Retorna {agrupamento: {valor: quantidade}} para os agrupamentos pedidos (ver CONTAR em en.c).
+
+        Todos vão num único lote. Sem ao_concluir a chamada é síncrona; com
+        ele, ao_concluir(contagens) roda na thread do Tk. Agrupamentos cuja
+        resposta foi um erro ficam de fora do resultado.
+        """
+        agrupamentos = list(agrupamentos)
+        comandos = [f"{COMANDO_CONTAR};{agrupamento}" for agrupamento in agrupamentos]
+        if ao_concluir is None:
+            return ler_contagens(agrupamentos, self.enviar_lote(comandos))
+        return self.enviar_comandos_async(
+            comandos, lambda respostas: ao_concluir(ler_contagens(agrupamentos, respostas)), chave=chave)
+
+    def _consultar(self, comando, ao_concluir, chave):
+        if ao_concluir is None:
+            return self.enviar_comando(comando)
+        return self.enviar_comando_async(comando, ao_concluir, chave=chave)
+
+    def _ao_alterar(self, alteradas):
+        # Na thread do canal, antes das telas: o que elas forem ler já não vem de cópias antigas.
+        if self.replica is not None:
+            self.replica.sujar(alteradas)
+        listagens = listagens_afetadas(alteradas)
+        if listagens:
+            self.invalidar_cache(*listagens)
+        if "NOTAS" in alteradas:
+            self.notas.invalidar()
+
+    def assinar_alteracoes(self, tabelas, ao_alterar):
+        """ao_alterar({tabela: versão}) roda na thread do Tk quando alguma das tabelas muda. Retorna o id."""
+        if self.alteracoes is None or self.executor is None:
+            return None
+        self.executor.ouvir()
+        return self.alteracoes.assinar(tabelas, lambda alteradas: self.executor.notificar(ao_alterar, alteradas))
+
+    def cancelar_assinatura(self, assinatura):
+        if assinatura is not None and self.alteracoes.cancelar(assinatura):
+            self.executor.deixar_de_ouvir()
+
+    def avisos_ativos(self):
+        """Se o servidor está avisando as alterações (então não é preciso consultá-lo periodicamente)."""
+        return self.alteracoes is not None and self.alteracoes.conectado
+
+    def invalidar_cache(self, *comandos):
+        if self.cache is not None:
+            self.cache.invalidar(*comandos)
+
+    def cancelar_pendentes(self):
+        if self.executor is not None:
+            self.executor.cancelar_todos()
+
+    def registrar_log(self, mensagem):
+        """Registra uma ação no log do servidor sem esperar a resposta (ver auditoria.py)."""
+        self.auditoria.registrar(mensagem)
+
+    def fechar(self):
+        if self.executor is not None:
+            self.executor.encerrar()
+        self.auditoria.encerrar()
+        if self.replica is not None:
+            self.replica.encerrar(ESPERA_ENCERRAR_REPLICA)
+        if self.alteracoes is not None:
+            self.alteracoes.encerrar(ESPERA_ENCERRAR_AVISOS)
+        if self.pool is not None:
+            self.pool.fechar()
+
 def processar_resposta_servidor(resposta):
     """Função centralizada para processar e validar todas as respostas do servidor."""
     if not resposta:
@@ -67,8 +435,7 @@ def processar_resposta_servidor(resposta):
         return tipo, []
     
     if tipo == "DADOS":
-        if not dados_str: return tipo, []
-        return tipo, [item.split(';') for item in dados_str.split('|')]
+        return tipo, list(iterar_registros((dados_str,)))
     
     if tipo in ["SUCESSO", "IA_RESULTADO"]:
         return tipo, dados_str
@@ -76,69 +443,39 @@ def processar_resposta_servidor(resposta):
     messagebox.showwarning("Aviso", f"Resposta desconhecida do servidor: {resposta}")
     return None, None
 
+def ler_contagens(agrupamentos, respostas):
+    """Converte as respostas de CONTAR em {agrupamento: {valor: quantidade}}."""
+    contagens = {}
+    for agrupamento, resposta in zip(agrupamentos, respostas):
+        tipo, linhas = processar_resposta_servidor(resposta)
+        if tipo in ("DADOS", "VAZIO"):
+            contagens[agrupamento] = {linha[0]: int(linha[1]) for linha in linhas if len(linha) > 1}
+    return contagens
+
+# Índice em memória dos usuários locais, carregado no primeiro acesso.
+repositorio_usuarios = RepositorioUsuarios(ARQUIVO_USUARIOS)
+
 def verificar_login_local(usuario, senha):
     if usuario == "admin" and senha == "admin":
         return "Admin", "ativo"
-    
-    if not os.path.exists(ARQUIVO_USUARIOS):
-        return None, None
-        
-    with open(ARQUIVO_USUARIOS, "r", encoding="utf-8") as f:
-        for linha in f:
-            try:
-                partes = linha.strip().split(';')
-                u, s, perfil, status = partes[0], partes[1], partes[2], partes[3]
-                if u == usuario and s == senha:
-                    return perfil, status
-            except (ValueError, IndexError):
-                continue
-    return None, None
+    return repositorio_usuarios.autenticar(usuario, senha)
 
 def registrar_usuario_local(usuario, senha, perfil, status="ativo"):
-    if not os.path.exists(ARQUIVO_USUARIOS):
-        with open(ARQUIVO_USUARIOS, "w", encoding="utf-8"): pass
-    
-    with open(ARQUIVO_USUARIOS, "r+", encoding="utf-8") as f:
-        linhas = f.readlines()
-        for linha in linhas:
-            if linha.strip().split(';')[0] == usuario:
-                return False, "Usuário já existe."
-        f.write(f"{usuario};{senha};{perfil};{status}\n")
-    return True, "Usuário registrado com sucesso."
+    return repositorio_usuarios.registrar(usuario, senha, perfil, status)
 
 def ler_usuarios_local():
-    if not os.path.exists(ARQUIVO_USUARIOS):
-        return []
-    with open(ARQUIVO_USUARIOS, "r", encoding="utf-8") as f:
-        usuarios = []
-        for linha in f:
-            if linha.strip():
-                partes = linha.strip().split(';')
-                while len(partes) < 4:
-                    partes.append('ativo') 
-                usuarios.append(partes)
-        return usuarios
-
-def excluir_usuario_local(usuario_para_excluir):
-    usuarios = ler_usuarios_local()
-    usuarios_atualizados = [u for u in usuarios if u[0] != usuario_para_excluir]
-    
-    with open(ARQUIVO_USUARIOS, "w", encoding="utf-8") as f:
-        for u in usuarios_atualizados:
-            f.write(f"{';'.join(u)}\n")
-    return True
-
-def autorizar_usuario_local(usuario_para_autorizar):
-    usuarios = ler_usuarios_local()
-    for u in usuarios:
-        if u[0] == usuario_para_autorizar:
-            u[3] = "ativo"
-            break
-    
-    with open(ARQUIVO_USUARIOS, "w", encoding="utf-8") as f:
-        for u in usuarios:
-            f.write(f"{';'.join(u)}\n")
-    return True
+    return repositorio_usuarios.listar()
+
+def contar_usuarios_por_perfil_local():
+    return repositorio_usuarios.contar_por_perfil()
+
+def excluir_usuario_local(usuario_para_excluir, versao=None):
+    return repositorio_usuarios.excluir(usuario_para_excluir, versao)
+
+def autorizar_usuario_local(usuario_para_autorizar, versao=None):
+    return repositorio_usuarios.autorizar(usuario_para_autorizar, versao)
+
+MENSAGEM_CONFLITO = "O registro de '{}' foi alterado por outra estação.\nA lista foi atualizada; confira e tente novamente."
     
 # --- Classes Auxiliares ---
 class HoverButton(ttk.Button):
@@ -154,11 +491,45 @@ class HoverButton(ttk.Button):
     def on_leave(self, event):
         self.config(style="TButton")
 
+class AbaSobDemanda:
+    """Aba montada só quando é exibida pela primeira vez.
+
+    Guarda desde quando os dados estão desatualizados; ao ser exibida de novo,
+    a aba só é recarregada se foi marcada como desatualizada ou se os dados
+    passaram da idade máxima.
+    """
+    __slots__ = ("frame", "criar", "atualizar", "idade_maxima", "montada", "carregada_em", "desatualizada_desde")
+
+    def __init__(self, frame, criar, atualizar=None, idade_maxima=IDADE_MAXIMA_ABA):
+        self.frame = frame
+        self.criar = criar  # criar(frame) monta a tela e já carrega os dados
+        self.atualizar = atualizar
+        self.idade_maxima = idade_maxima
+        self.montada = False
+        self.carregada_em = 0.0
+        self.desatualizada_desde = None
+
+    def exibir(self):
+        agora = time.monotonic()
+        if not self.montada:
+            self.montada = True
+            self.criar(self.frame)
+        elif self.atualizar is not None and (self.desatualizada_desde is not None or agora - self.carregada_em >= self.idade_maxima):
+            self.atualizar()
+        else:
+            return
+        self.carregada_em = agora
+        self.desatualizada_desde = None
+
+    def marcar_desatualizada(self):
+        if self.montada and self.desatualizada_desde is None:
+            self.desatualizada_desde = time.monotonic()
+
 # --- Classe Principal da Aplicação ---
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
-        self.cliente = ClienteServidor()
+        self.cliente = ClienteServidor(executor=ExecutorTk(self))
         self.title("ConectaPro - Sistema de Gestão Acadêmica")
         self.geometry("450x400")
         self.configure(bg=COR_FUNDO)
@@ -202,6 +573,8 @@ class App(tk.Tk):
         self.trocar_frame(TelaLogin)
 
     def trocar_frame(self, frame_class, dados_usuario=None):
+        # Respostas pendentes da tela anterior não devem chegar a widgets destruídos.
+        self.cliente.cancelar_pendentes()
         if self._frame is not None:
             self._frame.destroy()
         self._frame = frame_class(self.container, self, dados_usuario=dados_usuario)
@@ -250,11 +623,11 @@ class TelaLogin(tk.Frame):
         elif perfil == "Professor":
             self.controller.trocar_frame(PainelProfessor, dados_usuario={"nome": usuario})
         elif perfil == "Aluno":
-            resposta = self.controller.cliente.enviar_comando("LISTAR_ALUNOS")
+            resposta = self.controller.cliente.buscar_aluno(usuario)
             tipo, alunos = processar_resposta_servidor(resposta)
             if tipo == "DADOS":
                 for aluno in alunos:
-                    if len(aluno) > 1 and aluno[1].lower() == usuario.lower():
+                    if len(aluno) > 1 and iguais_sem_caixa(aluno[1], usuario):
                         dados_aluno = {"id": aluno[0], "nome": aluno[1], "turma_id": aluno[5]}
                         self.controller.trocar_frame(PainelAluno, dados_usuario=dados_aluno)
                         return
@@ -263,6 +636,18 @@ class TelaLogin(tk.Frame):
             messagebox.showerror("Erro de Login", "Usuário ou senha inválidos.")
 
 # --- Painel do Administrador ---
+# Tabela do servidor -> abas do administrador que a mostram (chaves de PainelAdmin.abas_por_chave).
+ABAS_POR_TABELA = {
+    "CURSOS": ("cursos", "materias"),
+    "MATERIAS": ("materias", "aprovacao"),
+    "TURMAS": ("turmas", "dashboard"),
+    "ALUNOS": ("ver_alunos", "faltas", "dashboard"),
+    "ATIVIDADES": ("ver_atividades",),
+    "NOTAS": ("ver_notas", "aprovacao"),
+    "FREQUENCIA": ("ver_frequencia", "faltas"),
+    "FINANCEIRO": ("financeiro",),
+}
+
 class PainelAdmin(tk.Frame):
     def __init__(self, parent, controller, dados_usuario=None):
         super().__init__(parent, bg=COR_FUNDO)
@@ -270,48 +655,66 @@ class PainelAdmin(tk.Frame):
         self.controller.geometry("1024x768")
         tk.Label(self, text="ConectaPro - Painel do Administrador", font=FONTE_TITULO, bg=COR_FUNDO, fg=COR_TEXTO).pack(pady=10)
 
+        # Cada aba (e sub-aba) só é montada e carregada quando o usuário a abre.
+        self.abas = {}  # nome do frame no Tk -> AbaSobDemanda
+        self.abas_por_chave = {}
+
         notebook = ttk.Notebook(self)
         notebook.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        frame_dashboard = ttk.Frame(notebook)
-        frame_gestao_academica = ttk.Frame(notebook)
-        frame_gestao_usuarios = ttk.Frame(notebook)
-        frame_visualizacao = ttk.Frame(notebook)
-        frame_financeiro = ttk.Frame(notebook) # NOVA ABA
-        frame_sistema = ttk.Frame(notebook)
-
-        notebook.add(frame_dashboard, text="Dashboard")
-        notebook.add(frame_gestao_academica, text="Gestão Acadêmica")
-        notebook.add(frame_gestao_usuarios, text="Gestão de Usuários")
-        notebook.add(frame_visualizacao, text="Visualizar Dados")
-        notebook.add(frame_financeiro, text="Financeiro") # NOVA ABA
-        notebook.add(frame_sistema, text="Sistema")
 
         HoverButton(self, text="Logout", command=lambda: self.controller.trocar_frame(TelaLogin)).pack(pady=10)
-        
-        self.criar_tela_dashboard(frame_dashboard)
-        self.criar_tela_gestao_academica(frame_gestao_academica)
-        self.criar_tela_gestao_usuarios(frame_gestao_usuarios)
-        self.criar_tela_visualizar_dados(frame_visualizacao)
-        self.criar_tela_financeiro(frame_financeiro) # NOVA ABA
-        self.criar_tela_sistema(frame_sistema)
+
+        self.adicionar_aba(notebook, "Dashboard", self.criar_tela_dashboard, self.atualizar_dashboard, "dashboard", 0)
+        self.adicionar_aba(notebook, "Gestão Acadêmica", self.criar_tela_gestao_academica)
+        self.adicionar_aba(notebook, "Gestão de Usuários", self.criar_tela_gestao_usuarios)
+        self.adicionar_aba(notebook, "Visualizar Dados", self.criar_tela_visualizar_dados)
+        self.adicionar_aba(notebook, "Financeiro", self.criar_tela_financeiro, self.atualizar_financeiro, chave="financeiro")
+        self.adicionar_aba(notebook, "Sistema", self.criar_tela_sistema)
 
         notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
-        self.atualizar_dashboard()
+        self.exibir_aba(notebook.select())
+        self._assinatura = self.controller.cliente.assinar_alteracoes(ABAS_POR_TABELA, self.ao_alterar_dados)
+
+    def adicionar_aba(self, notebook, texto, criar, atualizar=None, chave=None, idade_maxima=IDADE_MAXIMA_ABA):
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text=texto)
+        aba = AbaSobDemanda(frame, criar, atualizar, idade_maxima)
+        self.abas[str(frame)] = aba
+        if chave is not None:
+            self.abas_por_chave[chave] = aba
+
+    def criar_sub_abas(self, parent, abas):
+        """Cria um notebook interno cujas abas também são montadas sob demanda."""
+        notebook = ttk.Notebook(parent)
+        notebook.pack(fill='both', expand=True, padx=5, pady=5)
+        for aba in abas:
+            self.adicionar_aba(notebook, *aba)
+        notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
+        self.exibir_aba(notebook.select())
+
+    def exibir_aba(self, nome_frame):
+        aba = self.abas.get(str(nome_frame))
+        if aba is not None:
+            aba.exibir()
+
+    def marcar_desatualizadas(self, *chaves):
+        """Faz as abas indicadas recarregarem na próxima vez que forem exibidas."""
+        for chave in chaves:
+            aba = self.abas_por_chave.get(chave)
+            if aba is not None:
+                aba.marcar_desatualizada()
 
     def on_tab_change(self, event):
-        selected_tab = event.widget.tab(event.widget.index("current"), "text")
-        if selected_tab == "Dashboard":
-            self.atualizar_dashboard()
+        self.exibir_aba(event.widget.select())
 
-    def on_gestao_academica_tab_change(self, event):
-        selected_tab = event.widget.tab(event.widget.index("current"), "text")
-        if selected_tab == "Matérias":
-            self.atualizar_materias()
-        elif selected_tab == "Cursos":
-            self.atualizar_cursos()
-        elif selected_tab == "Turmas":
-            self.atualizar_turmas()
+    def ao_alterar_dados(self, alteradas):
+        """Recarrega na hora as abas à vista que mostram as tabelas alteradas; as outras, quando forem abertas."""
+        chaves = {chave for tabela in alteradas for chave in ABAS_POR_TABELA.get(tabela, ())}
+        self.marcar_desatualizadas(*chaves)
+        for chave in chaves:
+            aba = self.abas_por_chave.get(chave)
+            if aba is not None and aba.montada and aba.frame.winfo_ismapped():
+                aba.exibir()
 
     def criar_tela_dashboard(self, parent):
         parent.columnconfigure(0, weight=1)
@@ -333,112 +736,88 @@ class PainelAdmin(tk.Frame):
         
         self.frame_grafico = ttk.LabelFrame(parent, text="Alunos por Turma")
         self.frame_grafico.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
+        self.grafico_turmas = None  # Criado no primeiro dado recebido e reaproveitado depois
+        self._auto_dashboard = None
+        self.agendar_auto_dashboard()
+
+    def agendar_auto_dashboard(self):
+        if INTERVALO_AUTO_DASHBOARD_MS:
+            self._auto_dashboard = self.after(INTERVALO_AUTO_DASHBOARD_MS, self.auto_atualizar_dashboard)
+
+    def auto_atualizar_dashboard(self):
+        # Só busca enquanto a aba está à vista e sem avisos de alteração do servidor
+        # (com eles, ver ao_alterar_dados); o gráfico só redesenha se as contagens mudarem.
+        if self.frame_grafico.winfo_ismapped() and not self.controller.cliente.avisos_ativos():
+            self.atualizar_dashboard()
+        self.agendar_auto_dashboard()
 
-    def atualizar_dashboard(self):
-        usuarios = ler_usuarios_local()
-        self.lbl_total_users.config(text=f"Total de Usuários: {len(usuarios)}")
-        self.lbl_professores.config(text=f"Professores: {sum(1 for u in usuarios if len(u) > 2 and u[2] == 'Professor')}")
-        self.lbl_alunos_users.config(text=f"Alunos (usuários): {sum(1 for u in usuarios if len(u) > 2 and u[2] == 'Aluno')}")
-
-        resp_turmas = self.controller.cliente.enviar_comando("LISTAR_TURMAS")
-        tipo, turmas = processar_resposta_servidor(resp_turmas)
-        self.lbl_total_turmas.config(text=f"Total de Turmas: {len(turmas) if tipo else 0}")
+    def destroy(self):
+        self.controller.cliente.cancelar_assinatura(getattr(self, "_assinatura", None))
+        self._assinatura = None
+        for temporizador in ("_auto_dashboard", "_acompanhar_log"):
+            if getattr(self, temporizador, None) is not None:
+                self.after_cancel(getattr(self, temporizador))
+                setattr(self, temporizador, None)
+        super().destroy()
 
+    def atualizar_dashboard(self):
+        perfis = contar_usuarios_por_perfil_local()
+        self.lbl_total_users.config(text=f"Total de Usuários: {sum(perfis.values())}")
+        self.lbl_professores.config(text=f"Professores: {perfis.get('Professor', 0)}")
+        self.lbl_alunos_users.config(text=f"Alunos (usuários): {perfis.get('Aluno', 0)}")
+
+        # Só as contagens vêm do servidor, não as listas de turmas e alunos.
+        agrupamentos = ["TURMAS", "ALUNOS_POR_TURMA"] if MATPLOTLIB_DISPONIVEL else ["TURMAS"]
+        self.controller.cliente.contar(agrupamentos, self.exibir_dashboard, chave="admin.dashboard")
         if MATPLOTLIB_DISPONIVEL:
-            for widget in self.frame_grafico.winfo_children():
-                widget.destroy()
-
-            resp_alunos = self.controller.cliente.enviar_comando("LISTAR_ALUNOS")
-            tipo_alunos, alunos = processar_resposta_servidor(resp_alunos)
-            alunos_por_turma = {}
-            if tipo_alunos == "DADOS":
-                for aluno in alunos:
-                    id_turma = aluno[5]
-                    alunos_por_turma[id_turma] = alunos_por_turma.get(id_turma, 0) + 1
-            
-            if alunos_por_turma:
-                fig = Figure(figsize=(5, 4), dpi=100, facecolor=COR_FUNDO_FRAME)
-                ax = fig.add_subplot(111, facecolor=COR_FUNDO_FRAME)
-
-                ax.bar(alunos_por_turma.keys(), alunos_por_turma.values(), color=COR_DESTAQUE)
-                ax.set_title("Distribuição de Alunos por Turma", color=COR_TEXTO)
-                ax.set_xlabel("ID da Turma", color=COR_TEXTO)
-                ax.set_ylabel("Nº de Alunos", color=COR_TEXTO)
-                ax.tick_params(axis='x', colors=COR_TEXTO)
-                ax.tick_params(axis='y', colors=COR_TEXTO)
-                fig.tight_layout()
-
-                canvas = FigureCanvasTkAgg(fig, master=self.frame_grafico)
-                canvas.draw()
-                canvas.get_tk_widget().pack(fill="both", expand=True)
-            else:
-                 ttk.Label(self.frame_grafico, text="Sem dados de alunos para gerar o gráfico.").pack()
+            # Importa o matplotlib em segundo plano enquanto os dados chegam.
+            self.controller.cliente.executor.submeter(MATPLOTLIB.carregar, chave="carregar.matplotlib")
+
+    def exibir_dashboard(self, contagens):
+        total_turmas = contagens.get("TURMAS", {}).get(CHAVE_TOTAL, 0)
+        self.lbl_total_turmas.config(text=f"Total de Turmas: {total_turmas}")
+
+        modulos = MATPLOTLIB.carregar() if MATPLOTLIB_DISPONIVEL else None
+        if modulos is not None:
+            alunos_por_turma = contagens.get("ALUNOS_POR_TURMA", {})
+            if self.grafico_turmas is None:
+                _, figura, backend_tkagg = modulos
+                self.grafico_turmas = GraficoBarras(
+                    self.frame_grafico, figura, backend_tkagg, "Distribuição de Alunos por Turma",
+                    "ID da Turma", "Nº de Alunos", COR_DESTAQUE, COR_TEXTO, COR_FUNDO_FRAME,
+                    texto_vazio="Sem dados de alunos para gerar o gráfico.")
+            self.grafico_turmas.atualizar(dict(sorted(alunos_por_turma.items())))
     
+    # Sub-abas: (texto, criar, atualizar, chave para marcar_desatualizadas)
     def criar_tela_gestao_academica(self, parent):
-        notebook = ttk.Notebook(parent)
-        notebook.pack(fill='both', expand=True, padx=5, pady=5)
-
-        frame_cursos = ttk.Frame(notebook)
-        frame_materias = ttk.Frame(notebook)
-        frame_turmas = ttk.Frame(notebook)
-
-        notebook.add(frame_cursos, text="Cursos")
-        notebook.add(frame_materias, text="Matérias")
-        notebook.add(frame_turmas, text="Turmas")
-
-        self.criar_tela_cursos(frame_cursos)
-        self.criar_tela_materias(frame_materias)
-        self.criar_tela_turmas(frame_turmas)
-
-        notebook.bind("<<NotebookTabChanged>>", self.on_gestao_academica_tab_change)
+        self.criar_sub_abas(parent, [
+            ("Cursos", self.criar_tela_cursos, self.atualizar_cursos, "cursos"),
+            ("Matérias", self.criar_tela_materias, self.atualizar_materias, "materias"),
+            ("Turmas", self.criar_tela_turmas, self.atualizar_turmas, "turmas"),
+        ])
 
     def criar_tela_gestao_usuarios(self, parent):
-        notebook = ttk.Notebook(parent)
-        notebook.pack(fill='both', expand=True, padx=5, pady=5)
-        
-        frame_professores = ttk.Frame(notebook)
-        frame_autorizacoes = ttk.Frame(notebook)
-
-        notebook.add(frame_professores, text="Gerenciar Usuários")
-        notebook.add(frame_autorizacoes, text="Autorizações Pendentes")
-        
-        self.criar_tela_usuarios(frame_professores)
-        self.criar_tela_autorizacoes(frame_autorizacoes)
+        self.criar_sub_abas(parent, [
+            ("Gerenciar Usuários", self.criar_tela_usuarios, self.atualizar_lista_usuarios, "usuarios"),
+            ("Autorizações Pendentes", self.criar_tela_autorizacoes, self.atualizar_lista_autorizacoes, "autorizacoes"),
+        ])
     
     def criar_tela_visualizar_dados(self, parent):
-        notebook = ttk.Notebook(parent)
-        notebook.pack(fill='both', expand=True, padx=5, pady=5)
-
-        frame_ver_alunos = ttk.Frame(notebook)
-        frame_ver_atividades = ttk.Frame(notebook)
-        frame_ver_notas = ttk.Frame(notebook)
-        frame_ver_diarios = ttk.Frame(notebook)
-        frame_ver_frequencia = ttk.Frame(notebook) # NOVA ABA
-
-        notebook.add(frame_ver_alunos, text="Alunos")
-        notebook.add(frame_ver_atividades, text="Atividades")
-        notebook.add(frame_ver_notas, text="Notas")
-        notebook.add(frame_ver_diarios, text="Diários")
-        notebook.add(frame_ver_frequencia, text="Frequência") # NOVA ABA
-
-        self.criar_tela_visualizar_alunos(frame_ver_alunos)
-        self.criar_tela_visualizar_atividades(frame_ver_atividades)
-        self.criar_tela_visualizar_notas(frame_ver_notas)
-        self.criar_tela_visualizar_diarios(frame_ver_diarios)
-        self.criar_tela_visualizar_frequencia(frame_ver_frequencia) # NOVA ABA
+        self.criar_sub_abas(parent, [
+            ("Alunos", self.criar_tela_visualizar_alunos, self.atualizar_visualizacao_alunos, "ver_alunos"),
+            ("Atividades", self.criar_tela_visualizar_atividades, self.atualizar_visualizacao_atividades, "ver_atividades"),
+            ("Notas", self.criar_tela_visualizar_notas, self.atualizar_visualizacao_notas, "ver_notas"),
+            ("Diários", self.criar_tela_visualizar_diarios),
+            ("Frequência", self.criar_tela_visualizar_frequencia, self.atualizar_visualizacao_frequencia, "ver_frequencia"),
+            ("Aprovação", self.criar_tela_aprovacao, self.atualizar_aprovacao, "aprovacao"),
+            ("Faltas", self.criar_tela_faltas, self.atualizar_faltas, "faltas"),
+        ])
 
     def criar_tela_sistema(self, parent):
-        notebook = ttk.Notebook(parent)
-        notebook.pack(fill='both', expand=True, padx=5, pady=5)
-
-        frame_ferramentas = ttk.Frame(notebook)
-        frame_log = ttk.Frame(notebook)
-
-        notebook.add(frame_ferramentas, text="Ferramentas")
-        notebook.add(frame_log, text="Log de Atividades")
-        
-        self.criar_tela_ferramentas(frame_ferramentas)
-        self.criar_tela_log(frame_log)
+        self.criar_sub_abas(parent, [
+            ("Ferramentas", self.criar_tela_ferramentas),
+            ("Log de Atividades", self.criar_tela_log, self.atualizar_logs, "logs", 0),
+        ])
         
     def criar_tela_autorizacoes(self, parent):
         ttk.Label(parent, text="Alunos aguardando autorização para acessar o sistema.").pack(pady=10)
@@ -449,6 +828,7 @@ class PainelAdmin(tk.Frame):
         self.tree_autorizacoes = ttk.Treeview(list_frame, columns=("Usuário",), show="headings")
         self.tree_autorizacoes.heading("Usuário", text="Nome do Aluno")
         self.tree_autorizacoes.pack(fill="both", expand=True, side="left")
+        self.tabela_autorizacoes = TabelaChaveada(self.tree_autorizacoes, chave=lambda u: u[0])
         
         btn_frame = ttk.Frame(list_frame)
         btn_frame.pack(side="left", padx=10)
@@ -459,11 +839,13 @@ class PainelAdmin(tk.Frame):
         self.atualizar_lista_autorizacoes()
 
     def atualizar_lista_autorizacoes(self):
-        self.tree_autorizacoes.delete(*self.tree_autorizacoes.get_children())
-        usuarios = ler_usuarios_local()
-        for u in usuarios:
+        self.versoes_autorizacoes = {}  # Versão de cada registro como exibido, para checagem otimista
+        linhas = []
+        for u in ler_usuarios_local():
             if len(u) == 4 and u[2] == 'Aluno' and u[3] == 'pendente':
-                self.tree_autorizacoes.insert("", "end", values=(u[0],))
+                linhas.append((u[0],))
+                self.versoes_autorizacoes[u[0]] = versao_registro(u)
+        self.tabela_autorizacoes.atualizar(linhas)
 
     def autorizar_usuario(self):
         selecionado = self.tree_autorizacoes.focus()
@@ -473,11 +855,15 @@ class PainelAdmin(tk.Frame):
 
         usuario_autorizar = self.tree_autorizacoes.item(selecionado, 'values')[0]
         
-        autorizar_usuario_local(usuario_autorizar)
-        
-        self.controller.cliente.enviar_comando(f"LOG;Admin autorizou o acesso do aluno: {usuario_autorizar}")
+        if not autorizar_usuario_local(usuario_autorizar, self.versoes_autorizacoes.get(usuario_autorizar)):
+            messagebox.showwarning("Conflito", MENSAGEM_CONFLITO.format(usuario_autorizar))
+            self.atualizar_lista_autorizacoes()
+            return
+
+        self.controller.cliente.registrar_log(f"Admin autorizou o acesso do aluno: {usuario_autorizar}")
         messagebox.showinfo("Sucesso", f"Usuário '{usuario_autorizar}' foi autorizado com sucesso.")
         self.atualizar_lista_autorizacoes()
+        self.marcar_desatualizadas("usuarios")
 
 
     def recusar_usuario(self):
@@ -488,8 +874,11 @@ class PainelAdmin(tk.Frame):
 
         usuario_recusar = self.tree_autorizacoes.item(selecionado, 'values')[0]
         if messagebox.askyesno("Confirmar", f"Tem certeza que deseja recusar e excluir o registro pendente de '{usuario_recusar}'?"):
-            excluir_usuario_local(usuario_recusar)
-            self.controller.cliente.enviar_comando(f"LOG;Admin recusou o acesso do aluno: {usuario_recusar}")
+            if not excluir_usuario_local(usuario_recusar, self.versoes_autorizacoes.get(usuario_recusar)):
+                messagebox.showwarning("Conflito", MENSAGEM_CONFLITO.format(usuario_recusar))
+                self.atualizar_lista_autorizacoes()
+                return
+            self.controller.cliente.registrar_log(f"Admin recusou o acesso do aluno: {usuario_recusar}")
             messagebox.showinfo("Sucesso", "Registro pendente excluído.")
             self.atualizar_lista_autorizacoes()
     
@@ -518,6 +907,7 @@ class PainelAdmin(tk.Frame):
         self.tree_usuarios = ttk.Treeview(list_frame, columns=("Usuário", "Perfil"), show="headings")
         self.tree_usuarios.heading("Usuário", text="Usuário"); self.tree_usuarios.heading("Perfil", text="Perfil")
         self.tree_usuarios.pack(fill="both", expand=True)
+        self.tabela_usuarios = TabelaChaveada(self.tree_usuarios, chave=lambda u: u[0])
 
         self.atualizar_lista_usuarios()
 
@@ -529,9 +919,7 @@ class PainelAdmin(tk.Frame):
         
         usuario_ver = self.tree_usuarios.item(selecionado, 'values')[0]
         
-        # Encontra todos os dados do usuário no arquivo local
-        todos_usuarios = ler_usuarios_local()
-        dados_usuario = next((u for u in todos_usuarios if u[0] == usuario_ver), None)
+        dados_usuario = repositorio_usuarios.obter(usuario_ver)
 
         if dados_usuario:
             PerfilUsuarioDialog(self, dados_usuario=dados_usuario)
@@ -539,20 +927,23 @@ class PainelAdmin(tk.Frame):
     def registrar_usuario(self):
         sucesso, msg = registrar_usuario_local(self.usuario_entry.get(), self.senha_entry.get(), "Professor")
         if sucesso:
-            self.controller.cliente.enviar_comando(f"LOG;Admin registrou o usuario (Professor): {self.usuario_entry.get()}")
+            self.controller.cliente.registrar_log(f"Admin registrou o usuario (Professor): {self.usuario_entry.get()}")
             messagebox.showinfo("Sucesso", msg)
             self.usuario_entry.delete(0, 'end')
             self.senha_entry.delete(0, 'end')
             self.atualizar_lista_usuarios()
+            self.marcar_desatualizadas("materias")  # Lista de professores da matéria
         else:
             messagebox.showerror("Erro", msg)
             
     def atualizar_lista_usuarios(self):
-        self.tree_usuarios.delete(*self.tree_usuarios.get_children())
-        usuarios = ler_usuarios_local()
-        for u in usuarios:
+        self.versoes_usuarios = {}
+        linhas = []
+        for u in ler_usuarios_local():
             if len(u) >= 4 and u[3] == 'ativo':
-                self.tree_usuarios.insert("", "end", values=(u[0], u[2]))
+                linhas.append((u[0], u[2]))
+                self.versoes_usuarios[u[0]] = versao_registro(u)
+        self.tabela_usuarios.atualizar(linhas)
             
     def excluir_usuario(self):
         selecionado = self.tree_usuarios.focus()
@@ -566,10 +957,14 @@ class PainelAdmin(tk.Frame):
             return
 
         if messagebox.askyesno("Confirmar", f"Tem certeza que deseja excluir o usuário '{usuario_excluir}'?"):
-            excluir_usuario_local(usuario_excluir)
-            self.controller.cliente.enviar_comando(f"LOG;Admin excluiu o usuario: {usuario_excluir}")
+            if not excluir_usuario_local(usuario_excluir, self.versoes_usuarios.get(usuario_excluir)):
+                messagebox.showwarning("Conflito", MENSAGEM_CONFLITO.format(usuario_excluir))
+                self.atualizar_lista_usuarios()
+                return
+            self.controller.cliente.registrar_log(f"Admin excluiu o usuario: {usuario_excluir}")
             messagebox.showinfo("Sucesso", "Usuário excluído.")
             self.atualizar_lista_usuarios()
+            self.marcar_desatualizadas("materias")
 
     def criar_tela_cursos(self, parent):
         form = ttk.LabelFrame(parent, text="Adicionar Novo Curso")
@@ -584,15 +979,16 @@ class PainelAdmin(tk.Frame):
         self.tree_cursos = ttk.Treeview(list_frame, columns=("ID", "Nome"), show='headings')
         self.tree_cursos.heading("ID", text="ID"); self.tree_cursos.heading("Nome", text="Nome do Curso")
         self.tree_cursos.pack(fill='both', expand=True)
+        self.tabela_cursos = TabelaChaveada(self.tree_cursos, chave=lambda c: c[0])
         HoverButton(list_frame, text="Excluir Curso Selecionado", command=self.excluir_curso).pack(pady=5)
         self.atualizar_cursos()
 
     def atualizar_cursos(self):
-        self.tree_cursos.delete(*self.tree_cursos.get_children())
-        tipo, cursos = processar_resposta_servidor(self.controller.cliente.enviar_comando("LISTAR_CURSOS"))
-        if tipo == "DADOS":
-            for curso in cursos:
-                self.tree_cursos.insert("", "end", values=curso)
+        self.controller.cliente.enviar_comando_async("LISTAR_CURSOS", self.preencher_cursos, chave="admin.cursos")
+
+    def preencher_cursos(self, resposta):
+        tipo, cursos = processar_resposta_servidor(resposta)
+        self.tabela_cursos.atualizar(cursos if tipo == "DADOS" else [])
 
     def adicionar_curso(self):
         nome = self.curso_nome_entry.get()
@@ -604,6 +1000,7 @@ class PainelAdmin(tk.Frame):
                 messagebox.showinfo("Sucesso", dados)
                 self.curso_nome_entry.delete(0, 'end')
                 self.atualizar_cursos()
+                self.marcar_desatualizadas("materias")  # Lista de cursos da matéria
 
     def excluir_curso(self):
         selecionado = self.tree_cursos.focus()
@@ -616,6 +1013,7 @@ class PainelAdmin(tk.Frame):
                     self.log_action(f"excluiu o curso ID {id_curso}")
                     messagebox.showinfo("Sucesso", dados)
                     self.atualizar_cursos()
+                    self.marcar_desatualizadas("materias")
 
     def criar_tela_materias(self, parent):
         form = ttk.LabelFrame(parent, text="Adicionar Nova Matéria")
@@ -644,24 +1042,25 @@ class PainelAdmin(tk.Frame):
         self.tree_materias = ttk.Treeview(list_frame, columns=("ID", "Nome", "ID Curso", "Professor", "Modalidade"), show='headings')
         for col in ("ID", "Nome", "ID Curso", "Professor", "Modalidade"): self.tree_materias.heading(col, text=col)
         self.tree_materias.pack(fill='both', expand=True)
+        self.tabela_materias = TabelaChaveada(self.tree_materias, chave=lambda m: m[0])
         
         self.atualizar_materias()
 
     def atualizar_materias(self):
+        professores = [u[0] for u in ler_usuarios_local() if len(u)>2 and u[2] == "Professor"]
+        self.materia_prof_combo['values'] = professores
+        self.controller.cliente.enviar_comandos_async(["LISTAR_CURSOS", "LISTAR_MATERIAS"], self.preencher_materias, chave="admin.materias")
+
+    def preencher_materias(self, respostas):
+        resp_cursos, resp_materias = respostas
         # Popula comboboxes
-        tipo_cursos, cursos = processar_resposta_servidor(self.controller.cliente.enviar_comando("LISTAR_CURSOS"))
+        tipo_cursos, cursos = processar_resposta_servidor(resp_cursos)
         if tipo_cursos == "DADOS":
             self.materia_curso_combo['values'] = [f"{c[0]} - {c[1]}" for c in cursos]
-        
-        professores = [u[0] for u in ler_usuarios_local() if len(u)>2 and u[2] == "Professor"]
-        self.materia_prof_combo['values'] = professores
 
         # Atualiza tabela
-        self.tree_materias.delete(*self.tree_materias.get_children())
-        tipo_materias, materias = processar_resposta_servidor(self.controller.cliente.enviar_comando("LISTAR_MATERIAS"))
-        if tipo_materias == "DADOS":
-            for materia in materias:
-                self.tree_materias.insert("", "end", values=materia)
+        tipo_materias, materias = processar_resposta_servidor(resp_materias)
+        self.tabela_materias.atualizar(materias if tipo_materias == "DADOS" else [])
 
     def adicionar_materia(self):
         nome = self.materia_nome_entry.get()
@@ -689,15 +1088,15 @@ class PainelAdmin(tk.Frame):
         self.tree_turmas = ttk.Treeview(parent, columns=("ID", "Data", "Professor"), show="headings")
         self.tree_turmas.heading("ID", text="ID"); self.tree_turmas.heading("Data", text="Data da Turma"); self.tree_turmas.heading("Professor", text="Professor Responsável")
         self.tree_turmas.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabela_turmas = TabelaChaveada(self.tree_turmas, chave=lambda t: t[0])
         self.atualizar_turmas()
     
     def atualizar_turmas(self):
-        self.tree_turmas.delete(*self.tree_turmas.get_children())
-        resposta = self.controller.cliente.enviar_comando("LISTAR_TURMAS")
+        self.controller.cliente.enviar_comando_async("LISTAR_TURMAS", self.preencher_turmas, chave="admin.turmas")
+
+    def preencher_turmas(self, resposta):
         tipo, turmas = processar_resposta_servidor(resposta)
-        if tipo == "DADOS":
-            for turma in turmas:
-                self.tree_turmas.insert("", "end", values=turma)
+        self.tabela_turmas.atualizar(turmas if tipo == "DADOS" else [])
 
     def adicionar_turma(self):
         dialog = AddTurmaDialog(self)
@@ -706,7 +1105,7 @@ class PainelAdmin(tk.Frame):
             resposta = self.controller.cliente.enviar_comando(f"CADASTRAR_TURMA;{data};{professor}")
             tipo, dados = processar_resposta_servidor(resposta)
             if tipo == "SUCESSO":
-                self.controller.cliente.enviar_comando(f"LOG;Admin adicionou a turma de '{data}'")
+                self.controller.cliente.registrar_log(f"Admin adicionou a turma de '{data}'")
                 messagebox.showinfo("Sucesso", dados)
             self.atualizar_turmas()
 
@@ -717,55 +1116,54 @@ class PainelAdmin(tk.Frame):
             resposta = self.controller.cliente.enviar_comando(f"EXCLUIR_TURMA;{id_turma}")
             tipo, dados = processar_resposta_servidor(resposta)
             if tipo == "SUCESSO":
-                self.controller.cliente.enviar_comando(f"LOG;Admin excluiu a turma ID: {id_turma}")
+                self.controller.cliente.registrar_log(f"Admin excluiu a turma ID: {id_turma}")
                 messagebox.showinfo("Sucesso", dados)
             self.atualizar_turmas()
 
     def criar_tela_visualizar_alunos(self, parent):
         ttk.Label(parent, text="Lista de Todos os Alunos no Sistema").pack(pady=10)
         
-        self.tree_ver_alunos = ttk.Treeview(parent, columns=("ID", "Nome", "Idade", "Matricula", "Email", "Turma ID"), show="headings")
-        for col in ("ID", "Nome", "Idade", "Matricula", "Email", "Turma ID"):
-            self.tree_ver_alunos.heading(col, text=col)
-        self.tree_ver_alunos.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabela_ver_alunos = TabelaVirtual(parent, ("ID", "Nome", "Idade", "Matricula", "Email", "Turma ID"), com_filtro=True,
+                                              chave=lambda a: a.id)
+        self.tabela_ver_alunos.pack(fill="both", expand=True, padx=10, pady=10)
         HoverButton(parent, text="Atualizar Lista", command=self.atualizar_visualizacao_alunos).pack(pady=5)
         self.atualizar_visualizacao_alunos()
 
     def atualizar_visualizacao_alunos(self):
-        self.tree_ver_alunos.delete(*self.tree_ver_alunos.get_children())
-        resposta = self.controller.cliente.enviar_comando("LISTAR_ALUNOS")
-        tipo, alunos = processar_resposta_servidor(resposta)
-        if tipo == "DADOS":
-            for aluno in alunos:
-                self.tree_ver_alunos.insert("", "end", values=aluno)
+        self.controller.cliente.consultar_registros_async("LISTAR_ALUNOS", Aluno, self.preencher_visualizacao_alunos, chave="admin.ver_alunos")
+
+    def preencher_visualizacao_alunos(self, tipo, alunos):
+        self.tabela_ver_alunos.definir_dados(alunos if tipo == "DADOS" else [])
 
     def criar_tela_visualizar_atividades(self, parent):
         ttk.Label(parent, text="Lista de Todas as Atividades no Sistema").pack(pady=10)
         self.tree_ver_atividades = ttk.Treeview(parent, columns=("ID", "ID Turma", "Título", "Data"), show="headings")
         for col in ("ID", "ID Turma", "Título", "Data"): self.tree_ver_atividades.heading(col, text=col)
         self.tree_ver_atividades.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabela_ver_atividades = TabelaChaveada(self.tree_ver_atividades, chave=lambda a: a[0])
         HoverButton(parent, text="Atualizar", command=self.atualizar_visualizacao_atividades).pack(pady=5)
         self.atualizar_visualizacao_atividades()
 
     def atualizar_visualizacao_atividades(self):
-        self.tree_ver_atividades.delete(*self.tree_ver_atividades.get_children())
-        tipo, atividades = processar_resposta_servidor(self.controller.cliente.enviar_comando("LISTAR_ATIVIDADES"))
-        if tipo == "DADOS":
-            for ativ in atividades: self.tree_ver_atividades.insert("", "end", values=ativ)
+        self.controller.cliente.enviar_comando_async("LISTAR_ATIVIDADES", self.preencher_visualizacao_atividades, chave="admin.ver_atividades")
+
+    def preencher_visualizacao_atividades(self, resposta):
+        tipo, atividades = processar_resposta_servidor(resposta)
+        self.tabela_ver_atividades.atualizar(atividades if tipo == "DADOS" else [])
 
     def criar_tela_visualizar_notas(self, parent):
         ttk.Label(parent, text="Lista de Todas as Notas Lançadas").pack(pady=10)
-        self.tree_ver_notas = ttk.Treeview(parent, columns=("ID Aluno", "ID Matéria", "Tipo", "Nota"), show="headings")
-        for col in ("ID Aluno", "ID Matéria", "Tipo", "Nota"): self.tree_ver_notas.heading(col, text=col)
-        self.tree_ver_notas.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabela_ver_notas = TabelaVirtual(parent, ("ID Aluno", "ID Matéria", "Tipo", "Nota"), com_filtro=True,
+                                             chave=lambda n: (n.id_aluno, n.id_materia, n.tipo))
+        self.tabela_ver_notas.pack(fill="both", expand=True, padx=10, pady=10)
         HoverButton(parent, text="Atualizar", command=self.atualizar_visualizacao_notas).pack(pady=5)
         self.atualizar_visualizacao_notas()
 
     def atualizar_visualizacao_notas(self):
-        self.tree_ver_notas.delete(*self.tree_ver_notas.get_children())
-        tipo, notas = processar_resposta_servidor(self.controller.cliente.enviar_comando("LISTAR_NOTAS_TODOS"))
-        if tipo == "DADOS":
-            for nota in notas: self.tree_ver_notas.insert("", "end", values=nota)
+        self.controller.cliente.consultar_registros_async("LISTAR_NOTAS_TODOS", Nota, self.preencher_visualizacao_notas, chave="admin.ver_notas")
+
+    def preencher_visualizacao_notas(self, tipo, notas):
+        self.tabela_ver_notas.definir_dados(notas if tipo == "DADOS" else [])
             
     def criar_tela_visualizar_diarios(self, parent):
         ttk.Label(parent, text="Visualizador de Diários de Turma").pack(pady=10)
@@ -781,6 +1179,7 @@ class PainelAdmin(tk.Frame):
         for col in ("Data", "Conteúdo", "Presentes"): self.tree_ver_diario.heading(col, text=col)
         self.tree_ver_diario.column("Conteúdo", width=400)
         self.tree_ver_diario.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabela_ver_diario = TabelaChaveada(self.tree_ver_diario)
 
     def atualizar_visualizacao_diario(self):
         id_turma = self.diario_turma_entry.get()
@@ -788,29 +1187,92 @@ class PainelAdmin(tk.Frame):
             messagebox.showwarning("Aviso", "Insira um ID de turma.")
             return
             
-        self.tree_ver_diario.delete(*self.tree_ver_diario.get_children())
-        resposta = self.controller.cliente.enviar_comando(f"LISTAR_DIARIO;{id_turma}")
+        self.controller.cliente.enviar_comando_async(f"LISTAR_DIARIO;{id_turma}", self.preencher_visualizacao_diario, chave="admin.ver_diario")
+
+    def preencher_visualizacao_diario(self, resposta):
         tipo, diario = processar_resposta_servidor(resposta)
-        if tipo == "DADOS":
-            for entrada in diario:
-                if len(entrada) == 3:
-                    self.tree_ver_diario.insert("", "end", values=entrada)
+        self.tabela_ver_diario.atualizar([e for e in diario if len(e) == 3] if tipo == "DADOS" else [])
 
     # --- NOVAS TELAS ---
     def criar_tela_visualizar_frequencia(self, parent):
         ttk.Label(parent, text="Visualizar Registros de Frequência").pack(pady=10)
-        self.tree_ver_frequencia = ttk.Treeview(parent, columns=("ID Turma", "ID Aluno", "Data", "Status"), show="headings")
-        for col in ("ID Turma", "ID Aluno", "Data", "Status"): self.tree_ver_frequencia.heading(col, text=col)
-        self.tree_ver_frequencia.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabela_ver_frequencia = TabelaVirtual(parent, ("ID Turma", "ID Aluno", "Data", "Status"), com_filtro=True,
+                                                  chave=lambda f: (f.id_turma, f.id_aluno, f.data))
+        self.tabela_ver_frequencia.pack(fill="both", expand=True, padx=10, pady=10)
         HoverButton(parent, text="Atualizar", command=self.atualizar_visualizacao_frequencia).pack(pady=5)
         self.atualizar_visualizacao_frequencia()
 
     def atualizar_visualizacao_frequencia(self):
-        self.tree_ver_frequencia.delete(*self.tree_ver_frequencia.get_children())
-        tipo, frequencias = processar_resposta_servidor(self.controller.cliente.enviar_comando("LISTAR_FREQUENCIA;TODOS"))
-        if tipo == "DADOS":
-            for f in frequencias: self.tree_ver_frequencia.insert("", "end", values=f)
+        self.controller.cliente.consultar_registros_async("LISTAR_FREQUENCIA;TODOS", Frequencia, self.preencher_visualizacao_frequencia, chave="admin.ver_frequencia")
+
+    def preencher_visualizacao_frequencia(self, tipo, frequencias):
+        self.tabela_ver_frequencia.definir_dados(frequencias if tipo == "DADOS" else [])
     
+    def criar_tela_aprovacao(self, parent):
+        ttk.Label(parent, text="Visão Geral de Aprovação por Matéria").pack(pady=10)
+        self.lbl_totais_aprovacao = ttk.Label(parent, text="")
+        self.lbl_totais_aprovacao.pack(pady=5)
+        colunas = ("Matéria", "Alunos", "Média", "Mínima", "Máxima", "Aprovados", "Exame", "Reprovados", "Cursando")
+        self.tree_aprovacao = ttk.Treeview(parent, columns=colunas, show="headings")
+        for col in colunas:
+            self.tree_aprovacao.heading(col, text=col)
+            self.tree_aprovacao.column(col, width=200 if col == "Matéria" else 80)
+        self.tree_aprovacao.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabela_aprovacao = TabelaChaveada(self.tree_aprovacao, chave=lambda e: e[0])
+        HoverButton(parent, text="Atualizar", command=self.atualizar_aprovacao).pack(pady=5)
+        self.atualizar_aprovacao()
+
+    def atualizar_aprovacao(self):
+        self.controller.cliente.quadro_notas_async(self.preencher_aprovacao, chave="admin.aprovacao")
+
+    def preencher_aprovacao(self, quadro, materias):
+        if quadro is None:
+            self.tabela_aprovacao.limpar()
+            return
+        totais = quadro.totais_por_situacao()
+        self.lbl_totais_aprovacao.config(text="   ".join(f"{situacao}: {n}" for situacao, n in totais.items()))
+        self.tabela_aprovacao.atualizar([
+            (materias[e.id_materia][1] if e.id_materia in materias else f"Matéria ID {e.id_materia}",
+             e.alunos, f"{e.media:.2f}", f"{e.minima:.2f}", f"{e.maxima:.2f}",
+             e.aprovados, e.exame, e.reprovados, e.cursando)
+            for e in quadro.estatisticas()])
+
+    def criar_tela_faltas(self, parent):
+        ttk.Label(parent, text=f"Faltas por Aluno e Turma (risco a partir de {LIMITE_ALERTA:.0%}, "
+                               f"reprovação acima de {LIMITE_FALTAS:.0%})").pack(pady=10)
+        barra = ttk.Frame(parent)
+        barra.pack(fill="x", padx=10)
+        self.lbl_totais_faltas = ttk.Label(barra, text="")
+        self.lbl_totais_faltas.pack(side="left")
+        self.var_so_risco = tk.BooleanVar(value=True)
+        ttk.Checkbutton(barra, text="Só alunos em risco", variable=self.var_so_risco,
+                        command=self.atualizar_faltas).pack(side="right")
+        self.tabela_faltas = TabelaVirtual(parent, ("ID Aluno", "Nome", "Turma", "Aulas", "Presenças", "Faltas", "% Faltas", "Situação"),
+                                           com_filtro=True, chave=lambda t: (t[0], t[2]), larguras={"Nome": 220})
+        self.tabela_faltas.pack(fill="both", expand=True, padx=10, pady=10)
+        HoverButton(parent, text="Atualizar", command=self.atualizar_faltas).pack(pady=5)
+        self.atualizar_faltas()
+
+    def atualizar_faltas(self):
+        self.controller.cliente.analise_frequencia_async(self.preencher_faltas, chave="admin.faltas")
+
+    def preencher_faltas(self, quadro, alunos):
+        if quadro is None:
+            self.tabela_faltas.limpar()
+            return
+        taxas = quadro.taxas()
+        em_risco = [t for t in taxas if t.situacao != REGULAR]
+        reprovados = sum(1 for t in em_risco if t.situacao == REPROVADO_FALTA)
+        self.lbl_totais_faltas.config(text=f"{len(taxas)} aluno(s) com chamada   Em risco: {len(em_risco) - reprovados}   "
+                                           f"Reprovados por falta: {reprovados}")
+        if self.var_so_risco.get():
+            taxas = em_risco
+        taxas.sort(key=lambda t: t.percentual, reverse=True)
+        self.tabela_faltas.definir_dados([
+            (t.id_aluno, alunos[t.id_aluno].nome if t.id_aluno in alunos else "-", t.id_turma,
+             t.aulas, t.presencas, t.faltas, f"{t.percentual * 100:.1f}", t.situacao)
+            for t in taxas])
+
     def criar_tela_financeiro(self, parent):
         form = ttk.LabelFrame(parent, text="Gerar Mensalidades")
         form.pack(pady=10, padx=10, fill='x')
@@ -827,9 +1289,9 @@ class PainelAdmin(tk.Frame):
         btn_list_frame.pack(pady=5)
         HoverButton(btn_list_frame, text="Marcar como Pago", command=self.pagar_mensalidade).pack()
 
-        self.tree_financeiro = ttk.Treeview(list_frame, columns=("ID Aluno", "Ano", "Mês", "Valor", "Status"), show="headings")
-        for col in ("ID Aluno", "Ano", "Mês", "Valor", "Status"): self.tree_financeiro.heading(col, text=col)
-        self.tree_financeiro.pack(fill="both", expand=True)
+        self.tabela_financeiro = TabelaVirtual(list_frame, ("ID Aluno", "Ano", "Mês", "Valor", "Status"), com_filtro=True,
+                                              chave=lambda f: (f.id_aluno, f.ano, f.mes))
+        self.tabela_financeiro.pack(fill="both", expand=True)
         self.atualizar_financeiro()
 
     def gerar_mensalidades(self):
@@ -847,13 +1309,12 @@ class PainelAdmin(tk.Frame):
                 self.atualizar_financeiro()
 
     def pagar_mensalidade(self):
-        selecionado = self.tree_financeiro.focus()
-        if not selecionado:
+        item = self.tabela_financeiro.selecionado()
+        if item is None:
             messagebox.showwarning("Aviso", "Selecione um registro para marcar como pago.")
             return
         
-        item = self.tree_financeiro.item(selecionado, 'values')
-        id_aluno, ano, mes = item[0], item[1], item[2]
+        id_aluno, ano, mes = item.id_aluno, item.ano, item.mes
 
         if messagebox.askyesno("Confirmar", f"Deseja marcar a mensalidade de {mes}/{ano} do aluno ID {id_aluno} como paga?"):
             resp = self.controller.cliente.enviar_comando(f"PAGAR_MENSALIDADE;{id_aluno};{ano};{mes}")
@@ -864,11 +1325,10 @@ class PainelAdmin(tk.Frame):
                 self.atualizar_financeiro()
 
     def atualizar_financeiro(self):
-        self.tree_financeiro.delete(*self.tree_financeiro.get_children())
-        tipo, registros = processar_resposta_servidor(self.controller.cliente.enviar_comando("LISTAR_FINANCEIRO;TODOS"))
-        if tipo == "DADOS":
-            for r in registros:
-                self.tree_financeiro.insert("", "end", values=r)
+        self.controller.cliente.consultar_registros_async("LISTAR_FINANCEIRO;TODOS", Financeiro, self.preencher_financeiro, chave="admin.financeiro")
+
+    def preencher_financeiro(self, tipo, registros):
+        self.tabela_financeiro.definir_dados(registros if tipo == "DADOS" else [])
     # --- FIM NOVAS TELAS ---
 
     def criar_tela_ferramentas(self, parent):
@@ -886,7 +1346,7 @@ class PainelAdmin(tk.Frame):
             resposta = self.controller.cliente.enviar_comando("BACKUP")
             tipo, dados = processar_resposta_servidor(resposta)
             if tipo == "SUCESSO":
-                self.controller.cliente.enviar_comando("LOG;Admin realizou um backup do sistema.")
+                self.controller.cliente.registrar_log("Admin realizou um backup do sistema.")
                 messagebox.showinfo("Sucesso", dados)
 
     def limpar_arquivo(self, tipo_arquivo):
@@ -895,31 +1355,95 @@ class PainelAdmin(tk.Frame):
             resposta = self.controller.cliente.enviar_comando(cmd)
             tipo, dados = processar_resposta_servidor(resposta)
             if tipo == "SUCESSO":
-                self.controller.cliente.enviar_comando(f"LOG;Admin limpou o arquivo de {tipo_arquivo}.")
+                self.controller.cliente.registrar_log(f"Admin limpou o arquivo de {tipo_arquivo}.")
                 messagebox.showinfo("Sucesso", dados)
+                if tipo_arquivo == "NOTAS":
+                    self.marcar_desatualizadas("ver_notas", "aprovacao")
 
     def criar_tela_log(self, parent):
         ttk.Label(parent, text="Log de Atividades do Sistema").pack(pady=10)
-        self.tree_log = ttk.Treeview(parent, columns=("Data/Hora", "Ação"), show="headings")
-        self.tree_log.heading("Data/Hora", text="Data e Hora")
-        self.tree_log.heading("Ação", text="Ação Registrada")
-        self.tree_log.column("Ação", width=600)
-        self.tree_log.pack(fill="both", expand=True, padx=10, pady=10)
-        HoverButton(parent, text="Atualizar Log", command=self.atualizar_logs).pack(pady=5)
+        filtros = ttk.Frame(parent)
+        filtros.pack(fill="x", padx=10)
+        ttk.Label(filtros, text="De (AAAA-MM-DD):").pack(side="left")
+        self.log_de_entry = ttk.Entry(filtros, width=12)
+        self.log_de_entry.pack(side="left", padx=5)
+        ttk.Label(filtros, text="Até:").pack(side="left")
+        self.log_ate_entry = ttk.Entry(filtros, width=12)
+        self.log_ate_entry.pack(side="left", padx=5)
+        HoverButton(filtros, text="Filtrar", command=self.filtrar_logs).pack(side="left", padx=5)
+        self.var_acompanhar_log = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filtros, text="Acompanhar novas entradas", variable=self.var_acompanhar_log,
+                        command=self.alternar_acompanhamento_log).pack(side="right")
+
+        self.tabela_log = TabelaVirtual(parent, ("Data/Hora", "Ação"), titulos=("Data e Hora", "Ação Registrada"),
+                                        larguras={"Ação": 600}, com_filtro=True, chave=tuple)
+        self.tabela_log.pack(fill="both", expand=True, padx=10, pady=10)
+        botoes = ttk.Frame(parent)
+        botoes.pack(pady=5)
+        HoverButton(botoes, text="Atualizar Log", command=self.atualizar_logs).pack(side="left", padx=5)
+        self.btn_logs_antigos = HoverButton(botoes, text="Carregar Mais Antigas", command=self.carregar_logs_antigos)
+        self.btn_logs_antigos.pack(side="left", padx=5)
+        self.lbl_total_log = ttk.Label(botoes, text="")
+        self.lbl_total_log.pack(side="left", padx=5)
+
+        # Só a página mais recente é lida do servidor; o resto vem sob demanda.
+        self.consulta_logs = ConsultaLogs()
+        self._acompanhar_log = None
         self.atualizar_logs()
 
     def atualizar_logs(self):
-        self.tree_log.delete(*self.tree_log.get_children())
-        resposta = self.controller.cliente.enviar_comando("LISTAR_LOGS")
-        tipo, logs = processar_resposta_servidor(resposta)
-        if tipo == "DADOS":
-            for log in reversed(logs):
-                if len(log) == 2:
-                    self.tree_log.insert("", "end", values=log)
+        # Com a primeira página carregada, basta buscar o que foi gravado depois dela.
+        if self.consulta_logs.desde is None:
+            self.carregar_logs_antigos()
+        else:
+            self.buscar_logs_novos()
+
+    def carregar_logs_antigos(self):
+        geracao, comando = self.consulta_logs.comando_pagina()
+        self.controller.cliente.consultar_registros_async(
+            comando, None, lambda tipo, dados: self.preencher_logs(geracao, tipo, dados, antigas=True), chave="admin.logs")
+
+    def buscar_logs_novos(self):
+        geracao, comando = self.consulta_logs.comando_novas()
+        self.controller.cliente.consultar_registros_async(
+            comando, None, lambda tipo, dados: self.preencher_logs(geracao, tipo, dados, antigas=False), chave="admin.logs_novos")
+
+    def preencher_logs(self, geracao, tipo, dados, antigas):
+        if tipo != "DADOS":
+            self.var_acompanhar_log.set(False)  # Não insiste com o servidor fora do ar
+            return
+        aplicar = self.consulta_logs.aplicar_pagina if antigas else self.consulta_logs.aplicar_novas
+        if aplicar(geracao, dados):
+            consulta = self.consulta_logs
+            self.tabela_log.definir_dados(list(consulta.entradas))
+            self.btn_logs_antigos.state(["!disabled"] if consulta.tem_mais_antigas() else ["disabled"])
+            self.lbl_total_log.config(text=f"{len(consulta.entradas)} entrada(s) carregada(s)"
+                                           + ("" if consulta.tem_mais_antigas() else ", todas"))
+
+    def filtrar_logs(self):
+        de, ate = self.log_de_entry.get().strip(), self.log_ate_entry.get().strip()
+        if any(texto and not prefixo_data_valido(texto) for texto in (de, ate)):
+            messagebox.showwarning("Aviso", "Use datas no formato AAAA-MM-DD (ou só AAAA-MM, ou AAAA).")
+            return
+        self.consulta_logs.reiniciar(de, ate)
+        self.tabela_log.limpar()
+        self.carregar_logs_antigos()
+
+    def alternar_acompanhamento_log(self):
+        if self.var_acompanhar_log.get() and self._acompanhar_log is None:
+            self.acompanhar_log()
+
+    def acompanhar_log(self):
+        self._acompanhar_log = None
+        if not self.var_acompanhar_log.get():
+            return
+        # Só busca enquanto a aba está à vista; cada busca traz apenas as entradas novas.
+        if self.tabela_log.winfo_ismapped() and self.consulta_logs.desde is not None:
+            self.buscar_logs_novos()
+        self._acompanhar_log = self.after(INTERVALO_ACOMPANHAR_LOG_MS, self.acompanhar_log)
 
     def log_action(self, action):
-        log_msg = f"LOG;Admin {action}"
-        self.controller.cliente.enviar_comando(log_msg)
+        self.controller.cliente.registrar_log(f"Admin {action}")
 
 # --- Painel do Professor ---
 class PainelProfessor(tk.Frame):
@@ -948,14 +1472,14 @@ class PainelProfessor(tk.Frame):
         HoverButton(self, text="Logout", command=lambda: self.controller.trocar_frame(TelaLogin)).pack(pady=5)
         
     def log_action(self, action):
-        log_msg = f"LOG;Professor '{self.dados_prof['nome']}' {action}"
-        self.controller.cliente.enviar_comando(log_msg)
+        self.controller.cliente.registrar_log(f"Professor '{self.dados_prof['nome']}' {action}")
 
     def criar_tela_alunos(self, parent):
         HoverButton(parent, text="Adicionar Aluno", command=self.adicionar_aluno).pack(pady=5)
         self.tree_alunos = ttk.Treeview(parent, columns=("ID", "Nome", "Turma ID"), show="headings")
         self.tree_alunos.heading("ID", text="ID"); self.tree_alunos.heading("Nome", text="Nome"); self.tree_alunos.heading("Turma ID", text="Turma ID")
         self.tree_alunos.pack(fill="both", expand=True)
+        self.tabela_alunos = TabelaChaveada(self.tree_alunos, chave=lambda a: a[0])
         self.atualizar_alunos()
 
     def adicionar_aluno(self):
@@ -979,12 +1503,10 @@ class PainelProfessor(tk.Frame):
                 self.atualizar_alunos()
 
     def atualizar_alunos(self):
-        self.tree_alunos.delete(*self.tree_alunos.get_children())
-        resposta = self.controller.cliente.enviar_comando("LISTAR_ALUNOS")
-        tipo, alunos = processar_resposta_servidor(resposta)
-        if tipo == "DADOS":
-            for aluno in alunos:
-                self.tree_alunos.insert("", "end", values=(aluno[0], aluno[1], aluno[5]))
+        self.controller.cliente.consultar_registros_async("LISTAR_ALUNOS", Aluno, self.preencher_alunos, chave="professor.alunos")
+
+    def preencher_alunos(self, tipo, alunos):
+        self.tabela_alunos.atualizar([(a.id, a.nome, a.id_turma) for a in alunos] if tipo == "DADOS" else [])
     
     def criar_tela_atividades(self, parent):
         form = ttk.LabelFrame(parent, text="Nova Atividade")
@@ -1006,6 +1528,7 @@ class PainelProfessor(tk.Frame):
         self.tree_atividades = ttk.Treeview(parent, columns=("ID", "Turma", "Título", "Data"), show="headings")
         self.tree_atividades.heading("ID", text="ID"); self.tree_atividades.heading("Turma", text="ID Turma"); self.tree_atividades.heading("Título", text="Título"); self.tree_atividades.heading("Data", text="Data Entrega")
         self.tree_atividades.pack(fill='both', expand=True, pady=5)
+        self.tabela_atividades = TabelaChaveada(self.tree_atividades, chave=lambda a: a[0])
         self.atualizar_atividades()
 
     def adicionar_atividade(self):
@@ -1023,25 +1546,60 @@ class PainelProfessor(tk.Frame):
             self.atualizar_atividades()
     
     def atualizar_atividades(self):
+        self.controller.cliente.enviar_comandos_async(["LISTAR_TURMAS", "LISTAR_ATIVIDADES"], self.preencher_atividades, chave="professor.atividades")
+
+    def preencher_atividades(self, respostas):
+        resp_turmas, resp = respostas
         # Atualiza a combobox de turmas
-        resp_turmas = self.controller.cliente.enviar_comando("LISTAR_TURMAS")
         tipo_turmas, turmas = processar_resposta_servidor(resp_turmas)
         if tipo_turmas == "DADOS":
             self.ativ_turma_combo['values'] = [f"{t[0]} - {t[1]}" for t in turmas]
 
         # Atualiza a tabela de atividades
-        self.tree_atividades.delete(*self.tree_atividades.get_children())
-        resp = self.controller.cliente.enviar_comando("LISTAR_ATIVIDADES")
         tipo, atividades = processar_resposta_servidor(resp)
-        if tipo == "DADOS":
-            for ativ in atividades:
-                self.tree_atividades.insert("", "end", values=ativ)
+        self.tabela_atividades.atualizar(atividades if tipo == "DADOS" else [])
 
     def criar_tela_notas(self, parent):
-        HoverButton(parent, text="Lançar/Editar Notas", command=self.lancar_nota).pack(pady=10)
-    
+        botoes = ttk.Frame(parent)
+        botoes.pack(pady=10)
+        HoverButton(botoes, text="Lançar/Editar Notas", command=self.lancar_nota).pack(side='left', padx=5)
+        HoverButton(botoes, text="Atualizar", command=self.atualizar_notas).pack(side='left', padx=5)
+
+        # Resumo por matéria e, abaixo, a situação de cada aluno nas matérias do professor.
+        colunas_resumo = ("Matéria", "Alunos", "Média", "Mínima", "Máxima", "Aprovados", "Exame", "Reprovados")
+        self.tree_resumo_notas = ttk.Treeview(parent, columns=colunas_resumo, show="headings", height=5)
+        for col in colunas_resumo:
+            self.tree_resumo_notas.heading(col, text=col)
+            self.tree_resumo_notas.column(col, width=200 if col == "Matéria" else 80)
+        self.tree_resumo_notas.pack(fill='x', padx=5, pady=5)
+        self.tabela_resumo_notas = TabelaChaveada(self.tree_resumo_notas, chave=lambda e: e[0])
+
+        self.tabela_notas_turma = TabelaVirtual(parent, ("Matéria", "ID Aluno", "NP1", "NP2", "PIM", "Exame", "Média", "Status"),
+                                                com_filtro=True, chave=lambda r: (r[0], r[1]))
+        self.tabela_notas_turma.pack(fill="both", expand=True, padx=5, pady=5)
+        self.atualizar_notas()
+
     def lancar_nota(self):
         dialog = AddGradesDialog(self)
+        self.atualizar_notas()
+
+    def atualizar_notas(self):
+        self.controller.cliente.quadro_notas_async(self.preencher_notas, chave="professor.notas")
+
+    def preencher_notas(self, quadro, materias):
+        minhas = {id_materia: m[1] for id_materia, m in materias.items() if len(m) > 3 and m[3] == self.dados_prof["nome"]}
+        if quadro is None or not minhas:
+            self.tabela_resumo_notas.limpar()
+            self.tabela_notas_turma.limpar()
+            return
+        self.tabela_resumo_notas.atualizar([
+            (minhas[e.id_materia], e.alunos, f"{e.media:.2f}", f"{e.minima:.2f}", f"{e.maxima:.2f}",
+             e.aprovados, e.exame, e.reprovados)
+            for e in quadro.estatisticas(minhas)])
+        self.tabela_notas_turma.definir_dados([
+            (minhas[r.id_materia], r.id_aluno, formatar_nota(r.np1), formatar_nota(r.np2), formatar_nota(r.pim),
+             formatar_nota(r.exame), f"{r.media:.2f}", r.situacao)
+            for r in quadro.resultados(minhas)])
 
     # --- NOVA TELA DE FREQUÊNCIA ---
     def criar_tela_frequencia(self, parent):
@@ -1058,7 +1616,13 @@ class PainelProfessor(tk.Frame):
         self.freq_data_entry.insert(0, datetime.now().strftime("%d/%m/%Y"))
         self.freq_data_entry.pack(side='left', padx=5)
 
-        HoverButton(control_frame, text="Salvar Frequência", command=self.salvar_frequencia).pack(side='right', padx=5)
+        self.btn_salvar_frequencia = HoverButton(control_frame, text="Salvar Frequência", command=self.salvar_frequencia)
+        self.btn_salvar_frequencia.pack(side='right', padx=5)
+        self.btn_importar_frequencia = HoverButton(control_frame, text="Importar CSV...", command=self.importar_frequencia)
+        self.btn_importar_frequencia.pack(side='right', padx=5)
+        self.lbl_progresso_frequencia = ttk.Label(control_frame, text="")
+        self.lbl_progresso_frequencia.pack(side='right', padx=5)
+        self.envio_frequencia = None  # Último envio; se ficou incompleto, salvar de novo o retoma
 
         list_frame = ttk.Frame(parent)
         list_frame.pack(fill='both', expand=True, padx=5, pady=5)
@@ -1072,10 +1636,23 @@ class PainelProfessor(tk.Frame):
         HoverButton(btn_freq_frame, text="Marcar Presente", command=lambda: self.marcar_status_frequencia("Presente")).pack(pady=5)
         HoverButton(btn_freq_frame, text="Marcar Falta", command=lambda: self.marcar_status_frequencia("Falta")).pack(pady=5)
 
+        risco_frame = ttk.LabelFrame(parent, text=f"Alunos em Risco por Faltas (a partir de {LIMITE_ALERTA:.0%})")
+        risco_frame.pack(fill='x', padx=5, pady=5)
+        colunas = ("ID", "Nome", "Turma", "Aulas", "Faltas", "% Faltas", "Situação")
+        self.tree_risco_frequencia = ttk.Treeview(risco_frame, columns=colunas, show="headings", height=5)
+        for col in colunas:
+            self.tree_risco_frequencia.heading(col, text=col)
+            self.tree_risco_frequencia.column(col, width=200 if col == "Nome" else 80)
+        self.tree_risco_frequencia.pack(fill='x', expand=True)
+        self.tabela_risco_frequencia = TabelaChaveada(self.tree_risco_frequencia, chave=lambda t: (t[0], t[2]))
+
         self.atualizar_combo_turmas_frequencia()
+        self.atualizar_risco_frequencia()
 
     def atualizar_combo_turmas_frequencia(self):
-        resp_turmas = self.controller.cliente.enviar_comando("LISTAR_TURMAS")
+        self.controller.cliente.enviar_comando_async("LISTAR_TURMAS", self.preencher_combo_turmas_frequencia, chave="professor.turmas_frequencia")
+
+    def preencher_combo_turmas_frequencia(self, resp_turmas):
         tipo_turmas, turmas = processar_resposta_servidor(resp_turmas)
         if tipo_turmas == "DADOS":
             self.freq_turma_combo['values'] = [f"{t[0]} - {t[1]}" for t in turmas]
@@ -1086,13 +1663,31 @@ class PainelProfessor(tk.Frame):
         if not turma_selecionada: return
 
         id_turma = turma_selecionada.split(' - ')[0]
-        resp_alunos = self.controller.cliente.enviar_comando("LISTAR_ALUNOS")
+        self.controller.cliente.listar_alunos_da_turma(id_turma, self.preencher_alunos_frequencia, chave="professor.alunos_frequencia")
+        self.atualizar_risco_frequencia()
+
+    def atualizar_risco_frequencia(self):
+        # Barato: só as chamadas gravadas desde a última atualização vêm do servidor.
+        self.controller.cliente.analise_frequencia_async(self.preencher_risco_frequencia, chave="professor.risco_frequencia")
+
+    def preencher_risco_frequencia(self, quadro, alunos):
+        if quadro is None:
+            self.tabela_risco_frequencia.limpar()
+            return
+        turma_selecionada = self.freq_turma_combo.get()
+        turmas = [turma_selecionada.split(' - ')[0]] if turma_selecionada else None
+        self.tabela_risco_frequencia.atualizar([
+            (t.id_aluno, alunos[t.id_aluno].nome if t.id_aluno in alunos else "-", t.id_turma,
+             t.aulas, t.faltas, f"{t.percentual * 100:.1f}", t.situacao)
+            for t in quadro.em_risco(turmas)])
+
+    def preencher_alunos_frequencia(self, resp_alunos):
+        self.tree_frequencia.delete(*self.tree_frequencia.get_children())
         tipo_alunos, alunos = processar_resposta_servidor(resp_alunos)
         
         if tipo_alunos == "DADOS":
             for aluno in alunos:
-                if aluno[5] == id_turma:
-                    self.tree_frequencia.insert("", "end", values=(aluno[0], aluno[1], "Presente"))
+                self.tree_frequencia.insert("", "end", values=(aluno[0], aluno[1], "Presente"))
 
     def marcar_status_frequencia(self, status):
         selecionados = self.tree_frequencia.selection()
@@ -1114,22 +1709,87 @@ class PainelProfessor(tk.Frame):
         frequencias = []
         for item_id in self.tree_frequencia.get_children():
             valores = self.tree_frequencia.item(item_id, 'values')
-            id_aluno = valores[0]
-            status_char = 'P' if valores[2] == 'Presente' else 'F'
-            frequencias.append(f"{id_aluno},{status_char}")
+            frequencias.append((valores[0], STATUS_FREQUENCIA.get(valores[2], 'F')))
 
         if not frequencias:
             messagebox.showinfo("Informação", "Não há alunos nesta turma para registrar frequência.")
             return
 
-        frequencias_str = "|".join(frequencias)
-        comando = f"REGISTRAR_FREQUENCIA;{id_turma};{data};{frequencias_str}"
-        
-        resp = self.controller.cliente.enviar_comando(comando)
-        tipo, dados = processar_resposta_servidor(resp)
-        if tipo == "SUCESSO":
-            messagebox.showinfo("Sucesso", dados)
-            self.log_action(f"registrou frequência para a turma {id_turma} em {data}")
+        # A chamada vai em partes; se um envio anterior da mesma chamada parou no meio, só o que falta é enviado.
+        envio = self.envio_frequencia
+        if envio is None or envio.concluido() or not envio.mesma_chamada(id_turma, data, frequencias):
+            envio = self.envio_frequencia = EnvioFrequencia(id_turma, data, frequencias)
+        self.bloquear_frequencia(True)
+        self.mostrar_progresso_frequencia(envio.alunos_confirmados(), envio.total_alunos)
+        self.controller.cliente.enviar_frequencias_async([envio], lambda _: self.concluir_envio_frequencia(envio),
+                                                         ao_progresso=self.mostrar_progresso_frequencia)
+
+    def bloquear_frequencia(self, bloquear):
+        # Um envio por vez: os dois botões compartilham o rótulo de progresso.
+        for botao in (self.btn_salvar_frequencia, self.btn_importar_frequencia):
+            botao.state(["disabled"] if bloquear else ["!disabled"])
+
+    def mostrar_progresso_frequencia(self, gravados, total):
+        self.lbl_progresso_frequencia.config(text=f"Gravados {gravados} de {total} aluno(s)")
+
+    def concluir_envio_frequencia(self, envio):
+        self.bloquear_frequencia(False)
+        self.mostrar_progresso_frequencia(envio.alunos_confirmados(), envio.total_alunos)
+        self.atualizar_risco_frequencia()
+        if envio.concluido():
+            messagebox.showinfo("Sucesso", f"Frequência de {envio.total_alunos} aluno(s) registrada para a turma {envio.id_turma} em {envio.data}.")
+            self.log_action(f"registrou frequência para a turma {envio.id_turma} em {envio.data}")
+        else:
+            messagebox.showerror("Erro", f"Só {envio.alunos_confirmados()} de {envio.total_alunos} aluno(s) foram gravados: {envio.ultimo_erro}\n\n"
+                                         "Clique em 'Salvar Frequência' de novo para enviar apenas o que falta.")
+
+    def importar_frequencia(self):
+        caminho = filedialog.askopenfilename(title="Importar Frequência (aluno;data;status)",
+                                             filetypes=[("Planilhas CSV", "*.csv"), ("Todos os arquivos", "*.*")])
+        if not caminho:
+            return
+        self.bloquear_frequencia(True)
+        self.lbl_progresso_frequencia.config(text="Lendo o arquivo...")
+        self.controller.cliente.executor.submeter(self.controller.cliente.preparar_importacao_frequencia, caminho,
+                                                  ao_concluir=self.confirmar_importacao_frequencia,
+                                                  ao_falhar=self.falha_importacao_frequencia)
+
+    def falha_importacao_frequencia(self, erro):
+        self.bloquear_frequencia(False)
+        self.lbl_progresso_frequencia.config(text="")
+        messagebox.showerror("Importar Frequência", f"Não foi possível ler o arquivo: {erro}")
+
+    def confirmar_importacao_frequencia(self, importacao):
+        texto = f"{importacao.total_alunos} registro(s) em {len(importacao.envios)} chamada(s) (turma e data)."
+        if importacao.erros:
+            texto += f"\n\n{len(importacao.erros)} linha(s) serão ignoradas:\n{importacao.resumo_erros()}"
+        if not importacao.envios:
+            messagebox.showwarning("Importar Frequência", f"Nenhuma linha válida no arquivo.\n\n{importacao.resumo_erros()}")
+        elif messagebox.askyesno("Importar Frequência", f"{texto}\n\nDeseja enviar ao servidor?"):
+            self.enviar_importacao_frequencia(importacao)
+            return
+        self.bloquear_frequencia(False)
+        self.lbl_progresso_frequencia.config(text="")
+
+    def enviar_importacao_frequencia(self, importacao):
+        self.mostrar_progresso_frequencia(importacao.alunos_confirmados(), importacao.total_alunos)
+        self.controller.cliente.enviar_frequencias_async(importacao.envios, lambda _: self.concluir_importacao_frequencia(importacao),
+                                                         ao_progresso=self.mostrar_progresso_frequencia,
+                                                         paralelo=PARALELISMO_IMPORTACAO)
+
+    def concluir_importacao_frequencia(self, importacao):
+        gravados = importacao.alunos_confirmados()
+        self.mostrar_progresso_frequencia(gravados, importacao.total_alunos)
+        self.atualizar_risco_frequencia()
+        if importacao.concluida():
+            self.bloquear_frequencia(False)
+            self.log_action(f"importou frequência: {gravados} registro(s) em {len(importacao.envios)} chamada(s)")
+            messagebox.showinfo("Sucesso", f"Frequência importada: {gravados} registro(s) em {len(importacao.envios)} chamada(s).")
+        elif messagebox.askretrycancel("Importar Frequência", f"Só {gravados} de {importacao.total_alunos} registro(s) foram gravados.\n"
+                                                              "Tentar enviar o restante agora?"):
+            self.enviar_importacao_frequencia(importacao)  # As partes já gravadas não são reenviadas
+        else:
+            self.bloquear_frequencia(False)
     # --- FIM NOVA TELA ---
 
     def criar_tela_mural(self, parent):
@@ -1184,12 +1844,29 @@ class PainelAluno(tk.Frame):
         self.criar_tela_boletim(frame_boletim)
         self.criar_tela_mural(frame_mural)
         self.criar_tela_financeiro_aluno(frame_financeiro_aluno) # NOVA ABA
+        # Cada aba só recarrega quando a tabela que ela mostra muda no servidor.
+        self._assinatura = self.controller.cliente.assinar_alteracoes(
+            ("NOTAS", "MATERIAS", "MENSAGENS", "FINANCEIRO"), self.ao_alterar_dados)
+
+    def ao_alterar_dados(self, alteradas):
+        if "NOTAS" in alteradas or "MATERIAS" in alteradas:
+            self.atualizar_boletim()
+        if "MENSAGENS" in alteradas:
+            self.atualizar_mural()
+        if "FINANCEIRO" in alteradas:
+            self.atualizar_financeiro_aluno()
+
+    def destroy(self):
+        self.controller.cliente.cancelar_assinatura(getattr(self, "_assinatura", None))
+        self._assinatura = None
+        super().destroy()
 
     def criar_tela_boletim(self, parent):
         self.tree_boletim = ttk.Treeview(parent, columns=("Materia", "NP1", "NP2", "PIM", "Média", "Status"), show="headings")
         for col in ("Materia", "NP1", "NP2", "PIM", "Média", "Status"):
             self.tree_boletim.heading(col, text=col)
         self.tree_boletim.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabela_boletim = TabelaChaveada(self.tree_boletim, chave=lambda b: b[0])
         
         btn_frame = ttk.Frame(parent)
         btn_frame.pack(pady=5)
@@ -1198,46 +1875,21 @@ class PainelAluno(tk.Frame):
         self.atualizar_boletim()
 
     def atualizar_boletim(self):
-        self.tree_boletim.delete(*self.tree_boletim.get_children())
-        
-        resp_notas = self.controller.cliente.enviar_comando("LISTAR_NOTAS_TODOS")
-        resp_materias = self.controller.cliente.enviar_comando("LISTAR_MATERIAS")
-        
-        tipo_notas, notas = processar_resposta_servidor(resp_notas)
-        tipo_materias, materias = processar_resposta_servidor(resp_materias)
-
-        if tipo_notas is None or tipo_materias is None: return
+        # Só as notas do aluno vêm do servidor, não as da escola toda.
+        comando = f"{COMANDO_LISTAR_NOTAS_ALUNO};{self.dados_aluno['id']}"
+        self.controller.cliente.quadro_notas_async(self.preencher_boletim, comando=comando, chave="aluno.boletim")
 
-        mapa_materias = {m[0]: m[1] for m in materias} 
-        notas_aluno = {}
+    def preencher_boletim(self, quadro, materias):
+        if quadro is None:
+            self.tabela_boletim.limpar()
+            return
 
-        for id_aluno, id_materia, tipo_nota, valor_nota in notas:
-            if id_aluno == self.dados_aluno['id']:
-                if id_materia not in notas_aluno:
-                    notas_aluno[id_materia] = {}
-                notas_aluno[id_materia][tipo_nota] = float(valor_nota.replace(',', '.'))
-        
-        for id_materia, grades in notas_aluno.items():
-            np1 = grades.get("NP1", 0.0)
-            np2 = grades.get("NP2", 0.0)
-            pim = grades.get("PIM", 0.0)
-            
-            media = (np1 * 0.4) + (np2 * 0.4) + (pim * 0.2)
-            
-            status = "Cursando"
-            if "PIM" in grades:
-                if media >= 7.0:
-                    status = "Aprovado"
-                else:
-                    exame = grades.get("EXAME")
-                    if exame is not None:
-                        media_final = (media + exame) / 2
-                        status = "Aprovado (Exame)" if media_final >= 5.0 else "Reprovado (DP)"
-                    else:
-                        status = "Exame"
-            
-            nome_materia = mapa_materias.get(id_materia, f"Matéria ID {id_materia}")
-            self.tree_boletim.insert("", "end", values=(nome_materia, f"{np1:.1f}", f"{np2:.1f}", f"{pim:.1f}", f"{media:.2f}", status))
+        linhas = []
+        for r in quadro.boletim(self.dados_aluno['id']):
+            nome_materia = materias[r.id_materia][1] if r.id_materia in materias else f"Matéria ID {r.id_materia}"
+            linhas.append((nome_materia, formatar_nota(r.np1, vazio="0.0"), formatar_nota(r.np2, vazio="0.0"),
+                           formatar_nota(r.pim, vazio="0.0"), f"{r.media:.2f}", r.situacao))
+        self.tabela_boletim.atualizar(linhas)
 
     def solicitar_exame(self):
         selecionado = self.tree_boletim.focus()
@@ -1252,7 +1904,7 @@ class PainelAluno(tk.Frame):
             
         materia = self.tree_boletim.item(selecionado, 'values')[0]
         if messagebox.askyesno("Confirmar", f"Deseja confirmar a solicitação de exame para a matéria '{materia}'?"):
-            self.controller.cliente.enviar_comando(f"LOG;O aluno '{self.dados_aluno['nome']}' solicitou exame para '{materia}'")
+            self.controller.cliente.registrar_log(f"O aluno '{self.dados_aluno['nome']}' solicitou exame para '{materia}'")
             messagebox.showinfo("Sucesso", "Solicitação de exame registrada! Entre em contato com seu professor.")
 
     def criar_tela_mural(self, parent):
@@ -1260,16 +1912,15 @@ class PainelAluno(tk.Frame):
         self.tree_mural.heading("Data", text="Data"); self.tree_mural.heading("Mensagem", text="Mensagem")
         self.tree_mural.column("Mensagem", width=500)
         self.tree_mural.pack(fill="both", expand=True)
+        self.tabela_mural = TabelaChaveada(self.tree_mural)
         self.atualizar_mural()
 
     def atualizar_mural(self):
-        self.tree_mural.delete(*self.tree_mural.get_children())
-        resp = self.controller.cliente.enviar_comando("LISTAR_MENSAGENS")
+        self.controller.cliente.listar_mensagens_da_turma(self.dados_aluno["turma_id"], self.preencher_mural, chave="aluno.mural")
+
+    def preencher_mural(self, resp):
         tipo, mensagens = processar_resposta_servidor(resp)
-        if tipo == "DADOS":
-            for msg in mensagens:
-                if msg[0] == self.dados_aluno["turma_id"]:
-                    self.tree_mural.insert("", "end", values=(msg[1], msg[2]))
+        self.tabela_mural.atualizar([(msg[1], msg[2]) for msg in mensagens] if tipo == "DADOS" else [])
 
     # --- NOVA TELA FINANCEIRO ALUNO ---
     def criar_tela_financeiro_aluno(self, parent):
@@ -1277,19 +1928,16 @@ class PainelAluno(tk.Frame):
         self.tree_financeiro_aluno = ttk.Treeview(parent, columns=("Ano", "Mês", "Valor", "Status"), show="headings")
         for col in ("Ano", "Mês", "Valor", "Status"): self.tree_financeiro_aluno.heading(col, text=col)
         self.tree_financeiro_aluno.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabela_financeiro_aluno = TabelaChaveada(self.tree_financeiro_aluno, chave=lambda f: (f[0], f[1]))
         self.atualizar_financeiro_aluno()
     
     def atualizar_financeiro_aluno(self):
-        self.tree_financeiro_aluno.delete(*self.tree_financeiro_aluno.get_children())
         id_aluno = self.dados_aluno.get('id')
         if not id_aluno: return
+        self.controller.cliente.consultar_registros_async(f"LISTAR_FINANCEIRO;{id_aluno}", Financeiro, self.preencher_financeiro_aluno, chave="aluno.financeiro")
 
-        resp = self.controller.cliente.enviar_comando(f"LISTAR_FINANCEIRO;{id_aluno}")
-        tipo, registros = processar_resposta_servidor(resp)
-        if tipo == "DADOS":
-            for r in registros:
-                # r[0] é o id_aluno, que não precisamos mostrar aqui
-                self.tree_financeiro_aluno.insert("", "end", values=(r[1], r[2], f"R$ {r[3]}", r[4]))
+    def preencher_financeiro_aluno(self, tipo, registros):
+        self.tabela_financeiro_aluno.atualizar([(r.ano, r.mes, f"R$ {r.valor}", r.status) for r in registros] if tipo == "DADOS" else [])
 
 
 # --- Diálogos Personalizados ---
@@ -1361,12 +2009,11 @@ class AddGradesDialog(simpledialog.Dialog):
         return self.aluno_combo
 
     def popular_combos(self):
-        resp_alunos = self.master.controller.cliente.enviar_comando("LISTAR_ALUNOS")
+        resp_alunos, resp_materias = self.master.controller.cliente.enviar_lote(["LISTAR_ALUNOS", "LISTAR_MATERIAS"])
         tipo_a, alunos = processar_resposta_servidor(resp_alunos)
         if tipo_a == "DADOS":
             self.aluno_combo['values'] = [f"{a[0]} - {a[1]}" for a in alunos]
         
-        resp_materias = self.master.controller.cliente.enviar_comando("LISTAR_MATERIAS")
         tipo_m, materias = processar_resposta_servidor(resp_materias)
         if tipo_m == "DADOS":
             self.materia_combo['values'] = [f"{m[0]} - {m[1]}" for m in materias]
@@ -1443,8 +2090,19 @@ class PerfilUsuarioDialog(tk.Toplevel):
 
 
 if __name__ == "__main__":
+    logging.basicConfig(filename=ARQUIVO_REGISTRO, level=logging.WARNING, encoding="utf-8",
+                        format="%(asctime)s %(name)s %(levelname)s: %(message)s")
     if not MATPLOTLIB_DISPONIVEL:
         print("Aviso: Matplotlib não encontrado. Os gráficos não serão exibidos.")
         print("Instale com: pip install matplotlib")
+    # Com --tempos, imprime ao sair quanto levou cada etapa da inicialização.
+    exibir_tempos = "--tempos" in sys.argv
     app = App()
-    app.mainloop()
+    marcar("janela montada")
+    app.after_idle(marcar, "primeira pintura")
+    try:
+        app.mainloop()
+    finally:
+        app.cliente.fechar()
+        if exibir_tempos:
+            print(relatorio_inicializacao())
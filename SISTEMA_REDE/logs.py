@@ -0,0 +1,88 @@
+"""Log de atividades lido por páginas, das entradas mais novas para as mais antigas, e acompanhamento das novas."""
+import re
+
+COMANDO_LISTAR_LOGS = "LISTAR_LOGS"
+MARCADOR_CURSOR = "CURSOR"
+TAMANHO_PAGINA_LOGS = 200
+
+_PREFIXO_DATA = re.compile(r"\d{4}(-\d{2}(-\d{2})?)?")
+
+
+def prefixo_data_valido(texto):
+    """Aceita AAAA, AAAA-MM ou AAAA-MM-DD, os prefixos que o servidor compara com a data de cada entrada."""
+    return _PREFIXO_DATA.fullmatch(texto) is not None
+
+
+class ConsultaLogs:
+    """Entradas do log já carregadas, mais recentes primeiro, e os cursores para continuar a leitura.
+
+    Os cursores são posições em bytes no arquivo do servidor. A primeira
+    página é lida do fim do arquivo para trás (LISTAR_LOGS;ANTES), então abrir
+    a aba custa o mesmo com qualquer tamanho de histórico, e cada página
+    seguinte continua de onde a anterior parou. O acompanhamento
+    (LISTAR_LOGS;DESDE) pede só o que foi gravado depois do fim já visto; se o
+    log foi limpo no servidor, a leitura recomeça do início e as entradas são
+    substituídas. Usada só na thread do Tk: os comandos levam a geração da
+    consulta, e respostas de uma consulta já reiniciada são descartadas.
+    """
+    def __init__(self, tamanho_pagina=TAMANHO_PAGINA_LOGS):
+        self.tamanho_pagina = tamanho_pagina
+        self.geracao = 0
+        self.reiniciar()
+
+    def reiniciar(self, de="", ate=""):
+        """Descarta o que foi carregado; 'de' e 'ate' são prefixos de datas AAAA-MM-DD (vazios: sem limite)."""
+        self.de, self.ate = de, ate
+        self.entradas = []  # (data e hora, ação), mais recentes primeiro
+        self.antes = -1  # Fim da próxima página antiga; -1 é o fim do arquivo e 0, que não há mais
+        self.desde = None  # Fim do arquivo na última leitura
+        self.geracao += 1
+
+    def tem_mais_antigas(self):
+        return self.antes != 0
+
+    def comando_pagina(self):
+        return (self.geracao,
+                f"{COMANDO_LISTAR_LOGS};ANTES;{self.antes};{self.tamanho_pagina};{self.de};{self.ate}")
+
+    def comando_novas(self):
+        return self.geracao, f"{COMANDO_LISTAR_LOGS};DESDE;{self.desde};{self.tamanho_pagina}"
+
+    def aplicar_pagina(self, geracao, registros):
+        """Acrescenta uma página antiga. Retorna False se a resposta era de uma consulta anterior."""
+        cursor, entradas = self._separar(geracao, registros)
+        if cursor is None:
+            return False
+        self.antes = cursor[0]
+        if self.desde is None:
+            self.desde = cursor[1]
+        self.entradas.extend(entradas)
+        return True
+
+    def aplicar_novas(self, geracao, registros):
+        """Põe no topo as entradas gravadas desde a última leitura. Retorna se algo mudou."""
+        cursor, entradas = self._separar(geracao, registros)
+        if cursor is None:
+            return False
+        inicio, proximo = cursor
+        reiniciado = inicio != self.desde
+        self.desde = proximo
+        if reiniciado:
+            self.entradas = []  # O log foi limpo: tudo o que existe agora vem a partir desta leitura
+            self.antes = 0
+        # O servidor não filtra as novas por data; o intervalo é aplicado aqui.
+        entradas = [e for e in entradas
+                    if e[0][:len(self.de)] >= self.de and (not self.ate or e[0][:len(self.ate)] <= self.ate)]
+        entradas.reverse()
+        self.entradas[:0] = entradas
+        return bool(entradas) or reiniciado
+
+    def _separar(self, geracao, registros):
+        if geracao != self.geracao or not registros or registros[0][0] != MARCADOR_CURSOR:
+            return None, ()
+        try:
+            cursor = (int(registros[0][1]), int(registros[0][2]))
+        except (IndexError, ValueError):
+            return None, ()
+        # A ação pode conter ';': só o primeiro campo é a data.
+        return cursor, [(campos[0], ";".join(campos[1:])) for campos in registros[1:] if len(campos) >= 2]
@@ -0,0 +1,247 @@
+"""Cálculo de médias e situação de todas as notas de uma vez, em colunas."""
+import math
+import threading
+import time
+from collections import namedtuple
+
+from dependencias import DependenciaOpcional
+from rede import TTL_CACHE, nome_comando
+
+NUMPY = DependenciaOpcional("numpy")
+
+# --- Regras de Aprovação ---
+TIPOS_NOTA = ("NP1", "NP2", "PIM", "EXAME")
+PESOS = {"NP1": 0.4, "NP2": 0.4, "PIM": 0.2}
+MEDIA_APROVACAO = 7.0
+MEDIA_FINAL_EXAME = 5.0  # (média + exame) / 2
+
+# Situações, na ordem em que as regras são testadas; as colunas guardam o índice.
+SITUACOES = ("Cursando", "Aprovado", "Exame", "Aprovado (Exame)", "Reprovado (DP)")
+CURSANDO, APROVADO, EXAME, APROVADO_EXAME, REPROVADO = range(len(SITUACOES))
+
+SEM_NOTA = math.nan
+
+COMANDO_LISTAR_NOTAS = "LISTAR_NOTAS_TODOS"
+COMANDO_LISTAR_NOTAS_ALUNO = "LISTAR_NOTAS_ALUNO"
+COMANDO_CADASTRAR_NOTA = "CADASTRAR_NOTA"
+COMANDO_LIMPAR_NOTAS = "LIMPAR_NOTAS"
+
+ResultadoNota = namedtuple("ResultadoNota", "id_aluno id_materia np1 np2 pim exame media situacao")
+EstatisticaMateria = namedtuple("EstatisticaMateria",
+                                "id_materia alunos media minima maxima aprovados exame reprovados cursando")
+
+
+def _valor(texto):
+    try:
+        return float(str(texto).replace(',', '.'))
+    except ValueError:
+        return SEM_NOTA
+
+
+def formatar_nota(valor, casas=1, vazio="-"):
+    return vazio if math.isnan(valor) else f"{valor:.{casas}f}"
+
+
+def _calcular_numpy(np, colunas):
+    np1, np2, pim, exame = (np.asarray(colunas[tipo], dtype=float) for tipo in TIPOS_NOTA)
+    media = sum(peso * np.nan_to_num(coluna) for peso, coluna in zip(PESOS.values(), (np1, np2, pim)))
+    media_final = (media + exame) / 2  # NaN onde não há exame
+    situacao = np.select(
+        [np.isnan(pim), media >= MEDIA_APROVACAO, np.isnan(exame), media_final >= MEDIA_FINAL_EXAME],
+        [CURSANDO, APROVADO, EXAME, APROVADO_EXAME], REPROVADO)
+    return media.tolist(), situacao.tolist()
+
+
+def _calcular_linha(np1, np2, pim, exame):
+    media = sum(peso * (0.0 if math.isnan(valor) else valor)
+                for peso, valor in zip(PESOS.values(), (np1, np2, pim)))
+    if math.isnan(pim):
+        situacao = CURSANDO
+    elif media >= MEDIA_APROVACAO:
+        situacao = APROVADO
+    elif math.isnan(exame):
+        situacao = EXAME
+    else:
+        situacao = APROVADO_EXAME if (media + exame) / 2 >= MEDIA_FINAL_EXAME else REPROVADO
+    return media, situacao
+
+
+def _calcular_python(colunas):
+    medias, situacoes = [], []
+    for linha in zip(*(colunas[tipo] for tipo in TIPOS_NOTA)):
+        media, situacao = _calcular_linha(*linha)
+        medias.append(media)
+        situacoes.append(situacao)
+    return medias, situacoes
+
+
+class QuadroNotas:
+    """Notas da escola em colunas: uma linha por (aluno, matéria), uma coluna por tipo.
+
+    calcular() obtém a média e a situação de todas as linhas numa única
+    passada, vetorizada com NumPy quando ele está instalado. Boletim do aluno,
+    visão do professor e painel de aprovação leem do mesmo cálculo, que só é
+    refeito depois que uma nota nova é registrada.
+    """
+    def __init__(self, notas=()):
+        self._linhas = {}  # (id_aluno, id_materia) -> posição nas colunas
+        self._chaves = []  # posição -> (id_aluno, id_materia)
+        self._por_aluno = {}  # id_aluno -> posições
+        self._colunas = {tipo: [] for tipo in TIPOS_NOTA}
+        self._calculo = None  # (medias, situacoes)
+        self._versao = 0  # Avança a cada nota registrada
+        for nota in notas:
+            if len(nota) >= 4:
+                self.registrar(*nota[:4])
+
+    def registrar(self, id_aluno, id_materia, tipo, valor):
+        """Grava uma nota; como no CSV do servidor, a última de cada tipo prevalece."""
+        if tipo not in self._colunas:
+            return
+        chave = (id_aluno, id_materia)
+        posicao = self._linhas.get(chave)
+        if posicao is None:
+            posicao = self._linhas[chave] = len(self._chaves)
+            self._chaves.append(chave)
+            self._por_aluno.setdefault(id_aluno, []).append(posicao)
+            for coluna in self._colunas.values():
+                coluna.append(SEM_NOTA)
+        self._colunas[tipo][posicao] = _valor(valor)
+        self._calculo = None
+        self._versao += 1
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def calcular(self):
+        """Calcula médias e situações de todas as linhas; o resultado fica guardado."""
+        calculo = self._calculo
+        if calculo is None:
+            versao = self._versao
+            modulos = NUMPY.carregar()
+            if modulos is not None:
+                calculo = _calcular_numpy(modulos[0], self._colunas)
+            else:
+                calculo = _calcular_python(self._colunas)
+            if versao == self._versao:  # Uma nota registrada no meio tornaria o cálculo velho
+                self._calculo = calculo
+        return calculo
+
+    def _resultado(self, posicao):
+        id_aluno, id_materia = self._chaves[posicao]
+        notas = [self._colunas[tipo][posicao] for tipo in TIPOS_NOTA]
+        if self._calculo is not None:
+            media, situacao = self._calculo[0][posicao], self._calculo[1][posicao]
+        else:
+            media, situacao = _calcular_linha(*notas)
+        return ResultadoNota(id_aluno, id_materia, *notas, media, SITUACOES[situacao])
+
+    # --- Consultas ---
+    def boletim(self, id_aluno):
+        """Resultados do aluno, uma linha por matéria, na ordem de lançamento.
+
+        Usa o índice por aluno e, se o cálculo geral não estiver pronto, calcula
+        só as linhas do aluno: o custo não depende do tamanho da escola.
+        """
+        return [self._resultado(posicao) for posicao in self._por_aluno.get(id_aluno, ())]
+
+    def notas_do_aluno(self, id_aluno):
+        """{id_materia: {tipo: valor}} com as notas lançadas para o aluno."""
+        notas = {}
+        for posicao in self._por_aluno.get(id_aluno, ()):
+            valores = {tipo: self._colunas[tipo][posicao] for tipo in TIPOS_NOTA}
+            notas[self._chaves[posicao][1]] = {tipo: v for tipo, v in valores.items() if not math.isnan(v)}
+        return notas
+
+    def resultados(self, materias=None):
+        """Resultados de todos os alunos, opcionalmente só das matérias indicadas."""
+        materias = set(materias) if materias is not None else None
+        self.calcular()
+        return [self._resultado(posicao) for posicao, (_, id_materia) in enumerate(self._chaves)
+                if materias is None or id_materia in materias]
+
+    def estatisticas(self, materias=None):
+        """EstatisticaMateria por matéria: médias e quantos alunos estão em cada situação."""
+        medias, situacoes = self.calcular()
+        grupos = {}
+        for posicao, (_, id_materia) in enumerate(self._chaves):
+            if materias is None or id_materia in materias:
+                grupos.setdefault(id_materia, []).append(posicao)
+
+        estatisticas = []
+        for id_materia, posicoes in grupos.items():
+            valores = [medias[p] for p in posicoes]
+            contagem = [0] * len(SITUACOES)
+            for p in posicoes:
+                contagem[situacoes[p]] += 1
+            estatisticas.append(EstatisticaMateria(
+                id_materia, len(posicoes), sum(valores) / len(valores), min(valores), max(valores),
+                contagem[APROVADO] + contagem[APROVADO_EXAME], contagem[EXAME], contagem[REPROVADO],
+                contagem[CURSANDO]))
+        return estatisticas
+
+    def totais_por_situacao(self):
+        """{situação: quantidade de linhas (aluno, matéria)} na escola toda."""
+        _, situacoes = self.calcular()
+        contagem = [0] * len(SITUACOES)
+        for situacao in situacoes:
+            contagem[situacao] += 1
+        return dict(zip(SITUACOES, contagem))
+
+
+class IndiceNotas:
+    """QuadroNotas já carregados, por consulta, mantidos em dia pelas escritas deste cliente.
+
+    Um CADASTRAR_NOTA bem-sucedido é aplicado direto nos quadros que contêm o
+    aluno (a escola toda e o boletim dele), em vez de forçar uma nova
+    listagem. Como no CacheRespostas, cada quadro vale por TTL_CACHE, para
+    que notas lançadas por outras estações apareçam, e um quadro cuja
+    leitura cruzou com uma escrita não é guardado.
+    """
+    def __init__(self, ttl=TTL_CACHE):
+        self.ttl = ttl
+        self._quadros = {}  # comando -> (expira_em, QuadroNotas)
+        self._geracao = 0
+        self._lock = threading.Lock()
+
+    def obter(self, comando):
+        with self._lock:
+            entrada = self._quadros.get(comando)
+            if entrada is None or entrada[0] < time.monotonic():
+                self._quadros.pop(comando, None)
+                return None
+            return entrada[1]
+
+    def geracao(self):
+        with self._lock:
+            return self._geracao
+
+    def guardar(self, comando, quadro, geracao):
+        with self._lock:
+            if geracao == self._geracao:
+                self._quadros[comando] = (time.monotonic() + self.ttl, quadro)
+
+    def invalidar(self):
+        """Descarta os quadros (ex.: notas alteradas por outra estação)."""
+        with self._lock:
+            self._geracao += 1
+            self._quadros.clear()
+
+    def aplicar(self, comando, resposta):
+        """Atualiza os quadros com o resultado de um comando de escrita enviado ao servidor."""
+        nome = nome_comando(comando)
+        if nome not in (COMANDO_CADASTRAR_NOTA, COMANDO_LIMPAR_NOTAS) or not resposta.startswith("SUCESSO"):
+            return
+        with self._lock:
+            self._geracao += 1
+            if nome == COMANDO_LIMPAR_NOTAS:
+                self._quadros.clear()
+                return
+            campos = comando.split(";")[1:]
+            if len(campos) < 4:
+                return
+            id_aluno, id_materia, tipo, valor = campos[:4]
+            valor = round(_valor(valor), 2)  # O servidor grava com duas casas
+            for consulta, (_, quadro) in self._quadros.items():
+                if consulta in (COMANDO_LISTAR_NOTAS, f"{COMANDO_LISTAR_NOTAS_ALUNO};{id_aluno}"):
+                    quadro.registrar(id_aluno, id_materia, tipo, valor)
@@ -0,0 +1,138 @@
+"""Avisos de alteração vindos do servidor: as telas recarregam só o que mudou, quando muda."""
+import itertools
+import socket
+import threading
+
+from logs import MARCADOR_CURSOR
+from rede import INVALIDACOES, enviar_frame, nome_comando, receber_frame
+from replica import ESCRITAS
+
+COMANDO_AGUARDAR_ALTERACOES = "AGUARDAR_ALTERACOES"
+ESPERA_ALTERACOES_MS = 25000  # Quanto o servidor segura cada pedido sem alterações
+MARGEM_TIMEOUT = 10.0  # Segundos além da espera antes de dar a conexão por perdida
+ESPERA_SEM_SERVIDOR = 5.0  # Depois de uma falha, segundos até conectar de novo
+
+# Comando de escrita -> tabela que ele altera, como em EFEITOS_ESCRITA (en.c).
+TABELAS_ALTERADAS = dict(ESCRITAS, POSTAR_MENSAGEM="MENSAGENS", LIMPAR_MENSAGENS="MENSAGENS",
+                         CADASTRAR_ATIVIDADE="ATIVIDADES")
+
+
+def listagens_afetadas(tabelas):
+    """Listagens do CacheRespostas que uma alteração nas tabelas deixa desatualizadas."""
+    return {listagem for comando, listagens in INVALIDACOES.items()
+            if TABELAS_ALTERADAS.get(comando) in tabelas for listagem in listagens}
+
+
+class CanalAlteracoes:
+    """Mantém um AGUARDAR_ALTERACOES sempre pendente no servidor e avisa quem assinou as tabelas alteradas.
+
+    O pedido vai numa conexão só do canal, fora do pool, e o servidor só o
+    responde quando há uma escrita nova (ou quando a espera acaba, sem
+    tabelas): cada resposta traz "tabela X mudou na versão N" e já é seguida
+    do próximo pedido. Os assinantes são chamados na thread do canal, na
+    ordem em que assinaram, com {tabela: versão}. A primeira resposta só
+    informa as versões atuais; depois de uma queda, se o servidor foi
+    reiniciado, todas as tabelas são dadas como alteradas.
+
+    Sem servidor que conheça o comando, o canal faz as vezes dele para as
+    escritas desta estação: publicar() avisa as tabelas que elas alteraram.
+    """
+    def __init__(self, host, porta, espera_ms=ESPERA_ALTERACOES_MS):
+        self.host = host
+        self.porta = porta
+        self.espera_ms = espera_ms
+        self.conectado = False  # Há um pedido pendente no servidor
+        self.suportado = True  # Vira False se o servidor for antigo e não conhecer o comando
+        self.versoes = {}  # tabela -> sequência da última alteração conhecida
+        self._epoca = 0
+        self._sequencia = 0
+        self._assinaturas = {}  # id -> (tabelas ou None para todas, funcao)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._sock = None
+        self._encerrando = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="conectapro-alteracoes", daemon=True)
+        self._thread.start()
+
+    def assinar(self, tabelas, funcao):
+        """funcao({tabela: versão}) é chamada quando alguma das tabelas muda; None assina todas."""
+        with self._lock:
+            assinatura = next(self._ids)
+            self._assinaturas[assinatura] = (frozenset(tabelas) if tabelas is not None else None, funcao)
+            return assinatura
+
+    def cancelar(self, assinatura):
+        with self._lock:
+            return self._assinaturas.pop(assinatura, None) is not None
+
+    def publicar(self, comando, resposta):
+        """Avisa a alteração feita por um comando desta estação, se o servidor não puder avisá-la."""
+        tabela = TABELAS_ALTERADAS.get(nome_comando(comando))
+        if tabela is not None and not self.conectado and resposta.startswith("SUCESSO"):
+            self._avisar({tabela: None})
+
+    def encerrar(self, espera=None):
+        self._encerrando.set()
+        with self._lock:
+            sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)  # Desbloqueia a leitura do pedido pendente
+            except OSError:
+                pass
+        self._thread.join(espera)
+
+    # --- Thread do canal ---
+    def _executar(self):
+        while not self._encerrando.is_set():
+            try:
+                with socket.create_connection((self.host, self.porta),
+                                              timeout=self.espera_ms / 1000 + MARGEM_TIMEOUT) as sock:
+                    with self._lock:
+                        self._sock = sock
+                    if self._encerrando.is_set():
+                        return
+                    while True:
+                        enviar_frame(sock, f"{COMANDO_AGUARDAR_ALTERACOES};{self._epoca};{self._sequencia};{self.espera_ms}")
+                        resposta = receber_frame(sock)
+                        if resposta.startswith(f"ERRO;Comando '{COMANDO_AGUARDAR_ALTERACOES}'"):
+                            self.suportado = False  # Servidor antigo: fica só publicar()
+                            return
+                        self._aplicar(resposta)
+            except OSError:
+                pass
+            finally:
+                self.conectado = False
+                with self._lock:
+                    self._sock = None
+            self._encerrando.wait(ESPERA_SEM_SERVIDOR)
+
+    def _aplicar(self, resposta):
+        registros = resposta[len("DADOS;"):].split("|") if resposta.startswith("DADOS;") else [""]
+        cursor = registros[0].split(";")
+        if len(cursor) < 3 or cursor[0] != MARCADOR_CURSOR:
+            raise ConnectionError(f"Resposta inesperada a {COMANDO_AGUARDAR_ALTERACOES}: {resposta[:80]}")
+        epoca, sequencia = int(cursor[1]), int(cursor[2])
+        versoes = {}
+        for registro in registros[1:]:
+            tabela, _, versao = registro.partition(";")
+            versoes[tabela] = int(versao)
+
+        primeira = self._epoca == 0
+        reiniciado = not primeira and epoca != self._epoca
+        alteradas = {tabela: versao for tabela, versao in versoes.items()
+                     if reiniciado or self.versoes.get(tabela) != versao}
+        self._epoca, self._sequencia = epoca, sequencia
+        self.versoes.update(versoes)
+        self.conectado = True
+        if alteradas and not primeira:
+            self._avisar(alteradas)
+
+    def _avisar(self, alteradas):
+        with self._lock:
+            assinaturas = list(self._assinaturas.values())
+        for tabelas, funcao in assinaturas:
+            if tabelas is None:
+                funcao(dict(alteradas))
+            elif not tabelas.isdisjoint(alteradas):
+                funcao({tabela: versao for tabela, versao in alteradas.items() if tabela in tabelas})
@@ -0,0 +1,383 @@
+"""Camada de rede do cliente ConectaPro: enquadramento de mensagens e pool de conexões."""
+import codecs
+import select
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+# --- Protocolo de Enquadramento ---
+# Cada mensagem é precedida por 4 bytes com o seu tamanho (big-endian),
+# o que permite trafegar vários comandos pela mesma conexão TCP.
+FORMATO_CABECALHO = "!I"
+TAMANHO_CABECALHO = struct.calcsize(FORMATO_CABECALHO)
+MAX_FRAME = 256 * 1024 * 1024  # Limite de sanidade para respostas
+TAMANHO_BLOCO = 64 * 1024
+
+COMANDO_PING = "PING"
+RESPOSTA_PING = "SUCESSO;PONG"
+
+# --- Lotes de Comandos ---
+# "LOTE;cmd1<RS>cmd2..." leva vários comandos numa só ida e volta; a resposta
+# "LOTE;resp1<RS>resp2..." traz as respostas na mesma ordem.
+COMANDO_LOTE = "LOTE"
+SEPARADOR_LOTE = "\x1e"
+MAX_COMANDOS_LOTE = 64  # Igual ao limite do servidor
+
+# --- Contagens Agregadas ---
+# "CONTAR;<agrupamento>" responde "DADOS;valor;quantidade|...", calculado no
+# servidor; agrupamentos sem coluna (CURSOS, TURMAS...) respondem "DADOS;TOTAL;n".
+COMANDO_CONTAR = "CONTAR"
+CHAVE_TOTAL = "TOTAL"
+
+# --- Consultas ---
+# Comandos que não alteram nada no servidor: podem ser repetidos com segurança.
+COMANDOS_CONSULTA = {COMANDO_PING, COMANDO_CONTAR, "LER_TABELA"}
+PREFIXOS_CONSULTA = ("LISTAR_", "BUSCAR_")
+
+# --- Cache de Respostas ---
+TTL_CACHE = 30.0
+
+# Listagens de dados de referência cujas respostas podem ser reaproveitadas.
+COMANDOS_CACHEAVEIS = {"LISTAR_CURSOS", "LISTAR_MATERIAS", "LISTAR_TURMAS", "LISTAR_ALUNOS",
+                       "LISTAR_ALUNOS_TURMA", "BUSCAR_ALUNO"}
+
+# Comando de escrita -> listagens que ele deixa desatualizadas quando tem sucesso.
+INVALIDACOES = {
+    "CADASTRAR_CURSO": ("LISTAR_CURSOS",),
+    "EXCLUIR_CURSO": ("LISTAR_CURSOS",),
+    "CADASTRAR_MATERIA": ("LISTAR_MATERIAS",),
+    "CADASTRAR_TURMA": ("LISTAR_TURMAS",),
+    "EXCLUIR_TURMA": ("LISTAR_TURMAS",),
+    "CADASTRAR_ALUNO": ("LISTAR_ALUNOS", "LISTAR_ALUNOS_TURMA", "BUSCAR_ALUNO"),
+    "EXCLUIR_ALUNO": ("LISTAR_ALUNOS", "LISTAR_ALUNOS_TURMA", "BUSCAR_ALUNO"),
+}
+
+
+class ConexaoEncerrada(ConnectionError):
+    """O servidor fechou a conexão no meio de uma mensagem."""
+
+
+class _ComandoNaoEntregue(Exception):
+    """A conexão falhou antes de o servidor executar o comando: ele pode ir por outra."""
+    def __init__(self, erro):
+        super().__init__(erro)
+        self.erro = erro
+
+
+def nome_comando(comando):
+    return comando.split(";", 1)[0]
+
+
+# Maiúsculas ASCII e acentuadas do Latin-1 (À-Þ, sem o sinal de vezes) -> minúsculas,
+# a mesma regra de iguais_sem_caixa no en.c.
+_MINUSCULAS = {codigo: codigo + 0x20 for codigo in (*range(0x41, 0x5B), *range(0xC0, 0xDF)) if codigo != 0xD7}
+
+
+def iguais_sem_caixa(a, b):
+    """Compara nomes como o servidor (BUSCAR_ALUNO): sem diferenciar maiúsculas, inclusive as acentuadas."""
+    return a.translate(_MINUSCULAS) == b.translate(_MINUSCULAS)
+
+
+def somente_leitura(comando):
+    """Se o comando (ou todos os do lote) só consulta dados, sem alterar nada no servidor."""
+    nome = nome_comando(comando)
+    if nome == COMANDO_LOTE:
+        return all(somente_leitura(item) for item in comando[len(COMANDO_LOTE) + 1:].split(SEPARADOR_LOTE))
+    return nome in COMANDOS_CONSULTA or nome.startswith(PREFIXOS_CONSULTA)
+
+
+def montar_lote(comandos):
+    return f"{COMANDO_LOTE};" + SEPARADOR_LOTE.join(comandos)
+
+
+def separar_lote(resposta, quantidade):
+    """Retorna a lista de respostas de um lote, ou None se a resposta não for de lote."""
+    if not resposta.startswith(COMANDO_LOTE + ";"):
+        return None
+    respostas = resposta[len(COMANDO_LOTE) + 1:].split(SEPARADOR_LOTE)
+    return respostas if len(respostas) == quantidade else None
+
+
+def enviar_frame(sock, texto):
+    dados = texto.encode('utf-8')
+    sock.sendall(struct.pack(FORMATO_CABECALHO, len(dados)) + dados)
+
+
+def _preencher(sock, visao):
+    """Preenche toda a memoryview com dados do socket."""
+    while visao:
+        recebidos = sock.recv_into(visao)
+        if not recebidos:
+            raise ConexaoEncerrada("Conexão encerrada pelo servidor.")
+        visao = visao[recebidos:]
+
+
+def receber_frame_em_partes(sock, bloco=None):
+    """Gera o texto de um frame em pedaços, à medida que chega do socket.
+
+    Os bytes são lidos num único bloco pré-alocado (reaproveitado a cada recv)
+    e decodificados de forma incremental, então o custo por byte é constante
+    mesmo em listagens de vários megabytes. O gerador deve ser consumido até
+    o fim para que o socket fique pronto para o próximo frame.
+    """
+    cabecalho = bytearray(TAMANHO_CABECALHO)
+    _preencher(sock, memoryview(cabecalho))
+    (restante,) = struct.unpack(FORMATO_CABECALHO, cabecalho)
+    if restante > MAX_FRAME:
+        raise ConexaoEncerrada(f"Frame de {restante} bytes excede o limite.")
+
+    visao = memoryview(bloco if bloco is not None else bytearray(TAMANHO_BLOCO))
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    while restante:
+        recebidos = sock.recv_into(visao, min(restante, len(visao)))
+        if not recebidos:
+            raise ConexaoEncerrada("Conexão encerrada pelo servidor.")
+        restante -= recebidos
+        texto = decodificador.decode(visao[:recebidos], final=not restante)
+        if texto:
+            yield texto
+
+
+def receber_frame(sock, bloco=None):
+    return "".join(receber_frame_em_partes(sock, bloco))
+
+
+def _conexao_fechada(sock):
+    """Detecta, sem bloquear, se o servidor já encerrou uma conexão ociosa."""
+    try:
+        legivel, _, _ = select.select([sock], [], [], 0)
+        if not legivel:
+            return False
+        return sock.recv(1, socket.MSG_PEEK) == b""
+    except (OSError, ValueError):
+        return True
+
+
+class _Conexao:
+    __slots__ = ("sock", "bloco", "ultimo_uso")
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.bloco = bytearray(TAMANHO_BLOCO)
+        self.ultimo_uso = time.monotonic()
+
+    def executar(self, comando):
+        enviar_frame(self.sock, comando)
+        return receber_frame(self.sock, self.bloco)
+
+
+class PoolConexoes:
+    """Mantém sockets abertos com o servidor e os reutiliza entre comandos."""
+    def __init__(self, host, porta, tamanho_max=4, timeout=10.0, ociosidade_max=30.0):
+        self.host = host
+        self.porta = porta
+        self.timeout = timeout
+        self.ociosidade_max = ociosidade_max
+        self._livres = []  # Pilha de _Conexao ociosas
+        self._lock = threading.Lock()
+        self._vagas = threading.BoundedSemaphore(tamanho_max)
+
+    def _conectar(self):
+        sock = socket.create_connection((self.host, self.porta), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return _Conexao(sock)
+
+    def _verificar(self, conexao):
+        if _conexao_fechada(conexao.sock):
+            return False
+        if time.monotonic() - conexao.ultimo_uso < self.ociosidade_max:
+            return True
+        try:
+            return conexao.executar(COMANDO_PING) == RESPOSTA_PING
+        except OSError:
+            return False
+
+    def _adquirir(self):
+        """Retorna (conexao, reaproveitada). Bloqueia se todas as vagas estiverem em uso."""
+        self._vagas.acquire()
+        try:
+            while True:
+                with self._lock:
+                    if not self._livres:
+                        break
+                    conexao = self._livres.pop()
+                if self._verificar(conexao):
+                    return conexao, True
+                conexao.sock.close()
+            return self._conectar(), False
+        except BaseException:
+            self._vagas.release()
+            raise
+
+    def _devolver(self, conexao):
+        conexao.ultimo_uso = time.monotonic()
+        with self._lock:
+            self._livres.append(conexao)
+        self._vagas.release()
+
+    def _descartar(self, conexao):
+        try:
+            conexao.sock.close()
+        finally:
+            self._vagas.release()
+
+    def _iniciar(self, conexao, comando, idempotente):
+        """Envia o comando e espera o primeiro byte da resposta.
+
+        Levanta _ComandoNaoEntregue só quando o comando com certeza não foi
+        executado: o envio falhou (o servidor não recebeu o frame inteiro) ou,
+        para um comando idempotente, a conexão caiu antes de qualquer resposta.
+        Um timeout nunca é repetido: a escrita pode ter sido feita.
+        """
+        try:
+            enviar_frame(conexao.sock, comando)
+        except OSError as e:
+            raise _ComandoNaoEntregue(e) from e
+        try:
+            if conexao.sock.recv(1, socket.MSG_PEEK):
+                return
+            erro = ConexaoEncerrada("Conexão encerrada pelo servidor.")
+        except (ConnectionResetError, ConnectionAbortedError) as e:
+            erro = e
+        if idempotente:
+            raise _ComandoNaoEntregue(erro)
+        raise erro
+
+    def executar(self, comando, idempotente=None):
+        """Envia um comando e retorna a resposta.
+
+        Se um socket reaproveitado estava morto, o comando vai de novo por
+        outra conexão apenas quando não chegou a ser executado (ver _iniciar);
+        'idempotente' (por padrão, somente_leitura(comando)) diz se ele pode
+        ser repetido quando a conexão cai sem resposta. Qualquer outra falha
+        vai para quem chamou, sem reenvio.
+        """
+        if idempotente is None:
+            idempotente = somente_leitura(comando)
+        while True:
+            conexao, reaproveitada = self._adquirir()
+            try:
+                self._iniciar(conexao, comando, idempotente)
+                resposta = receber_frame(conexao.sock, conexao.bloco)
+            except _ComandoNaoEntregue as e:
+                self._descartar(conexao)
+                # Só repete em sockets antigos: numa conexão nova a falha é real.
+                if reaproveitada:
+                    continue
+                raise e.erro from None
+            except OSError:
+                self._descartar(conexao)
+                raise
+            self._devolver(conexao)
+            return resposta
+
+    def executar_em_partes(self, comando, idempotente=None):
+        """Como executar, mas gera a resposta em pedaços à medida que chega.
+
+        Se o gerador for fechado antes do fim, o frame fica pela metade no
+        socket e a conexão é descartada em vez de voltar ao pool.
+        """
+        if idempotente is None:
+            idempotente = somente_leitura(comando)
+        while True:
+            conexao, reaproveitada = self._adquirir()
+            partes = receber_frame_em_partes(conexao.sock, conexao.bloco)
+            try:
+                self._iniciar(conexao, comando, idempotente)
+                primeira = next(partes, None)
+            except _ComandoNaoEntregue as e:
+                self._descartar(conexao)
+                if reaproveitada:
+                    continue
+                raise e.erro from None
+            except OSError:
+                self._descartar(conexao)
+                raise
+            break
+
+        concluido = False
+        try:
+            if primeira is not None:
+                yield primeira
+                yield from partes
+            concluido = True
+        finally:
+            if concluido:
+                self._devolver(conexao)
+            else:
+                self._descartar(conexao)
+
+    def fechar(self):
+        with self._lock:
+            livres, self._livres = self._livres, []
+        for conexao in livres:
+            conexao.sock.close()
+
+
+class CacheRespostas:
+    """Cache LRU com validade (TTL) para listagens, invalidado pelas escritas do próprio cliente.
+
+    Cada listagem tem uma geração que avança a cada invalidação; uma resposta
+    só é guardada se a geração não mudou desde o envio do comando, então uma
+    leitura que cruzou com uma escrita não repõe dados antigos no cache.
+    """
+    def __init__(self, ttl=TTL_CACHE, max_entradas=64, max_caracteres=16 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.max_caracteres = max_caracteres
+        self._entradas = OrderedDict()  # comando -> (expira_em, resposta)
+        self._caracteres = 0
+        self._geracoes = {}
+        self._lock = threading.Lock()
+
+    def obter(self, comando):
+        with self._lock:
+            entrada = self._entradas.get(comando)
+            if entrada is None:
+                return None
+            if entrada[0] < time.monotonic():
+                self._remover(comando)
+                return None
+            self._entradas.move_to_end(comando)
+            return entrada[1]
+
+    def geracao(self, comando):
+        with self._lock:
+            return self._geracoes.get(nome_comando(comando), 0)
+
+    def registrar(self, comando, resposta, geracao):
+        """Guarda a resposta de uma listagem ou aplica as invalidações de uma escrita."""
+        nome = nome_comando(comando)
+        if nome in COMANDOS_CACHEAVEIS:
+            if resposta.startswith(("DADOS", "VAZIO")):
+                self._guardar(comando, resposta, geracao)
+        elif nome in INVALIDACOES and resposta.startswith("SUCESSO"):
+            self.invalidar(*INVALIDACOES[nome])
+
+    def invalidar(self, *nomes):
+        """Descarta as listagens indicadas (ou todas, se nenhuma for indicada)."""
+        with self._lock:
+            alvos = set(nomes) if nomes else {nome_comando(c) for c in self._entradas} | set(COMANDOS_CACHEAVEIS)
+            for nome in alvos:
+                self._geracoes[nome] = self._geracoes.get(nome, 0) + 1
+            for comando in [c for c in self._entradas if nome_comando(c) in alvos]:
+                self._remover(comando)
+
+    def _guardar(self, comando, resposta, geracao):
+        if len(resposta) > self.max_caracteres:
+            return
+        with self._lock:
+            if self._geracoes.get(nome_comando(comando), 0) != geracao:
+                return
+            if comando in self._entradas:
+                self._remover(comando)
+            self._entradas[comando] = (time.monotonic() + self.ttl, resposta)
+            self._caracteres += len(resposta)
+            while len(self._entradas) > self.max_entradas or self._caracteres > self.max_caracteres:
+                self._remover(next(iter(self._entradas)))
+
+    def _remover(self, comando):
+        _, resposta = self._entradas.pop(comando)
+        self._caracteres -= len(resposta)
@@ -0,0 +1,75 @@
+"""Leitura incremental das listagens do servidor em registros tipados."""
+from collections import namedtuple
+
+SEPARADOR_REGISTROS = "|"
+SEPARADOR_CAMPOS = ";"
+
+# --- Registros por Entidade (mesma ordem das colunas dos CSVs do servidor) ---
+# São tuplas: podem ir direto para Treeview.insert(values=...) e também têm
+# acesso por nome (aluno.id_turma, nota.valor...).
+Aluno = namedtuple("Aluno", "id nome idade matricula email id_turma")
+Nota = namedtuple("Nota", "id_aluno id_materia tipo valor")
+Frequencia = namedtuple("Frequencia", "id_turma id_aluno data status")
+Financeiro = namedtuple("Financeiro", "id_aluno ano mes valor status")
+
+
+def _montador(tipo_registro):
+    if tipo_registro is None:
+        return lambda campos: campos
+    quantidade = len(tipo_registro._fields)
+    vazios = [""] * quantidade
+
+    def montar(campos):
+        if len(campos) != quantidade:
+            campos = (campos + vazios)[:quantidade]  # Linha malformada no CSV
+        return tipo_registro._make(campos)
+    return montar
+
+
+def iterar_registros(partes, tipo_registro=None):
+    """Gera um registro por linha a partir dos dados de uma resposta DADOS.
+
+    'partes' é qualquer iterável de pedaços de texto (por exemplo, o gerador
+    receber_frame_em_partes, ou uma tupla com o texto inteiro). Cada linha é
+    entregue assim que o seu '|' chega, sem montar a lista de linhas nem
+    guardar a resposta completa.
+    """
+    montar = _montador(tipo_registro)
+    pendente = ""
+    for parte in partes:
+        inicio = 0
+        fim = parte.find(SEPARADOR_REGISTROS)
+        while fim >= 0:
+            linha = parte[inicio:fim]
+            if pendente:
+                linha, pendente = pendente + linha, ""
+            yield montar(linha.split(SEPARADOR_CAMPOS))
+            inicio = fim + 1
+            fim = parte.find(SEPARADOR_REGISTROS, inicio)
+        pendente += parte[inicio:]
+    if pendente:
+        yield montar(pendente.split(SEPARADOR_CAMPOS))
+
+
+def ler_resposta(partes, tipo_registro=None):
+    """Consome uma resposta recebida em pedaços e retorna (tipo, dados).
+
+    Para DADOS, 'dados' é a lista de registros, montada à medida que os
+    pedaços chegam; para os demais tipos, é o texto após o primeiro ';'.
+    """
+    partes = iter(partes)
+    cabecalho = ""
+    for parte in partes:
+        cabecalho += parte
+        if SEPARADOR_CAMPOS in cabecalho:
+            break
+    tipo, _, inicio = cabecalho.partition(SEPARADOR_CAMPOS)
+
+    if tipo == "DADOS":
+        return tipo, list(iterar_registros(_encadear(inicio, partes), tipo_registro))
+    return tipo, inicio + "".join(partes)
+
+
+def _encadear(primeira, partes):
+    yield primeira
+    yield from partes
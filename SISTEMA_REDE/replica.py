@@ -0,0 +1,497 @@
+"""Réplica local (SQLite) das tabelas do servidor: leituras sem rede, sincronização por diferenças e escritas guardadas offline."""
+import json
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from logs import MARCADOR_CURSOR
+from rede import MAX_COMANDOS_LOTE, iguais_sem_caixa, nome_comando
+
+COMANDO_LER_TABELA = "LER_TABELA"
+ARQUIVO_REPLICA = "replica.db"
+INTERVALO_SINCRONIZACAO = 10.0  # Segundos entre buscas de alterações no servidor
+FORMATO_DATA_HORA = "%Y-%m-%d %H:%M:%S"
+PRAZO_RESERVA = 300.0  # Segundos até uma reserva de reenvio abandonada (processo encerrado) valer de novo
+
+TABELAS = ("CURSOS", "MATERIAS", "TURMAS", "ALUNOS", "NOTAS", "FREQUENCIA", "FINANCEIRO")
+
+# Comando de escrita -> tabela replicada que ele altera (como em EFEITOS_ESCRITA, en.c).
+ESCRITAS = {
+    "CADASTRAR_CURSO": "CURSOS", "EXCLUIR_CURSO": "CURSOS",
+    "CADASTRAR_MATERIA": "MATERIAS",
+    "CADASTRAR_TURMA": "TURMAS", "EXCLUIR_TURMA": "TURMAS",
+    "CADASTRAR_ALUNO": "ALUNOS", "EXCLUIR_ALUNO": "ALUNOS",
+    "CADASTRAR_NOTA": "NOTAS", "LIMPAR_NOTAS": "NOTAS",
+    "REGISTRAR_FREQUENCIA": "FREQUENCIA", "REGISTRAR_FREQUENCIA_PARTE": "FREQUENCIA",
+    "GERAR_MENSALIDADES": "FINANCEIRO", "PAGAR_MENSALIDADE": "FINANCEIRO",
+}
+
+# Escritas de sala de aula, guardadas quando o servidor está fora do ar. As
+# demais dependem de validações e IDs gerados no servidor e continuam
+# falhando sem conexão, como antes.
+COMANDO_CADASTRAR_NOTA = "CADASTRAR_NOTA"
+COMANDO_REGISTRAR_PARTE = "REGISTRAR_FREQUENCIA_PARTE"
+RESPOSTA_GUARDADA = "SUCESSO;Servidor fora do ar: a alteracao foi guardada neste computador e sera enviada quando ele voltar."
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tabelas (nome TEXT PRIMARY KEY, epoca INTEGER, sequencia INTEGER,
+                                    cursor INTEGER, total INTEGER);
+CREATE TABLE IF NOT EXISTS linhas (tabela TEXT, ordem INTEGER, chave TEXT, linha TEXT, pendente INTEGER);
+CREATE INDEX IF NOT EXISTS linhas_por_chave ON linhas (tabela, chave);
+CREATE INDEX IF NOT EXISTS linhas_por_ordem ON linhas (tabela, ordem);
+CREATE TABLE IF NOT EXISTS pendentes (id INTEGER PRIMARY KEY AUTOINCREMENT, comando TEXT, base TEXT, criado_em TEXT);
+CREATE TABLE IF NOT EXISTS reservas (pendente INTEGER PRIMARY KEY, dono TEXT, em REAL);
+"""
+
+_INTEIRO = re.compile(r"\s*[+-]?\d+")
+
+
+def _atoi(texto):
+    # Como o atoi do servidor: o número do início do texto, ou 0.
+    encontrado = _INTEIRO.match(texto)
+    return int(encontrado.group()) if encontrado else 0
+
+
+def _campo(linha, coluna):
+    campos = linha.split(";")
+    return campos[coluna] if coluna < len(campos) else None
+
+
+def _ler_nota(comando):
+    """(aluno, matéria, tipo, valor gravado) de um CADASTRAR_NOTA, ou None se o servidor o recusaria."""
+    campos = comando.split(";")[1:]
+    if len(campos) < 4 or not campos[2]:
+        return None
+    try:
+        return int(campos[0]), int(campos[1]), campos[2][:9], f"{float(campos[3]):.2f}"
+    except ValueError:
+        return None
+
+
+def _ler_parte(comando):
+    """(turma, data, [(aluno, status)]) de um REGISTRAR_FREQUENCIA_PARTE, ou None se o servidor o recusaria."""
+    campos = comando.split(";", 6)[1:]
+    if len(campos) < 6:
+        return None
+    try:
+        id_turma = int(campos[1])
+        itens = [item.split(",", 1) for item in campos[5].split("|")]
+        itens = [(int(id_aluno), status[:1]) for id_aluno, status in itens]
+    except ValueError:
+        return None
+    if not all(status in ("P", "F") for _, status in itens):
+        return None
+    return id_turma, campos[2], itens
+
+
+def _notas(linhas):
+    # {(matéria, tipo): valor} das linhas de um aluno; como no servidor, a última de cada tipo prevalece.
+    notas = {}
+    for linha in linhas:
+        campos = linha.split(";")
+        if len(campos) >= 4:
+            notas[(_atoi(campos[1]), campos[2])] = campos[3]
+    return notas
+
+
+def _frequencias(linhas, data):
+    # {aluno: status} na data, das linhas de uma turma; a última linha do aluno prevalece.
+    status = {}
+    for linha in linhas:
+        campos = linha.split(";")
+        if len(campos) >= 4 and campos[2] == data:
+            status[_atoi(campos[1])] = campos[3]
+    return status
+
+
+class Replica:
+    """Cópia local das tabelas do servidor, num arquivo SQLite, mantida em dia por diferenças.
+
+    Uma thread própria pede a cada INTERVALO_SINCRONIZACAO segundos, num só
+    LOTE, as linhas gravadas em cada tabela depois da última leitura
+    (LER_TABELA, ver en.c); tabelas sem alteração voltam sem linhas, e uma
+    reescrita (exclusão, pagamento) traz a tabela de novo.
+    responder() atende as listagens a partir do disco, inclusive com o
+    servidor fora do ar. Uma escrita bem-sucedida deixa a sua tabela "suja":
+    até a próxima sincronização, que é antecipada, as leituras dela vão ao
+    servidor. Notas e partes de chamada enviadas sem conexão ficam na fila
+    local e já aparecem nas leituras; quando o servidor volta, são reenviadas
+    na ordem. Um valor que outra estação alterou nesse meio-tempo prevalece
+    e a alteração local é descartada, com aviso em 'ao_descartar(mensagem)'.
+
+    'enviar_lote' envia comandos direto ao servidor (comandos -> respostas)
+    e 'sem_conexao' é a resposta que ele dá quando não há servidor.
+
+    Vários clientes abertos na mesma pasta dividem o arquivo: cada diferença
+    é conferida com o cursor gravado, dentro da transação que a aplica, e
+    cada escrita da fila é reservada por um só deles antes do reenvio.
+    """
+    def __init__(self, enviar_lote, sem_conexao, ao_descartar=None, arquivo=ARQUIVO_REPLICA,
+                 intervalo=INTERVALO_SINCRONIZACAO):
+        self._enviar_lote = enviar_lote
+        self._sem_conexao = sem_conexao
+        self._ao_descartar = ao_descartar
+        self.intervalo = intervalo
+        self.ativa = True  # Vira False se o servidor for antigo e não conhecer LER_TABELA
+        self.sem_servidor = False  # A última sincronização falhou
+        self._db = sqlite3.connect(arquivo, check_same_thread=False)
+        self._db.executescript(_ESQUEMA)
+        self._lock = threading.Lock()  # Protege a conexão SQLite
+        self._lock_sincronizacao = threading.Lock()  # Segurado durante a ida ao servidor
+        self._condicao = threading.Condition()
+        self._sujas = {}  # tabela -> contador de escritas ainda não sincronizadas
+        self._encerrando = False
+        self._dono = uuid.uuid4().hex  # Identifica as reservas de reenvio deste processo
+        self._thread = threading.Thread(target=self._executar, name="conectapro-replica", daemon=True)
+        self._thread.start()
+
+    def encerrar(self, espera=None):
+        with self._condicao:
+            self._encerrando = True
+            self._condicao.notify()
+        self._thread.join(espera)
+        with self._lock:
+            self._db.close()
+
+    # --- Leituras locais ---
+    def responder(self, comando):
+        """Resposta do servidor para a listagem, montada a partir da réplica, ou None se ela não pode responder."""
+        nome, _, args = comando.partition(";")
+        consulta = _CONSULTAS.get(nome)
+        if consulta is None or not self.ativa:
+            return None
+        tabela, montar = consulta
+        with self._condicao:
+            if self._sujas.get(tabela) and not self.sem_servidor:
+                return None
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM tabelas WHERE nome = ?", (tabela,)).fetchone() is None:
+                return None  # Ainda não sincronizada
+            return montar(self, tabela, args)
+
+    def _linhas(self, tabela, chave=None):
+        # Linhas do servidor, na ordem do arquivo, seguidas das guardadas offline.
+        sql = "SELECT linha FROM linhas WHERE tabela = ?"
+        parametros = [tabela]
+        if chave is not None:
+            sql += " AND chave = ?"
+            parametros.append(chave)
+        sql += " ORDER BY pendente IS NOT NULL, pendente, ordem"
+        return [linha for (linha,) in self._db.execute(sql, parametros)]
+
+    def _listar(self, tabela, args, vazio, filtro=None, chave=None):
+        # Como nos handlers: VAZIO sem nenhuma linha na tabela; DADOS, talvez sem linhas, com filtro.
+        linhas = self._linhas(tabela, chave)
+        if not linhas and (chave is None or not self._tem_linhas(tabela)):
+            return vazio
+        if filtro is not None:
+            linhas = [linha for linha in linhas if filtro(linha)]
+        return "DADOS;" + "|".join(linhas)
+
+    def _tem_linhas(self, tabela):
+        return self._db.execute("SELECT 1 FROM linhas WHERE tabela = ? LIMIT 1", (tabela,)).fetchone() is not None
+
+    def _listar_alunos_turma(self, tabela, args):
+        if not args:
+            return None
+        return self._listar(tabela, args, "VAZIO;Nenhum aluno cadastrado.", lambda l: _campo(l, 5) == args)
+
+    def _buscar_aluno(self, tabela, args):
+        if not args:
+            return None
+        # Mesma comparação de nomes do servidor, para a réplica responder o que ele responderia.
+        return self._listar(tabela, args, "VAZIO;Nenhum aluno cadastrado.",
+                            lambda l: iguais_sem_caixa(_campo(l, 1) or "", args) or _campo(l, 3) == args)
+
+    def _listar_notas_aluno(self, tabela, args):
+        if not args:
+            return None
+        return self._listar(tabela, args, "VAZIO;Nenhuma nota cadastrada.", chave=args)
+
+    def _listar_financeiro(self, tabela, args):
+        if args == "TODOS":
+            return self._listar(tabela, args, "VAZIO;Nenhum registro financeiro.")
+        # O servidor compara com atoi; as linhas gravadas por ele trazem o ID sem zeros ou espaços.
+        return self._listar(tabela, args, "VAZIO;Nenhum registro financeiro.", chave=str(_atoi(args)))
+
+    def _listar_frequencia(self, tabela, args):
+        if not args.startswith("DESDE;"):
+            return self._listar(tabela, args, "VAZIO;Nenhuma frequencia registrada.")
+        # Quem pede DESDE conta as linhas do arquivo do servidor: as guardadas offline ficam de fora.
+        desde = max(_atoi(args[6:]), 0)
+        linhas = [linha for (linha,) in self._db.execute(
+            "SELECT linha FROM linhas WHERE tabela = ? AND pendente IS NULL ORDER BY ordem LIMIT -1 OFFSET ?",
+            (tabela, desde))]
+        if not linhas:
+            return "VAZIO;Nenhuma frequencia nova." if desde > 0 else "VAZIO;Nenhuma frequencia registrada."
+        return "DADOS;" + "|".join(linhas)
+
+    # --- Escritas ---
+    def registrar_escrita(self, comando, resposta):
+        """Recebe a resposta do servidor a um comando; retorna a resposta a entregar a quem o enviou.
+
+        Se o servidor estava fora do ar e o comando pode esperar, ele vai
+        para a fila local e a resposta passa a ser RESPOSTA_GUARDADA.
+        """
+        nome = nome_comando(comando)
+        tabela = ESCRITAS.get(nome)
+        if tabela is None or not self.ativa:
+            return resposta
+        if resposta.startswith("SUCESSO"):
+            with self._condicao:
+                self._sujas[tabela] = self._sujas.get(tabela, 0) + 1
+                self._condicao.notify()
+            return resposta
+        if resposta == self._sem_conexao and self._guardar(nome, tabela, comando):
+            return RESPOSTA_GUARDADA
+        return resposta
+
+    def sujar(self, tabelas):
+        """Avisa que as tabelas mudaram no servidor (ver notificacoes.py): sincroniza já, sem esperar o intervalo."""
+        with self._condicao:
+            for tabela in tabelas:
+                if tabela in TABELAS:
+                    self._sujas[tabela] = self._sujas.get(tabela, 0) + 1
+            self._condicao.notify()
+
+    def _guardar(self, nome, tabela, comando):
+        if nome == COMANDO_CADASTRAR_NOTA:
+            nota = _ler_nota(comando)
+            if nota is None:
+                return False
+            id_aluno, id_materia, tipo, valor = nota
+            linhas = [f"{id_aluno};{id_materia};{tipo};{valor}"]
+        elif nome == COMANDO_REGISTRAR_PARTE:
+            parte = _ler_parte(comando)
+            if parte is None:
+                return False
+            id_turma, data, itens = parte
+            linhas = [f"{id_turma};{id_aluno};{data};{status}" for id_aluno, status in itens]
+        else:
+            return False
+
+        with self._lock, self._db:
+            if self._db.execute("SELECT 1 FROM tabelas WHERE nome = ?", (tabela,)).fetchone() is None:
+                return False
+            # A base é o que esta estação via ao escrever; no reenvio, mostra se outra estação mexeu depois.
+            if nome == COMANDO_CADASTRAR_NOTA:
+                base = _notas(self._linhas(tabela, str(id_aluno))).get((id_materia, tipo))
+            else:
+                vistos = _frequencias(self._linhas(tabela, str(id_turma)), data)
+                base = {str(id_aluno): vistos.get(id_aluno) for id_aluno, _ in itens}
+            cursor = self._db.execute("INSERT INTO pendentes (comando, base, criado_em) VALUES (?, ?, ?)",
+                                      (comando, json.dumps(base), datetime.now().strftime(FORMATO_DATA_HORA)))
+            self._db.executemany(
+                "INSERT INTO linhas (tabela, ordem, chave, linha, pendente) VALUES (?, ?, ?, ?, ?)",
+                [(tabela, i, linha.split(";", 1)[0], linha, cursor.lastrowid) for i, linha in enumerate(linhas)])
+        return True
+
+    def _linhas_servidor(self, tabela, chave):
+        return [linha for (linha,) in self._db.execute(
+            "SELECT linha FROM linhas WHERE tabela = ? AND chave = ? AND pendente IS NULL ORDER BY ordem",
+            (tabela, chave))]
+
+    def pendentes(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pendentes").fetchone()[0]
+
+    # --- Sincronização (thread da réplica) ---
+    def _executar(self):
+        while True:
+            if self.sincronizar() and self._reenviar():
+                self.sincronizar()
+            with self._condicao:
+                # Escritas novas antecipam a próxima sincronização, exceto sem servidor.
+                if not self._encerrando and (self.sem_servidor or not self._sujas):
+                    self._condicao.wait(self.intervalo)
+                if self._encerrando:
+                    return
+
+    def sincronizar(self, tabelas=TABELAS):
+        """Traz as linhas alteradas das tabelas; retorna False se o servidor não respondeu."""
+        if not self.ativa:
+            return False
+        with self._lock_sincronizacao:
+            with self._condicao:
+                sujas = dict(self._sujas)
+            with self._lock:
+                estados = self._estados(tabelas)
+            respostas = self._enviar_lote([f"{COMANDO_LER_TABELA};{nome};{epoca};{sequencia};{cursor}"
+                                           for nome, (epoca, sequencia, cursor, _) in estados.items()])
+            if not respostas or respostas[0] == self._sem_conexao:
+                self.sem_servidor = True
+                return False
+            if respostas[0].startswith(f"ERRO;Comando '{COMANDO_LER_TABELA}'"):
+                self.ativa = False  # Servidor antigo: as leituras seguem indo a ele
+                return False
+            self.sem_servidor = False
+            with self._lock, self._db:
+                # Outro cliente na mesma pasta pode ter aplicado as mesmas diferenças
+                # nesse meio-tempo: o cursor é relido com o arquivo já travado.
+                self._db.execute("BEGIN IMMEDIATE")
+                atuais = self._estados(tabelas)
+                for nome, resposta in zip(estados, respostas):
+                    self._aplicar(nome, atuais[nome], resposta)
+            with self._condicao:
+                for tabela, escritas in sujas.items():
+                    if tabela in estados and self._sujas.get(tabela) == escritas:
+                        del self._sujas[tabela]  # Uma escrita feita durante a leitura mantém a tabela suja
+            return True
+
+    def _estados(self, tabelas):
+        estados = {nome: (0, 0, 0, 0) for nome in tabelas}
+        for nome, epoca, sequencia, cursor, total in self._db.execute(
+                "SELECT nome, epoca, sequencia, cursor, total FROM tabelas"):
+            if nome in estados:
+                estados[nome] = (epoca, sequencia, cursor, total)
+        return estados
+
+    def _aplicar(self, nome, estado, resposta):
+        if not resposta.startswith("DADOS;"):
+            return
+        registros = resposta[len("DADOS;"):].split("|")
+        cursor = registros[0].split(";")
+        if len(cursor) < 5 or cursor[0] != MARCADOR_CURSOR:
+            return
+        inicio, fim, epoca, sequencia = (int(valor) for valor in cursor[1:5])
+        total = estado[3]
+        if inicio == 0:
+            self._db.execute("DELETE FROM linhas WHERE tabela = ? AND pendente IS NULL", (nome,))
+            total = 0
+        elif inicio != estado[2]:
+            return  # Resposta de uma leitura anterior à última aplicada
+        linhas = [linha for linha in registros[1:] if linha]
+        self._db.executemany(
+            "INSERT INTO linhas (tabela, ordem, chave, linha, pendente) VALUES (?, ?, ?, ?, NULL)",
+            [(nome, total + i, linha.split(";", 1)[0], linha) for i, linha in enumerate(linhas)])
+        self._db.execute("INSERT OR REPLACE INTO tabelas (nome, epoca, sequencia, cursor, total) VALUES (?, ?, ?, ?, ?)",
+                         (nome, epoca, sequencia, fim, total + len(linhas)))
+
+    def _reenviar(self):
+        """Reenvia a fila local, na ordem; retorna se algo foi enviado ou descartado."""
+        with self._lock:
+            pendentes = self._reservar()
+            if not pendentes:
+                return False
+            atuais = {}  # Valor no servidor por nota ou aluno na chamada, já com os reenvios aceitos antes
+            envios, descartes, resolvidos = [], [], []
+            for id_pendente, comando, base in pendentes:
+                comando, descarte = self._resolver(comando, json.loads(base), atuais)
+                if descarte:
+                    descartes.append(descarte)
+                if comando is None:
+                    resolvidos.append(id_pendente)
+                else:
+                    envios.append((id_pendente, comando))
+            self._remover(resolvidos)
+
+        for inicio in range(0, len(envios), MAX_COMANDOS_LOTE):
+            lote = envios[inicio:inicio + MAX_COMANDOS_LOTE]
+            respostas = self._enviar_lote([comando for _, comando in lote])
+            if not respostas or respostas[0] == self._sem_conexao:
+                with self._lock, self._db:  # Fica para a próxima sincronização, deste ou de outro cliente
+                    self._db.executemany("DELETE FROM reservas WHERE pendente = ? AND dono = ?",
+                                         [(id_pendente, self._dono) for id_pendente, _ in envios[inicio:]])
+                break
+            for (_, comando), resposta in zip(lote, respostas):
+                if not resposta.startswith("SUCESSO"):
+                    descartes.append(f"'{comando.split(';', 1)[0]}' enviado após a queda do servidor foi recusado: "
+                                     f"{resposta.split(';', 1)[-1]}")
+            with self._condicao:
+                # As linhas guardadas saem da réplica; até a sincronização seguinte, lê-se do servidor.
+                for _, comando in lote:
+                    tabela = ESCRITAS[nome_comando(comando)]
+                    self._sujas[tabela] = self._sujas.get(tabela, 0) + 1
+            with self._lock:
+                self._remover([id_pendente for id_pendente, _ in lote])
+
+        if self._ao_descartar is not None:
+            for mensagem in descartes:
+                self._ao_descartar(mensagem)
+        return True
+
+    def _reservar(self):
+        """A fila local que este cliente vai reenviar, na ordem, reservada para ele numa só transação."""
+        agora = time.time()
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            pendentes = self._db.execute(
+                "SELECT id, comando, base FROM pendentes WHERE id NOT IN "
+                "(SELECT pendente FROM reservas WHERE dono != ? AND em > ?) ORDER BY id",
+                (self._dono, agora - PRAZO_RESERVA)).fetchall()
+            self._db.executemany("INSERT OR REPLACE INTO reservas (pendente, dono, em) VALUES (?, ?, ?)",
+                                 [(id_pendente, self._dono, agora) for id_pendente, _, _ in pendentes])
+        return pendentes
+
+    def _remover(self, ids):
+        with self._db:
+            for id_pendente in ids:
+                self._db.execute("DELETE FROM linhas WHERE pendente = ?", (id_pendente,))
+                self._db.execute("DELETE FROM pendentes WHERE id = ?", (id_pendente,))
+                self._db.execute("DELETE FROM reservas WHERE pendente = ?", (id_pendente,))
+
+    def _resolver(self, comando, base, atuais):
+        """(comando a enviar ou None, aviso de descarte ou None) para uma escrita guardada offline.
+
+        Vale a regra de cada valor: se no servidor ele ainda é o que esta
+        estação via ao escrever, a escrita segue; se já é o valor dela, foi
+        gravada numa tentativa anterior; se é outro, outra estação o alterou
+        depois e a alteração local é descartada.
+        """
+        nome = nome_comando(comando)
+        if nome == COMANDO_CADASTRAR_NOTA:
+            id_aluno, id_materia, tipo, valor = _ler_nota(comando)
+            chave = (nome, id_aluno, id_materia, tipo)
+            if chave not in atuais:
+                atuais[chave] = _notas(self._linhas_servidor("NOTAS", str(id_aluno))).get((id_materia, tipo))
+            atual = atuais[chave]
+            if atual == valor:
+                return None, None
+            if atual != base:
+                return None, (f"Nota {tipo} do aluno {id_aluno} na matéria {id_materia}, lançada sem conexão, "
+                              f"foi descartada: outra estação a alterou para {atual or 'vazio'} antes do envio.")
+            atuais[chave] = valor
+            return comando, None
+
+        id_turma, data, itens = _ler_parte(comando)
+        if (nome, id_turma, data) not in atuais:  # Primeira parte desta chamada na fila
+            atuais[(nome, id_turma, data)] = True
+            for id_aluno, status in _frequencias(self._linhas_servidor("FREQUENCIA", str(id_turma)), data).items():
+                atuais[(nome, id_turma, data, id_aluno)] = status
+        mantidos, descartados = [], 0
+        for id_aluno, status in itens:
+            chave = (nome, id_turma, data, id_aluno)
+            atual = atuais.get(chave)
+            if atual == status:
+                continue
+            if atual != base.get(str(id_aluno)):
+                descartados += 1
+                continue
+            atuais[chave] = status
+            mantidos.append(f"{id_aluno},{status}")
+        descarte = None
+        if descartados:
+            descarte = (f"Frequência da turma {id_turma} em {data}: {descartados} aluno(s) lançados sem conexão "
+                        f"foram descartados; outra estação alterou a chamada antes do envio.")
+        if not mantidos:
+            return None, descarte
+        prefixo = comando.split(";", 6)[:6]
+        return ";".join(prefixo) + ";" + "|".join(mantidos), descarte
+
+
+# Listagem -> (tabela, função que monta a resposta a partir da réplica)
+_CONSULTAS = {
+    "LISTAR_CURSOS": ("CURSOS", lambda r, t, a: r._listar(t, a, "VAZIO;Nenhum curso cadastrado.")),
+    "LISTAR_MATERIAS": ("MATERIAS", lambda r, t, a: r._listar(t, a, "VAZIO;Nenhuma materia cadastrada.")),
+    "LISTAR_TURMAS": ("TURMAS", lambda r, t, a: r._listar(t, a, "VAZIO;Nenhuma turma cadastrada.")),
+    "LISTAR_ALUNOS": ("ALUNOS", lambda r, t, a: r._listar(t, a, "VAZIO;Nenhum aluno cadastrado.")),
+    "LISTAR_ALUNOS_TURMA": ("ALUNOS", Replica._listar_alunos_turma),
+    "BUSCAR_ALUNO": ("ALUNOS", Replica._buscar_aluno),
+    "LISTAR_NOTAS_TODOS": ("NOTAS", lambda r, t, a: r._listar(t, a, "VAZIO;Nenhuma nota cadastrada.")),
+    "LISTAR_NOTAS_ALUNO": ("NOTAS", Replica._listar_notas_aluno),
+    "LISTAR_FREQUENCIA": ("FREQUENCIA", Replica._listar_frequencia),
+    "LISTAR_FINANCEIRO": ("FINANCEIRO", Replica._listar_financeiro),
+}
@@ -0,0 +1,1139 @@
+"""Servidor de referência em Python: o protocolo do en.c sobre asyncio, com as tabelas em memória."""
+import argparse
+import asyncio
+import bisect
+import functools
+import os
+import random
+import re
+import signal
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from logs import COMANDO_LISTAR_LOGS, MARCADOR_CURSOR
+from notificacoes import COMANDO_AGUARDAR_ALTERACOES
+from rede import (CHAVE_TOTAL, COMANDO_CONTAR, COMANDO_LOTE, COMANDO_PING, FORMATO_CABECALHO, MAX_COMANDOS_LOTE,
+                  RESPOSTA_PING, SEPARADOR_LOTE, TAMANHO_CABECALHO, iguais_sem_caixa)
+
+# --- Constantes do Servidor e Arquivos (as mesmas do en.c) ---
+PORTA = 8080
+TAMANHO_BUFFER = 8192  # Maior comando de um cliente sem enquadramento
+MAX_FRAME = 16 * 1024 * 1024
+ARQUIVO_CURSOS = "cursos.csv"
+ARQUIVO_MATERIAS = "materias.csv"
+ARQUIVO_TURMAS = "turmas.csv"
+ARQUIVO_ALUNOS = "alunos.csv"
+ARQUIVO_ATIVIDADES = "atividades.csv"
+ARQUIVO_NOTAS = "notas.csv"
+ARQUIVO_MENSAGENS = "mensagens.csv"
+ARQUIVO_LOG = "log.csv"
+ARQUIVO_FREQUENCIA = "frequencia.csv"
+ARQUIVO_FINANCEIRO = "financeiro.csv"
+ARQUIVOS = (ARQUIVO_CURSOS, ARQUIVO_MATERIAS, ARQUIVO_TURMAS, ARQUIVO_ALUNOS, ARQUIVO_ATIVIDADES,
+            ARQUIVO_NOTAS, ARQUIVO_MENSAGENS, ARQUIVO_LOG, ARQUIVO_FREQUENCIA, ARQUIVO_FINANCEIRO)
+PASTA_BACKUP = "backup"
+INTERVALO_GRAVACAO = 1.0  # Segundos entre as gravações das alterações nos CSVs
+CODIFICACAO = "utf-8"
+ERROS_CODIFICACAO = "surrogateescape"  # Bytes que não são UTF-8 passam intactos, como no servidor em C
+
+# --- Contagens Agregadas ---
+# agrupamento -> (arquivo, coluna); coluna None: apenas o total de linhas.
+AGRUPAMENTOS = {
+    "CURSOS": (ARQUIVO_CURSOS, None),
+    "MATERIAS": (ARQUIVO_MATERIAS, None),
+    "TURMAS": (ARQUIVO_TURMAS, None),
+    "ALUNOS": (ARQUIVO_ALUNOS, None),
+    "ALUNOS_POR_TURMA": (ARQUIVO_ALUNOS, 5),
+    "MATERIAS_POR_CURSO": (ARQUIVO_MATERIAS, 2),
+    "FINANCEIRO_POR_STATUS": (ARQUIVO_FINANCEIRO, 4),
+    "FREQUENCIA_POR_STATUS": (ARQUIVO_FREQUENCIA, 3),
+}
+
+# --- Frequência em Partes ---
+MAX_PARTES_LEMBRADAS = 1024
+
+# --- Leitura Paginada do Log ---
+PAGINA_LOG_PADRAO = 100
+LIMITE_PAGINA_LOG = 1000
+
+# --- Réplica Local dos Clientes e Avisos de Alteração ---
+# Tabela replicada -> arquivo, na ordem das respostas de AGUARDAR_ALTERACOES.
+TABELAS_REPLICADAS = {
+    "CURSOS": ARQUIVO_CURSOS,
+    "MATERIAS": ARQUIVO_MATERIAS,
+    "TURMAS": ARQUIVO_TURMAS,
+    "ALUNOS": ARQUIVO_ALUNOS,
+    "NOTAS": ARQUIVO_NOTAS,
+    "FREQUENCIA": ARQUIVO_FREQUENCIA,
+    "FINANCEIRO": ARQUIVO_FINANCEIRO,
+    "MENSAGENS": ARQUIVO_MENSAGENS,
+    "ATIVIDADES": ARQUIVO_ATIVIDADES,
+}
+
+# Comando de escrita -> (tabela replicada, se reescreve o arquivo), como EFEITOS_ESCRITA no en.c.
+EFEITOS_ESCRITA = {
+    "CADASTRAR_CURSO": ("CURSOS", False),
+    "EXCLUIR_CURSO": ("CURSOS", True),
+    "CADASTRAR_MATERIA": ("MATERIAS", False),
+    "CADASTRAR_TURMA": ("TURMAS", False),
+    "EXCLUIR_TURMA": ("TURMAS", True),
+    "CADASTRAR_ALUNO": ("ALUNOS", False),
+    "EXCLUIR_ALUNO": ("ALUNOS", True),
+    "CADASTRAR_NOTA": ("NOTAS", False),
+    "LIMPAR_NOTAS": ("NOTAS", True),
+    "REGISTRAR_FREQUENCIA": ("FREQUENCIA", False),
+    "REGISTRAR_FREQUENCIA_PARTE": ("FREQUENCIA", False),
+    "GERAR_MENSALIDADES": ("FINANCEIRO", False),
+    "PAGAR_MENSALIDADE": ("FINANCEIRO", True),
+    "POSTAR_MENSAGEM": ("MENSAGENS", False),
+    "LIMPAR_MENSAGENS": ("MENSAGENS", True),
+    "CADASTRAR_ATIVIDADE": ("ATIVIDADES", False),
+}
+
+ESPERA_ALTERACOES_PADRAO = 25000
+LIMITE_ESPERA_ALTERACOES = 60000
+
+
+# --- Leitura de Argumentos como o sscanf do C ---
+# Os handlers do en.c validam os argumentos com sscanf; os mesmos formatos
+# aqui dão as mesmas respostas para argumentos malformados. Suporta %d, %ld,
+# %f (float de 32 bits), %c, %s, %[^...], %n, larguras e '*'. As larguras
+# contam caracteres, não bytes.
+_CONVERSAO = re.compile(r"%(\*?)(\d*)l?([dfcsn]|\[\^[^\]]*\])")
+_INTEIRO = re.compile(r"[+-]?\d+")
+_REAL = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|[+-]?(?:inf(?:inity)?|nan)", re.IGNORECASE)
+_ESPACOS = " \t\n\v\f\r"
+
+
+@functools.lru_cache(maxsize=None)
+def _compilar_formato(formato):
+    passos, i = [], 0
+    while i < len(formato):
+        m = _CONVERSAO.match(formato, i)
+        if m:
+            tipo = m.group(3)
+            passos.append(("conjunto" if tipo[0] == "[" else tipo, tipo[2:-1], bool(m.group(1)),
+                           int(m.group(2)) if m.group(2) else None))
+            i = m.end()
+        else:
+            passos.append(("espaco" if formato[i] in _ESPACOS else "literal", formato[i], False, None))
+            i += 1
+    return passos
+
+
+def _pular_espacos(texto, pos):
+    while pos < len(texto) and texto[pos] in _ESPACOS:
+        pos += 1
+    return pos
+
+
+def _scanf(texto, formato):
+    """Retorna (conversões feitas, valores), como sscanf(texto, formato)."""
+    valores, convertidos, pos = [], 0, 0
+    for tipo, extra, suprimir, largura in _compilar_formato(formato):
+        if tipo == "espaco":
+            pos = _pular_espacos(texto, pos)
+            continue
+        if tipo == "literal":
+            if pos >= len(texto) or texto[pos] != extra:
+                break
+            pos += 1
+            continue
+        if tipo == "n":
+            if not suprimir:
+                valores.append(pos)
+            continue
+        if tipo in "dfs":
+            pos = _pular_espacos(texto, pos)
+        fim = len(texto) if largura is None else min(len(texto), pos + largura)
+        if tipo == "d":
+            m = _INTEIRO.match(texto[:fim], pos)
+            if m is None:
+                break
+            valor, pos = int(m.group()), m.end()
+        elif tipo == "f":
+            m = _REAL.match(texto[:fim], pos)
+            if m is None:
+                break
+            valor, pos = _float32(float(m.group())), m.end()
+        elif tipo == "c":
+            fim = pos + (largura or 1)
+            if fim > len(texto):
+                break
+            valor, pos = texto[pos:fim], fim
+        else:
+            inicio = pos
+            while pos < fim and (texto[pos] not in extra if tipo == "conjunto" else texto[pos] not in _ESPACOS):
+                pos += 1
+            if pos == inicio:
+                break
+            valor = texto[inicio:pos]
+        if not suprimir:
+            valores.append(valor)
+            convertidos += 1
+    return convertidos, valores
+
+
+def _atol(texto):
+    """Como atoi/atol: o inteiro no começo do texto, ou 0."""
+    m = _INTEIRO.match(texto, _pular_espacos(texto, 0))
+    return int(m.group()) if m else 0
+
+
+def _float32(valor):
+    # Os handlers guardam valores em float: "%.2f" deve arredondar o mesmo número.
+    return struct.unpack("f", struct.pack("f", valor))[0]
+
+
+def _campo(linha, coluna):
+    """Como extrair_campo: o campo 'coluna' da linha separada por ';', ou None se não houver."""
+    campos = linha.split(";", coluna + 1)
+    return campos[coluna] if len(campos) > coluna else None
+
+
+def _sem_retorno(linha):
+    """Como linha[strcspn(linha, "\\r\\n")] = 0."""
+    return linha.split("\r", 1)[0]
+
+
+def _codificar(texto):
+    return texto.encode(CODIFICACAO, ERROS_CODIFICACAO)
+
+
+def _decodificar(dados):
+    return dados.decode(CODIFICACAO, ERROS_CODIFICACAO)
+
+
+def _dados(linhas):
+    # Igual a anexar "linha|" a cada uma e tirar o '|' final (buffer_finalizar).
+    return "DADOS;" + "|".join(linhas)
+
+
+# --- Tabelas em Memória ---
+class Tabela:
+    """Um CSV carregado em memória, com as posições em bytes de cada linha no arquivo.
+
+    As linhas ficam como estão no arquivo (sem o '\\n'), e as posições são as
+    que teriam no disco depois de gravadas, então os cursores em bytes de
+    LER_TABELA e LISTAR_LOGS valem como no servidor em C. As alterações ficam
+    pendentes até Servidor.gravar_pendentes: acréscimos vão para o fim do
+    arquivo; exclusões, pagamentos e limpezas o reescrevem inteiro. Usada só
+    na thread do laço de eventos.
+    """
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.existe = False
+        self.linhas = []
+        self.inicios = []  # Posição em bytes do começo de cada linha
+        self.tamanho = 0  # Tamanho do arquivo em bytes
+        self.alteracao = 0  # Sequência da última escrita (tabelas replicadas)
+        self.reescrita = 0  # Sequência da última escrita que reescreveu o arquivo
+        self._anexos = []  # Bytes a acrescentar ao arquivo
+        self._reescrever = False
+        self._ids = None  # Primeiro campo das linhas, calculado no primeiro uso
+        self._listagem = None
+        self._carregar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, "rb") as f:
+                conteudo = f.read()
+        except FileNotFoundError:
+            return
+        self.existe = True
+        pedacos = conteudo.split(b"\n")
+        if pedacos[-1]:
+            self._anexos.append(b"\n")  # Última linha sem quebra: é completada antes do próximo acréscimo
+        else:
+            pedacos.pop()
+        for pedaco in pedacos:
+            self.inicios.append(self.tamanho)
+            self.linhas.append(_decodificar(pedaco))
+            self.tamanho += len(pedaco) + 1
+
+    # --- Consultas ---
+    def ids(self):
+        """Os números no começo das linhas (o que id_existe procura no arquivo)."""
+        if self._ids is None:
+            self._ids = {_atol(linha) for linha in self.linhas if _INTEIRO.match(linha, _pular_espacos(linha, 0))}
+        return self._ids
+
+    def listagem(self):
+        """Resposta de LISTAR_* com o arquivo inteiro, refeita só depois de uma alteração."""
+        if self._listagem is None:
+            self._listagem = _dados(self.linhas)
+        return self._listagem
+
+    def _comprimento(self, i):
+        fim = self.inicios[i + 1] if i + 1 < len(self.inicios) else self.tamanho
+        return fim - self.inicios[i] - 1
+
+    def linhas_desde(self, cursor):
+        """(linha, posição depois dela) a partir do byte 'cursor', como fgets depois de fseek."""
+        if cursor >= self.tamanho:
+            return
+        i = bisect.bisect_right(self.inicios, cursor) - 1
+        deslocamento = cursor - self.inicios[i]
+        if deslocamento:
+            yield _decodificar(_codificar(self.linhas[i])[deslocamento:]), self.inicios[i] + self._comprimento(i) + 1
+            i += 1
+        for j in range(i, len(self.linhas)):
+            yield self.linhas[j], self.inicios[j] + self._comprimento(j) + 1
+
+    def linhas_antes(self, cursor):
+        """(linha, posição do começo dela) antes do byte 'cursor', da última para a primeira."""
+        if cursor <= 0:
+            return
+        i = bisect.bisect_right(self.inicios, cursor - 1) - 1
+        parte = cursor - self.inicios[i]
+        if parte < self._comprimento(i):
+            yield _decodificar(_codificar(self.linhas[i])[:parte]), self.inicios[i]
+            i -= 1
+        for j in range(i, -1, -1):
+            yield self.linhas[j], self.inicios[j]
+
+    # --- Alterações ---
+    def anexar(self, texto):
+        """Acrescenta o texto ao fim do arquivo, seguido de '\\n' (como o fprintf dos handlers)."""
+        dados = _codificar(texto)
+        for linha in texto.split("\n"):
+            self.inicios.append(self.tamanho)
+            self.linhas.append(linha)
+            self.tamanho += len(_codificar(linha)) + 1
+            if self._ids is not None and _INTEIRO.match(linha, _pular_espacos(linha, 0)):
+                self._ids.add(_atol(linha))
+        self._anexos.append(dados + b"\n")
+        self._alterada()
+
+    def criar(self):
+        """Cria o arquivo vazio se ele não existir (fopen em modo "a" sem escrever)."""
+        if not self.existe:
+            self._anexos.append(b"")
+            self._alterada()
+
+    def filtrar(self, manter):
+        """Reescreve o arquivo só com as linhas para as quais manter(linha) é verdadeiro."""
+        self.substituir([linha for linha in self.linhas if manter(linha)])
+
+    def substituir(self, linhas):
+        self.linhas, self.inicios, self.tamanho = [], [], 0
+        for linha in linhas:
+            self.inicios.append(self.tamanho)
+            self.linhas.append(linha)
+            self.tamanho += len(_codificar(linha)) + 1
+        self._ids = None
+        self._anexos = []
+        self._reescrever = True
+        self._alterada()
+
+    def _alterada(self):
+        self.existe = True
+        self._listagem = None
+
+    # --- Gravação (write-behind) ---
+    def retirar_pendente(self):
+        """(modo, bytes) a gravar no arquivo, ou None; a tabela deixa de tê-los como pendentes."""
+        if self._reescrever:
+            self._reescrever, self._anexos = False, []
+            return "w", b"".join(_codificar(linha) + b"\n" for linha in self.linhas)
+        if self._anexos:
+            dados, self._anexos = b"".join(self._anexos), []
+            return "a", dados
+        return None
+
+    def devolver(self, modo, dados):
+        """Devolve uma gravação que falhou, para a próxima tentativa."""
+        if modo == "w":
+            self._reescrever = True
+        elif not self._reescrever:
+            self._anexos.insert(0, dados)
+
+
+def _gravar_arquivo(caminho, modo, dados):
+    if modo == "a":
+        with open(caminho, "ab") as f:
+            f.write(dados)
+        return
+    # Reescrita: arquivo temporário renomeado sobre o original, nunca pela metade.
+    descritor, temporario = tempfile.mkstemp(prefix=".tmp_", dir=os.path.dirname(os.path.abspath(caminho)))
+    try:
+        with os.fdopen(descritor, "wb") as f:
+            try:
+                os.chmod(temporario, os.stat(caminho).st_mode & 0o777)  # mkstemp cria só para o dono
+            except FileNotFoundError:
+                os.chmod(temporario, 0o644)
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+# --- Servidor ---
+class Servidor:
+    """Atende o mesmo protocolo do en.c, com os dados em memória e gravação adiada nos CSVs.
+
+    Os CSVs da pasta são lidos uma vez, na partida, e a partir daí o servidor
+    é o dono deles: cada comando é respondido da memória, sem abrir arquivos,
+    e as alterações são gravadas a cada INTERVALO_GRAVACAO segundos (numa
+    thread, sem parar o atendimento) e ao encerrar. Uma queda do processo
+    perde no máximo esse intervalo de escritas. Edições feitas nos arquivos
+    à mão enquanto o servidor roda não são vistas.
+
+    Os comandos rodam um de cada vez no laço de eventos, então um LOTE vê um
+    retrato consistente das tabelas sem trava nenhuma; só AGUARDAR_ALTERACOES
+    fica pendente, sem segurar os outros clientes. As respostas, inclusive as
+    de erro, são as mesmas do servidor em C; onde ele teria comportamento
+    indefinido (argumentos ausentes, linhas malformadas), este responde com o
+    erro de formato do comando ou ignora a linha.
+    """
+    def __init__(self, pasta=".", intervalo_gravacao=INTERVALO_GRAVACAO):
+        self.pasta = pasta
+        self.intervalo_gravacao = intervalo_gravacao
+        self.epoca = int(time.time())  # As sequências recomeçam a cada execução
+        self.sequencia = 0
+        self._tabelas = {}  # arquivo -> Tabela; diários carregados no primeiro uso
+        for arquivo in ARQUIVOS:
+            self._tabela(arquivo)
+        self._partes_gravadas = OrderedDict()  # (chave do envio, parte) das partes de frequência já gravadas
+        self._aviso = asyncio.Event()  # Trocado a cada alteração: quem espera acorda
+        self._parar = asyncio.Event()
+        self._gravando = threading.Lock()  # Uma gravação nos arquivos por vez
+        self._comandos = {
+            COMANDO_PING: lambda args: RESPOSTA_PING,
+            COMANDO_LOTE: self.lote,
+            COMANDO_CONTAR: self.contar,
+            "LISTAR_CURSOS": lambda args: self._listar(ARQUIVO_CURSOS, "VAZIO;Nenhum curso cadastrado."),
+            "CADASTRAR_CURSO": self.cadastrar_curso,
+            "EXCLUIR_CURSO": self.excluir_curso,
+            "LISTAR_MATERIAS": lambda args: self._listar(ARQUIVO_MATERIAS, "VAZIO;Nenhuma materia cadastrada."),
+            "CADASTRAR_MATERIA": self.cadastrar_materia,
+            "LISTAR_TURMAS": lambda args: self._listar(ARQUIVO_TURMAS, "VAZIO;Nenhuma turma cadastrada."),
+            "CADASTRAR_TURMA": self.cadastrar_turma,
+            "EXCLUIR_TURMA": self.excluir_turma,
+            "LISTAR_ALUNOS": lambda args: self._listar(ARQUIVO_ALUNOS, "VAZIO;Nenhum aluno cadastrado."),
+            "CADASTRAR_ALUNO": self.cadastrar_aluno,
+            "EXCLUIR_ALUNO": self.excluir_aluno,
+            "LISTAR_ALUNOS_TURMA": self.listar_alunos_turma,
+            "BUSCAR_ALUNO": self.buscar_aluno,
+            "CADASTRAR_ATIVIDADE": self.cadastrar_atividade,
+            "LISTAR_ATIVIDADES": lambda args: self._listar(ARQUIVO_ATIVIDADES, "VAZIO;Nenhuma atividade cadastrada."),
+            "CADASTRAR_NOTA": self.cadastrar_nota,
+            "LISTAR_NOTAS_TODOS": lambda args: self._listar(ARQUIVO_NOTAS, "VAZIO;Nenhuma nota cadastrada."),
+            "LISTAR_NOTAS_ALUNO": self.listar_notas_aluno,
+            "REGISTRAR_AULA": self.registrar_aula,
+            "POSTAR_MENSAGEM": self.postar_mensagem,
+            "LISTAR_MENSAGENS": lambda args: self._listar(ARQUIVO_MENSAGENS, "VAZIO;Nenhuma mensagem no mural."),
+            "LISTAR_MENSAGENS_TURMA": self.listar_mensagens_turma,
+            "LOG": self.log,
+            "LOG_DATADO": self.log_datado,
+            COMANDO_LISTAR_LOGS: self.listar_logs,
+            "BACKUP": self.backup,
+            "ANALISAR_IA": self.analisar_desempenho_ia,
+            "LIMPAR_NOTAS": lambda args: self._limpar(ARQUIVO_NOTAS),
+            "LIMPAR_MENSAGENS": lambda args: self._limpar(ARQUIVO_MENSAGENS),
+            "LIMPAR_LOGS": lambda args: self._limpar(ARQUIVO_LOG),
+            "LISTAR_DIARIO": self.listar_diario,
+            "REGISTRAR_FREQUENCIA": self.registrar_frequencia,
+            "REGISTRAR_FREQUENCIA_PARTE": self.registrar_frequencia_parte,
+            "LISTAR_FREQUENCIA": self.listar_frequencia,
+            "GERAR_MENSALIDADES": self.gerar_mensalidades,
+            "LISTAR_FINANCEIRO": self.listar_financeiro,
+            "PAGAR_MENSALIDADE": self.pagar_mensalidade,
+            "LER_TABELA": self.ler_tabela,
+            COMANDO_AGUARDAR_ALTERACOES: self.alteracoes_desde,
+        }
+
+    def _tabela(self, arquivo):
+        tabela = self._tabelas.get(arquivo)
+        if tabela is None:
+            tabela = self._tabelas[arquivo] = Tabela(os.path.join(self.pasta, arquivo))
+        return tabela
+
+    # --- Execução ---
+    async def executar(self, host=None, porta=PORTA):
+        """Atende até encerrar() (ou SIGTERM) e grava o que estiver pendente antes de retornar."""
+        laco = asyncio.get_running_loop()
+        if hasattr(signal, "SIGTERM") and os.name != "nt":
+            laco.add_signal_handler(signal.SIGTERM, self.encerrar)
+        servidor = await asyncio.start_server(self._atender, host, porta, reuse_address=True)
+        print(f"Servidor Python iniciado na porta {porta}. Aguardando clientes...")
+        try:
+            while not self._parar.is_set():
+                try:
+                    await asyncio.wait_for(self._parar.wait(), self.intervalo_gravacao)
+                except asyncio.TimeoutError:
+                    pass
+                await self._gravar_em_segundo_plano()
+        finally:
+            servidor.close()
+            self.gravar_pendentes()
+
+    def encerrar(self):
+        self._parar.set()
+
+    async def _atender(self, reader, writer):
+        try:
+            dados = await reader.read(TAMANHO_BUFFER - 1)
+            if dados[:1] == b"\0":
+                await self._atender_enquadrado(reader, writer, dados)
+            else:
+                # Cliente antigo: cada leitura é um comando e a resposta vai sem cabeçalho.
+                while dados:
+                    writer.write(_codificar(await self._responder(dados)))
+                    await writer.drain()
+                    dados = await reader.read(TAMANHO_BUFFER - 1)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _atender_enquadrado(self, reader, writer, recebidos):
+        """Vários comandos na mesma conexão, cada um precedido de 4 bytes com o tamanho."""
+        pendentes = bytearray(recebidos)  # O que chegou na primeira leitura, além do cabeçalho
+
+        async def ler(tamanho):
+            if len(pendentes) < tamanho:
+                pendentes.extend(await reader.readexactly(tamanho - len(pendentes)))
+            dados = bytes(pendentes[:tamanho])
+            del pendentes[:tamanho]
+            return dados
+
+        while True:
+            try:
+                (tamanho,) = struct.unpack(FORMATO_CABECALHO, await ler(TAMANHO_CABECALHO))
+            except asyncio.IncompleteReadError:
+                return
+            if tamanho == 0 or tamanho > MAX_FRAME:
+                print(f"Frame invalido ({tamanho} bytes). Encerrando conexao.")
+                return
+            resposta = _codificar(await self._responder(await ler(tamanho)))
+            writer.write(struct.pack(FORMATO_CABECALHO, len(resposta)) + resposta)
+            await writer.drain()
+
+    async def _responder(self, dados):
+        texto = _decodificar(dados.split(b"\0", 1)[0])
+        comando, args = self._separar(texto)
+        if comando == COMANDO_AGUARDAR_ALTERACOES:
+            return await self.aguardar_alteracoes(args)
+        return self.processar_comando(texto)
+
+    # --- Comandos ---
+    @staticmethod
+    def _separar(texto):
+        # Como strtok(buffer, ";") seguido de strtok(NULL, ""): None quando não há argumentos.
+        comando, _, args = texto.lstrip(";").partition(";")
+        return comando, args or None
+
+    def processar_comando(self, texto):
+        """Resposta a um comando, sem esperar: AGUARDAR_ALTERACOES responde na hora."""
+        comando, args = self._separar(texto)
+        if not comando:
+            return "ERRO;Comando vazio."
+        handler = self._comandos.get(comando)
+        if handler is None:
+            return f"ERRO;Comando '{comando}' nao reconhecido."[:99]
+        resposta = handler(args)
+        efeito = EFEITOS_ESCRITA.get(comando)
+        if efeito is not None and resposta.startswith("SUCESSO"):
+            self._registrar_alteracao(*efeito)
+        return resposta
+
+    def lote(self, args):
+        if not args:
+            return "ERRO;Lote vazio."
+        comandos = args.split(SEPARADOR_LOTE)
+        if len(comandos) > MAX_COMANDOS_LOTE:
+            return f"ERRO;Lote excede {MAX_COMANDOS_LOTE} comandos."
+        respostas = []
+        reaproveitaveis = {}  # Consultas já respondidas desde o último comando que não é consulta
+        for comando in comandos:
+            consulta = comando.startswith(("LISTAR_", "BUSCAR_"))
+            if not consulta:
+                reaproveitaveis.clear()  # Uma escrita no meio do lote muda as listagens
+            if consulta and comando in reaproveitaveis:
+                respostas.append(reaproveitaveis[comando])
+            elif comando.startswith(COMANDO_LOTE) and comando[len(COMANDO_LOTE):len(COMANDO_LOTE) + 1] in (";", ""):
+                respostas.append("ERRO;Lote dentro de lote.")
+            elif comando.startswith(COMANDO_AGUARDAR_ALTERACOES):
+                respostas.append(f"ERRO;{COMANDO_AGUARDAR_ALTERACOES} nao pode ir num lote.")
+            else:
+                respostas.append(self.processar_comando(comando))
+                if consulta:
+                    reaproveitaveis[comando] = respostas[-1]
+        return f"{COMANDO_LOTE};" + SEPARADOR_LOTE.join(respostas)
+
+    def contar(self, args):
+        agrupamento = AGRUPAMENTOS.get(args)
+        if agrupamento is None:
+            return f"ERRO;Agrupamento '{args or ''}' desconhecido para {COMANDO_CONTAR}."[:149]
+        arquivo, coluna = agrupamento
+        total, contagens = 0, {}
+        for linha in self._tabela(arquivo).linhas:
+            linha = _sem_retorno(linha)
+            if not linha:
+                continue
+            total += 1
+            campo = _campo(linha, coluna) if coluna is not None else None
+            if campo is not None:
+                campo = campo[:99]
+                contagens[campo] = contagens.get(campo, 0) + 1
+        if coluna is None:
+            return f"DADOS;{CHAVE_TOTAL};{total}"
+        if not contagens:
+            return "VAZIO;Nenhum registro para contar."
+        return _dados(f"{valor};{quantidade}" for valor, quantidade in contagens.items())
+
+    def _listar(self, arquivo, vazio):
+        tabela = self._tabela(arquivo)
+        return tabela.listagem() if tabela.existe else vazio
+
+    def _listar_filtrado(self, arquivo, coluna, valor, vazio):
+        tabela = self._tabela(arquivo)
+        if not tabela.existe:
+            return vazio
+        return _dados(linha for linha in tabela.linhas if _campo(linha, coluna) == valor)
+
+    def _gerar_id_unico(self, arquivo):
+        ids = self._tabela(arquivo).ids()
+        while True:
+            novo_id = random.randrange(1000, 10000)
+            if novo_id not in ids:
+                return novo_id
+
+    def _excluir_por_id(self, arquivo, id_excluir):
+        tabela = self._tabela(arquivo)
+        if not tabela.existe:
+            return False
+        tabela.filtrar(lambda linha: _scanf(linha, "%d")[1][:1] != [id_excluir])
+        return True
+
+    # --- Gestão de Cursos ---
+    def cadastrar_curso(self, args):
+        convertidos, valores = _scanf(args or "", "%99[^\n]")
+        if convertidos != 1:
+            return "ERRO;Formato de argumentos invalido para CADASTRAR_CURSO."
+        (nome_curso,) = valores
+        id_curso = self._gerar_id_unico(ARQUIVO_CURSOS)
+        self._tabela(ARQUIVO_CURSOS).anexar(f"{id_curso};{nome_curso}")
+        return f"SUCESSO;Curso '{nome_curso}' cadastrado com ID {id_curso}."
+
+    def excluir_curso(self, args):
+        convertidos, valores = _scanf(args or "", "%d")
+        if convertidos != 1:
+            return "ERRO;ID do curso invalido."
+        (id_excluir,) = valores
+        if any(_scanf(linha, "%*d;%*[^;];%d")[1] == [id_excluir] for linha in self._tabela(ARQUIVO_MATERIAS).linhas):
+            return "ERRO;Nao e possivel excluir, existem materias associadas a este curso."
+        if not self._excluir_por_id(ARQUIVO_CURSOS, id_excluir):
+            return "ERRO;Falha ao abrir arquivos temporarios."
+        return f"SUCESSO;Curso com ID {id_excluir} excluido."
+
+    # --- Gestão de Matérias ---
+    def cadastrar_materia(self, args):
+        convertidos, valores = _scanf(args or "", "%99[^;];%d;%99[^;];%19[^\n]")
+        if convertidos != 4:
+            return "ERRO;Formato de argumentos invalido para CADASTRAR_MATERIA."
+        nome_materia, id_curso, prof_usuario, modalidade = valores
+        if id_curso not in self._tabela(ARQUIVO_CURSOS).ids():
+            return f"ERRO;O curso com ID {id_curso} nao existe."
+        id_materia = self._gerar_id_unico(ARQUIVO_MATERIAS)
+        self._tabela(ARQUIVO_MATERIAS).anexar(f"{id_materia};{nome_materia};{id_curso};{prof_usuario};{modalidade}")
+        return f"SUCESSO;Materia '{nome_materia}' cadastrada com ID {id_materia}."
+
+    # --- Gestão de Turmas ---
+    def cadastrar_turma(self, args):
+        convertidos, valores = _scanf(args or "", "%19[^;];%99[^\n]")
+        if convertidos != 2:
+            return "ERRO;Formato de argumentos invalido para CADASTRAR_TURMA."
+        data, professor = valores
+        id_turma = self._gerar_id_unico(ARQUIVO_TURMAS)
+        self._tabela(ARQUIVO_TURMAS).anexar(f"{id_turma};{data};{professor}")
+        return f"SUCESSO;Turma para data '{data}' cadastrada com ID {id_turma}."
+
+    def excluir_turma(self, args):
+        convertidos, valores = _scanf(args or "", "%d")
+        if convertidos != 1:
+            return "ERRO;ID da turma invalido."
+        (id_excluir,) = valores
+        if id_excluir not in self._tabela(ARQUIVO_TURMAS).ids():
+            return f"ERRO;Turma com ID {id_excluir} nao encontrada."
+        if any(_scanf(linha, "%*d;%*[^;];%*d;%*[^;];%*[^;];%d")[1] == [id_excluir]
+               for linha in self._tabela(ARQUIVO_ALUNOS).linhas):
+            return f"ERRO;Nao e possivel excluir, existem alunos matriculados na turma {id_excluir}."
+        self._excluir_por_id(ARQUIVO_TURMAS, id_excluir)
+        return f"SUCESSO;Turma com ID {id_excluir} excluida."
+
+    # --- Gestão de Alunos ---
+    def cadastrar_aluno(self, args):
+        convertidos, valores = _scanf(args or "", "%99[^;];%d;%49[^;];%d")
+        if convertidos != 4:
+            return "ERRO;Formato de argumentos invalido."
+        nome, idade, email, id_turma = valores
+        if id_turma not in self._tabela(ARQUIVO_TURMAS).ids():
+            return f"ERRO;A turma com ID {id_turma} nao existe."
+        id_aluno = self._gerar_id_unico(ARQUIVO_ALUNOS)
+        matricula = f"RA{random.randrange(10000000, 100000000)}"
+        self._tabela(ARQUIVO_ALUNOS).anexar(f"{id_aluno};{nome};{idade};{matricula};{email};{id_turma}")
+        return f"SUCESSO;{matricula};Aluno '{nome}' cadastrado com ID: {id_aluno}."
+
+    def excluir_aluno(self, args):
+        convertidos, valores = _scanf(args or "", "%d")
+        if convertidos != 1:
+            return "ERRO;ID do aluno invalido."
+        (id_excluir,) = valores
+        if id_excluir not in self._tabela(ARQUIVO_ALUNOS).ids():
+            return f"ERRO;Aluno com ID {id_excluir} nao encontrado."
+        self._excluir_por_id(ARQUIVO_ALUNOS, id_excluir)
+        return f"SUCESSO;Aluno com ID {id_excluir} excluido."
+
+    def listar_alunos_turma(self, args):
+        if not args:
+            return "ERRO;ID de turma invalido."
+        return self._listar_filtrado(ARQUIVO_ALUNOS, 5, args, "VAZIO;Nenhum aluno cadastrado.")
+
+    def buscar_aluno(self, args):
+        """Pelo nome, sem diferenciar maiúsculas, ou pela matrícula (RA)."""
+        if not args:
+            return "ERRO;Informe o nome ou RA do aluno."
+        tabela = self._tabela(ARQUIVO_ALUNOS)
+        if not tabela.existe:
+            return "VAZIO;Nenhum aluno cadastrado."
+        return _dados(linha for linha in tabela.linhas
+                      if (_campo(linha, 1) is not None and iguais_sem_caixa(_campo(linha, 1), args))
+                      or _campo(linha, 3) == args)
+
+    # --- Gestão de Atividades ---
+    def cadastrar_atividade(self, args):
+        convertidos, valores = _scanf(args or "", "%d;%99[^;];%19[^\n]")
+        if convertidos != 3:
+            return "ERRO;Formato de argumentos invalido para CADASTRAR_ATIVIDADE."
+        id_turma, titulo, data_entrega = valores
+        if id_turma not in self._tabela(ARQUIVO_TURMAS).ids():
+            return f"ERRO;A turma com ID {id_turma} nao existe."
+        id_ativ = self._gerar_id_unico(ARQUIVO_ATIVIDADES)
+        self._tabela(ARQUIVO_ATIVIDADES).anexar(f"{id_ativ};{id_turma};{titulo};{data_entrega}")
+        return f"SUCESSO;Atividade '{titulo}' cadastrada com ID {id_ativ}."
+
+    # --- Gestão de Notas ---
+    def cadastrar_nota(self, args):
+        convertidos, valores = _scanf(args or "", "%d;%d;%9[^;];%f")
+        if convertidos != 4:
+            return "ERRO;Formato de argumentos invalido para CADASTRAR_NOTA."
+        id_aluno, id_materia, tipo_nota, valor_nota = valores
+        if id_aluno not in self._tabela(ARQUIVO_ALUNOS).ids():
+            return f"ERRO;O aluno com ID {id_aluno} nao existe."
+        if id_materia not in self._tabela(ARQUIVO_MATERIAS).ids():
+            return f"ERRO;A materia com ID {id_materia} nao existe."
+        self._tabela(ARQUIVO_NOTAS).anexar(f"{id_aluno};{id_materia};{tipo_nota};{valor_nota:.2f}")
+        return f"SUCESSO;Nota {tipo_nota} ({valor_nota:.2f}) registrada para o aluno ID {id_aluno}."
+
+    def listar_notas_aluno(self, args):
+        if not args:
+            return "ERRO;ID do aluno invalido."
+        return self._listar_filtrado(ARQUIVO_NOTAS, 0, args, "VAZIO;Nenhuma nota cadastrada.")
+
+    # --- Gestão de Diário e Mensagens ---
+    def registrar_aula(self, args):
+        convertidos, valores = _scanf(args or "", "%d;%19[^;];%199[^;];%511[^\n]")
+        if convertidos != 4:
+            return "ERRO;Formato de argumentos invalido para REGISTRAR_AULA."
+        id_turma, data, conteudo, presentes = valores
+        self._tabela(f"diario_turma_{id_turma}.csv").anexar(f"{data};{conteudo};{presentes}")
+        return f"SUCESSO;Aula registrada no diario da turma {id_turma}."
+
+    def listar_diario(self, args):
+        convertidos, valores = _scanf(args or "", "%d")
+        if convertidos != 1:
+            return "ERRO;ID de turma invalido."
+        (id_turma,) = valores
+        return self._listar(f"diario_turma_{id_turma}.csv", f"VAZIO;Nenhum diario encontrado para a turma {id_turma}.")
+
+    def postar_mensagem(self, args):
+        convertidos, valores = _scanf(args or "", "%d;%19[^;];%511[^\n]")
+        if convertidos != 3:
+            return "ERRO;Formato de argumentos invalido para POSTAR_MENSAGEM."
+        id_turma, data, mensagem = valores
+        self._tabela(ARQUIVO_MENSAGENS).anexar(f"{id_turma};{data};{mensagem}")
+        return f"SUCESSO;Mensagem postada para a turma {id_turma}."
+
+    def listar_mensagens_turma(self, args):
+        if not args:
+            return "ERRO;ID de turma invalido."
+        return self._listar_filtrado(ARQUIVO_MENSAGENS, 0, args, "VAZIO;Nenhuma mensagem no mural.")
+
+    # --- Gestão de Sistema (Log, Backup, IA) ---
+    def _gravar_log(self, data_hora, mensagem):
+        self._tabela(ARQUIVO_LOG).anexar(f"{data_hora};{mensagem}")
+        return "SUCESSO;Log registrado."
+
+    def log(self, args):
+        return self._gravar_log(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), args or "")
+
+    def log_datado(self, args):
+        """"LOG_DATADO;AAAA-MM-DD HH:MM:SS;mensagem": grava com a hora em que a ação aconteceu no cliente."""
+        if (args is None or len(args) < 20 or args[19] != ";"
+                or _scanf(args, "%4d-%2d-%2d %2d:%2d:%2d%c")[0] != 7):
+            return "ERRO;Data e hora invalidas para LOG_DATADO."
+        return self._gravar_log(args[:19], args[20:])
+
+    def listar_logs(self, args):
+        modo, cursor, limite, de, ate = "", -1, PAGINA_LOG_PADRAO, "", ""
+        if args is not None:
+            modo = (_campo(args, 0) or "")[:7]
+            campo = (_campo(args, 1) or "")[:23]
+            if campo:
+                cursor = _atol(campo)
+            campo = (_campo(args, 2) or "")[:23]
+            if _atol(campo) > 0:
+                limite = _atol(campo)
+            de = (_campo(args, 3) or "")[:10]
+            ate = (_campo(args, 4) or "")[:10]
+        limite = min(limite, LIMITE_PAGINA_LOG)
+        paginado = modo in ("ANTES", "DESDE")
+
+        tabela = self._tabela(ARQUIVO_LOG)
+        if not tabela.existe:
+            return f"DADOS;{MARCADOR_CURSOR};0;0" if paginado else "VAZIO;Nenhum log encontrado."
+        if modo == "ANTES":
+            return self._listar_logs_antes(tabela, cursor, limite, de, ate)
+        if modo == "DESDE":
+            return self._listar_logs_desde(tabela, cursor, limite)
+        return tabela.listagem()
+
+    @staticmethod
+    def _listar_logs_antes(tabela, cursor, limite, de, ate):
+        """Entradas do fim para o começo, a partir do byte 'cursor' (-1: fim do arquivo)."""
+        if cursor < 0 or cursor > tabela.tamanho:
+            cursor = tabela.tamanho
+        linhas, proximo = [], 0
+        for linha, inicio in tabela.linhas_antes(cursor):
+            if linha.endswith("\r"):
+                linha = linha[:-1]
+            # Sem parada antecipada em 'de': entradas de LOG_DATADO ficam fora de ordem no arquivo.
+            if not linha or (ate and linha[:len(ate)] > ate) or (de and linha[:len(de)] < de):
+                continue
+            linhas.append(linha)
+            if len(linhas) >= limite:
+                proximo = inicio
+                break
+        return _dados([f"{MARCADOR_CURSOR};{proximo};{tabela.tamanho}"] + linhas)
+
+    @staticmethod
+    def _listar_logs_desde(tabela, cursor, limite):
+        """Entradas gravadas a partir do byte 'cursor', em ordem (modo de acompanhamento)."""
+        if cursor < 0 or cursor > tabela.tamanho:
+            cursor = 0  # O log foi limpo: recomeça do início
+        linhas, proximo = [], cursor
+        for linha, depois in tabela.linhas_desde(cursor):
+            if len(linhas) >= limite:
+                break
+            proximo = depois
+            linha = _sem_retorno(linha)
+            if linha:
+                linhas.append(linha)
+        return _dados([f"{MARCADOR_CURSOR};{cursor};{proximo}"] + linhas)
+
+    def backup(self, args):
+        """Copia o conteúdo atual das tabelas (já com as alterações pendentes) para a pasta de backup."""
+        print("\nIniciando backup...")
+        pasta = os.path.join(self.pasta, PASTA_BACKUP)
+        os.makedirs(pasta, exist_ok=True)
+        carimbo = datetime.now().strftime("%Y%m%d_%H%M%S")
+        for arquivo in ARQUIVOS:
+            tabela = self._tabela(arquivo)
+            if not tabela.existe:
+                continue
+            nome_backup = os.path.join(pasta, f"{arquivo}_{carimbo}.bak")
+            try:
+                with open(nome_backup, "wb") as f:
+                    f.writelines(_codificar(linha) + b"\n" for linha in tabela.linhas)
+                print(f"Backup de '{arquivo}' criado em '{nome_backup}'")
+            except OSError:
+                pass
+        print("\nBackup concluido!")
+        return "SUCESSO;Backup realizado no servidor."
+
+    def _limpar(self, arquivo):
+        self._tabela(arquivo).substituir([])
+        return f"SUCESSO;Arquivo {arquivo} foi limpo."
+
+    def analisar_desempenho_ia(self, args):
+        """Alunos com média baixa ou notas insuficientes, com nível de risco e justificativa."""
+        tabela_alunos = self._tabela(ARQUIVO_ALUNOS)
+        if not tabela_alunos.existe:
+            return "ERRO;Arquivo de alunos nao encontrado."
+        # Sem o limite de MAX_ALUNOS do servidor em C. id -> [nome, soma, notas, notas baixas]
+        alunos = {}
+        for linha in tabela_alunos.linhas:
+            convertidos, valores = _scanf(linha, "%d;%99[^;];")
+            if convertidos and valores[0] not in alunos:
+                alunos[valores[0]] = [valores[1] if convertidos > 1 else "", 0.0, 0, 0]
+        for linha in self._tabela(ARQUIVO_NOTAS).linhas:
+            convertidos, valores = _scanf(linha, "%d;%*d;%*[^;];%f")
+            aluno = alunos.get(valores[0]) if convertidos == 2 else None
+            if aluno is not None:
+                aluno[1] = _float32(aluno[1] + valores[1])  # Soma em float, como no C
+                aluno[2] += 1
+                if valores[1] < 5.0:
+                    aluno[3] += 1
+
+        riscos = []
+        for id_aluno, (nome, soma, contagem, baixas) in alunos.items():
+            if not contagem:
+                continue
+            media = _float32(soma / contagem)
+            score = int((7.0 - media) * 10) if media < 7.0 else 0
+            score += baixas * 20
+            if score <= 0:
+                continue
+            if score >= 40:
+                nivel, justificativa = "Alto", f"Media {media:.1f} e {baixas} nota(s) insuficiente(s)."
+            elif score >= 20:
+                nivel, justificativa = "Medio", f"Media {media:.1f} ou {baixas} nota(s) insuficiente(s)."
+            else:
+                nivel, justificativa = "Baixo", f"Media {media:.1f}, porem proxima do limite."
+            riscos.append(f"{id_aluno},{nome},{nivel},{justificativa}")
+        return "IA_RESULTADO;" + ("|".join(riscos) if riscos else "NENHUM")
+
+    # --- Gestão de Frequência ---
+    def registrar_frequencia(self, args):
+        """"REGISTRAR_FREQUENCIA;id_turma;data;id_aluno1,status1|id_aluno2,status2..."."""
+        id_turma, _, resto = (args or "").lstrip(";").partition(";")
+        data, _, frequencias = resto.lstrip(";").partition(";")
+        if not id_turma or not data:
+            return "ERRO;Formato de argumentos invalido para REGISTRAR_FREQUENCIA."
+        id_turma = _atol(id_turma)
+        tabela = self._tabela(ARQUIVO_FREQUENCIA)
+        tabela.criar()
+        linhas = []
+        for item in frequencias.split("|"):
+            convertidos, valores = _scanf(item, "%d,%c")
+            if convertidos == 2:
+                linhas.append(f"{id_turma};{valores[0]};{data};{valores[1]}")
+        if linhas:
+            tabela.anexar("\n".join(linhas))
+        return f"SUCESSO;Frequencia para a turma {id_turma} na data {data} registrada."
+
+    def registrar_frequencia_parte(self, args):
+        """Grava uma parte de uma chamada de uma vez; uma parte reenviada não é gravada de novo."""
+        convertidos, valores = _scanf(args or "", "%63[^;];%d;%19[^;];%d;%d;%n")
+        if convertidos != 5 or len(valores) != 6 or valores[5] == 0 or not 1 <= valores[3] <= valores[4]:
+            return "ERRO;Formato de argumentos invalido para REGISTRAR_FREQUENCIA_PARTE."
+        chave, id_turma, data, parte, total, inicio_itens = valores
+
+        # Valida a parte inteira antes de gravar qualquer linha.
+        linhas = []
+        for item in args[inicio_itens:].split("|"):
+            if not item:
+                continue
+            convertidos, valores = _scanf(item, "%d,%c")
+            if convertidos != 2 or valores[1] not in ("P", "F"):
+                return f"ERRO;Item '{item[:40]}' invalido na parte {parte}/{total}."
+            linhas.append(f"{id_turma};{valores[0]};{data};{valores[1]}")
+
+        if (chave, parte) in self._partes_gravadas:
+            return f"SUCESSO;Parte {parte}/{total} ja registrada."
+        if linhas:
+            self._tabela(ARQUIVO_FREQUENCIA).anexar("\n".join(linhas))
+        self._partes_gravadas[chave, parte] = True
+        if len(self._partes_gravadas) > MAX_PARTES_LEMBRADAS:
+            self._partes_gravadas.popitem(last=False)
+        return f"SUCESSO;Parte {parte}/{total} registrada ({len(linhas)} aluno(s))."
+
+    def listar_frequencia(self, args):
+        """"LISTAR_FREQUENCIA;TODOS" lista tudo; "LISTAR_FREQUENCIA;DESDE;n" pula as n primeiras linhas."""
+        desde = max(_atol(args[6:]), 0) if args is not None and args.startswith("DESDE;") else 0
+        tabela = self._tabela(ARQUIVO_FREQUENCIA)
+        if not tabela.existe:
+            return "VAZIO;Nenhuma frequencia registrada."
+        linhas = [linha for linha in map(_sem_retorno, tabela.linhas) if linha]
+        if len(linhas) <= desde:
+            return "VAZIO;Nenhuma frequencia nova." if desde > 0 else "VAZIO;Nenhuma frequencia registrada."
+        return _dados(linhas[desde:])
+
+    # --- Módulo Financeiro ---
+    def gerar_mensalidades(self, args):
+        convertidos, valores = _scanf(args or "", "%f")
+        if convertidos != 1:
+            return "ERRO;Valor da mensalidade invalido."
+        (valor,) = valores
+        alunos, financeiro = self._tabela(ARQUIVO_ALUNOS), self._tabela(ARQUIVO_FINANCEIRO)
+        financeiro.criar()
+        if not alunos.existe:
+            return "ERRO;Falha ao abrir arquivos de alunos ou financeiro."
+        hoje = datetime.now()
+        linhas = []
+        for linha in alunos.linhas:
+            convertidos, valores = _scanf(linha, "%d;")
+            if convertidos:
+                linhas.append(f"{valores[0]};{hoje.year};{hoje.month};{valor:.2f};Pendente")
+        if linhas:
+            financeiro.anexar("\n".join(linhas))
+        return f"SUCESSO;Mensalidades de {hoje.month}/{hoje.year} geradas para {len(linhas)} aluno(s)."
+
+    def listar_financeiro(self, args):
+        tabela = self._tabela(ARQUIVO_FINANCEIRO)
+        if not tabela.existe:
+            return "VAZIO;Nenhum registro financeiro."
+        if args == "TODOS":
+            return tabela.listagem()
+        id_filtro = _atol(args or "")
+        if id_filtro == -1:
+            return tabela.listagem()
+        return _dados(linha for linha in tabela.linhas if _scanf(linha, "%d;")[1][:1] == [id_filtro])
+
+    def pagar_mensalidade(self, args):
+        convertidos, valores = _scanf(args or "", "%d;%d;%d")
+        if convertidos != 3:
+            return "ERRO;Argumentos invalidos para pagar mensalidade."
+        tabela = self._tabela(ARQUIVO_FINANCEIRO)
+        if not tabela.existe:
+            return "ERRO;Falha ao abrir arquivos temporarios."
+        id_aluno, ano, mes = valores
+        linhas, encontrado = [], False
+        for linha in tabela.linhas:
+            convertidos, campos = _scanf(linha, "%d;%d;%d;%f;%s")
+            if convertidos >= 3 and campos[:3] == [id_aluno, ano, mes]:
+                valor = campos[3] if convertidos > 3 else 0.0
+                linha = f"{id_aluno};{ano};{mes};{valor:.2f};Pago"
+                encontrado = True
+            linhas.append(linha)
+        if not encontrado:
+            return "ERRO;Registro financeiro nao encontrado."
+        tabela.substituir(linhas)
+        return f"SUCESSO;Mensalidade de {mes}/{ano} para o aluno {id_aluno} marcada como paga."
+
+    # --- Réplica Local dos Clientes ---
+    def _registrar_alteracao(self, nome_tabela, reescreve):
+        tabela = self._tabela(TABELAS_REPLICADAS[nome_tabela])
+        self.sequencia += 1
+        tabela.alteracao = self.sequencia
+        if reescreve:
+            tabela.reescrita = self.sequencia
+        aviso, self._aviso = self._aviso, asyncio.Event()
+        aviso.set()
+
+    def ler_tabela(self, args):
+        """"LER_TABELA;tabela;epoca;sequencia;cursor": as linhas gravadas a partir do byte 'cursor'."""
+        convertidos, valores = _scanf(args or "", "%31[^;];%ld;%ld;%ld")
+        if convertidos != 4:
+            return "ERRO;Formato de argumentos invalido para LER_TABELA."
+        nome, epoca, sequencia, cursor = valores
+        if nome not in TABELAS_REPLICADAS:
+            return f"ERRO;Tabela '{nome}' desconhecida para LER_TABELA."
+        tabela = self._tabela(TABELAS_REPLICADAS[nome])
+        inicio = cursor
+        if epoca != self.epoca or sequencia < tabela.reescrita or sequencia > self.sequencia or cursor < 0:
+            inicio = 0
+        fim = 0
+        linhas = []
+        if tabela.existe:
+            if inicio > tabela.tamanho:
+                inicio = 0  # Arquivo menor que o cursor
+            linhas = [linha for linha in map(_sem_retorno, (linha for linha, _ in tabela.linhas_desde(inicio))) if linha]
+            fim = tabela.tamanho
+        else:
+            inicio = 0
+        return "|".join([f"DADOS;{MARCADOR_CURSOR};{inicio};{fim};{self.epoca};{tabela.alteracao}"] + linhas)
+
+    # --- Avisos de Alteração ---
+    @staticmethod
+    def _ler_espera(args):
+        convertidos, valores = _scanf(args or "", "%ld;%ld;%ld")
+        if convertidos < 2:
+            return None
+        espera = valores[2] if convertidos > 2 else ESPERA_ALTERACOES_PADRAO
+        return valores[0], valores[1], min(max(espera, 0), LIMITE_ESPERA_ALTERACOES)
+
+    def alteracoes_desde(self, args):
+        """AGUARDAR_ALTERACOES sem esperar (ver aguardar_alteracoes)."""
+        espera = self._ler_espera(args)
+        if espera is None:
+            return f"ERRO;Formato de argumentos invalido para {COMANDO_AGUARDAR_ALTERACOES}."
+        epoca, sequencia, _ = espera
+        registros = [f"DADOS;{MARCADOR_CURSOR};{self.epoca};{self.sequencia}"]
+        for nome, arquivo in TABELAS_REPLICADAS.items():
+            tabela = self._tabela(arquivo)
+            if epoca != self.epoca or tabela.alteracao > sequencia:
+                registros.append(f"{nome};{tabela.alteracao}")
+        return "|".join(registros)
+
+    async def aguardar_alteracoes(self, args):
+        """"AGUARDAR_ALTERACOES;epoca;sequencia;espera_ms": responde quando houver escrita depois de 'sequencia'.
+
+        Só a conexão que pediu fica esperando; os outros clientes seguem
+        sendo atendidos.
+        """
+        espera = self._ler_espera(args)
+        if espera is not None and espera[0] == self.epoca:
+            limite = time.monotonic() + espera[2] / 1000
+            while self.sequencia <= espera[1]:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._aviso.wait(), restante)
+                except asyncio.TimeoutError:
+                    break
+        return self.alteracoes_desde(args)
+
+    # --- Gravação nos Arquivos ---
+    def _retirar_pendentes(self):
+        pendentes = []
+        for tabela in self._tabelas.values():
+            gravacao = tabela.retirar_pendente()
+            if gravacao is not None:
+                pendentes.append((tabela, *gravacao))
+        return pendentes
+
+    @staticmethod
+    def _gravar(pendentes, trava):
+        """Grava as alterações retiradas das tabelas; retorna as que falharam. Libera a trava ao terminar."""
+        falhas = []
+        try:
+            for tabela, modo, dados in pendentes:
+                try:
+                    _gravar_arquivo(tabela.caminho, modo, dados)
+                except OSError as e:
+                    print(f"Falha ao gravar '{tabela.caminho}': {e}")
+                    falhas.append((tabela, modo, dados))
+        finally:
+            trava.release()
+        return falhas
+
+    async def _gravar_em_segundo_plano(self):
+        self._gravando.acquire()  # Só esta tarefa grava enquanto o laço roda: não bloqueia
+        falhas = await asyncio.to_thread(self._gravar, self._retirar_pendentes(), self._gravando)
+        for tabela, modo, dados in reversed(falhas):
+            tabela.devolver(modo, dados)
+
+    def gravar_pendentes(self):
+        """Grava agora, nesta thread, tudo o que está pendente (ao encerrar)."""
+        self._gravando.acquire()  # Espera uma gravação em segundo plano que ainda esteja em curso
+        self._gravar(self._retirar_pendentes(), self._gravando)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor ConectaPro em Python (mesmo protocolo do en.c).")
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--pasta", default=".", help="Pasta com os arquivos CSV (padrão: a atual).")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_GRAVACAO,
+                        help="Segundos entre as gravações das alterações nos CSVs.")
+    opcoes = parser.parse_args()
+    servidor = Servidor(opcoes.pasta, opcoes.intervalo)
+    try:
+        asyncio.run(servidor.executar(porta=opcoes.porta))
+    except KeyboardInterrupt:
+        servidor.gravar_pendentes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Tabelas da interface: atualização por diferenças e tabela virtual para listas grandes."""
+import tkinter as tk
+from tkinter import ttk
+
+ALTURA_LINHA_PADRAO = 20
+
+
+def _chave_ordenacao(valor):
+    """Números ordenam como números e vêm antes dos textos, que ignoram maiúsculas."""
+    try:
+        return (0, float(valor), "")
+    except (TypeError, ValueError):
+        return (1, 0.0, str(valor).lower())
+
+
+class TabelaChaveada:
+    """Mantém um Treeview igual a uma lista de linhas aplicando só as diferenças.
+
+    Cada linha vira um item cujo iid vem da sua chave, então seleção, foco e
+    rolagem sobrevivem às atualizações, e atualizar sem mudanças não faz
+    nenhuma chamada ao Tk. Sem 'chave', a linha inteira identifica o item.
+    """
+    def __init__(self, tree, chave=None):
+        self.tree = tree
+        self.chave = chave
+        self._exibidos = {}  # iid -> valores exibidos
+        self._ordem = []
+
+    def _identificar(self, linhas):
+        repeticoes = {}
+        for linha in linhas:
+            valores = tuple(str(v) for v in linha)
+            base = "=" + (str(self.chave(linha)) if self.chave is not None else "\x1f".join(valores))
+            n = repeticoes.get(base, 0)
+            repeticoes[base] = n + 1
+            yield (base if n == 0 else f"{base}#{n}"), valores
+
+    def atualizar(self, linhas):
+        novos = list(self._identificar(linhas))
+        presentes = {iid for iid, _ in novos}
+        removidos = [iid for iid in self._ordem if iid not in presentes]
+        if removidos:
+            self.tree.delete(*removidos)
+            for iid in removidos:
+                del self._exibidos[iid]
+
+        # Percorre a ordem antiga junto com a nova; só move o que saiu do lugar.
+        atuais = [iid for iid in self._ordem if iid in presentes]
+        movidos = set()
+        j = 0
+        for posicao, (iid, valores) in enumerate(novos):
+            while j < len(atuais) and atuais[j] in movidos:
+                j += 1
+            anteriores = self._exibidos.get(iid)
+            if anteriores is None:
+                self.tree.insert("", posicao, iid=iid, values=valores)
+            else:
+                if anteriores != valores:
+                    self.tree.item(iid, values=valores)
+                if j < len(atuais) and atuais[j] == iid:
+                    j += 1
+                else:
+                    self.tree.move(iid, "", posicao)
+                    movidos.add(iid)
+            self._exibidos[iid] = valores
+        self._ordem = [iid for iid, _ in novos]
+
+    def limpar(self):
+        self.atualizar([])
+
+
+class TabelaVirtual(ttk.Frame):
+    """Lista com colunas cujos dados ficam numa lista Python, não no Tk.
+
+    O Treeview interno tem só as linhas que cabem na tela; rolar apenas troca
+    os valores dessas linhas. Ordenar (clique no cabeçalho) e filtrar operam
+    sobre a lista de índices, então montar, rolar e destruir custam o mesmo
+    com cem ou cem mil registros. Com 'chave', recarregar os dados mantém a
+    seleção e a rolagem no mesmo registro.
+    """
+    def __init__(self, master, colunas, titulos=None, larguras=None, com_filtro=False, chave=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.colunas = tuple(colunas)
+        self.chave = chave
+        self._exibidos = {}  # iid -> valores exibidos, para não repetir chamadas ao Tk
+        self._dados = []
+        self._ordem = []  # Índices em _dados que passaram no filtro, já ordenados
+        self._inicio = 0  # Primeira posição de _ordem exibida
+        self._linhas = 1  # Quantas linhas cabem na tela
+        self._selecionado = None  # Índice em _dados
+        self._filtro = ""
+        self._coluna_ordenacao = None
+        self._ordem_decrescente = False
+        self._altura_cabecalho = None
+
+        if com_filtro:
+            barra = ttk.Frame(self)
+            barra.pack(fill="x", pady=(0, 5))
+            ttk.Label(barra, text="Filtrar:").pack(side="left")
+            self.var_filtro = tk.StringVar()
+            self.var_filtro.trace_add("write", lambda *_: self.filtrar(self.var_filtro.get()))
+            ttk.Entry(barra, textvariable=self.var_filtro).pack(side="left", fill="x", expand=True, padx=5)
+            self.rotulo_total = ttk.Label(barra, text="")
+            self.rotulo_total.pack(side="left")
+        else:
+            self.rotulo_total = None
+
+        self.tree = ttk.Treeview(self, columns=self.colunas, show="headings", selectmode="browse")
+        self.barra_rolagem = ttk.Scrollbar(self, orient="vertical", command=self._rolar)
+        self.barra_rolagem.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        titulos = titulos or self.colunas
+        for coluna, titulo in zip(self.colunas, titulos):
+            self.tree.heading(coluna, text=titulo, command=lambda c=coluna: self.ordenar_por(c))
+        for coluna, largura in (larguras or {}).items():
+            self.tree.column(coluna, width=largura)
+
+        self.tree.bind("<Configure>", self._ao_redimensionar)
+        self.tree.bind("<<TreeviewSelect>>", self._ao_selecionar)
+        self.tree.bind("<MouseWheel>", lambda e: self._rolar("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self._rolar("scroll", -1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self._rolar("scroll", 1, "units"))
+        self.tree.bind("<Up>", lambda e: self._mover_selecao(-1))
+        self.tree.bind("<Down>", lambda e: self._mover_selecao(1))
+        self.tree.bind("<Prior>", lambda e: self._mover_selecao(-self._linhas))
+        self.tree.bind("<Next>", lambda e: self._mover_selecao(self._linhas))
+        self.tree.bind("<Home>", lambda e: self._mover_selecao(-len(self._ordem)))
+        self.tree.bind("<End>", lambda e: self._mover_selecao(len(self._ordem)))
+
+    # --- Dados ---
+    def definir_dados(self, registros):
+        """Substitui todo o conteúdo. 'registros' é qualquer iterável de sequências."""
+        anteriores, selecionado = self._dados, self._selecionado
+        topo = self._ordem[self._inicio] if self._inicio < len(self._ordem) else None
+        self._dados = registros if isinstance(registros, list) else list(registros)
+        self._selecionado = None
+
+        if self.chave is not None and (selecionado is not None or topo is not None):
+            posicoes = {self.chave(r): i for i, r in enumerate(self._dados)}
+            if selecionado is not None:
+                self._selecionado = posicoes.get(self.chave(anteriores[selecionado]))
+            if topo is not None:
+                topo = posicoes.get(self.chave(anteriores[topo]))
+        else:
+            topo = None
+        self._reordenar(topo)
+
+    def limpar(self):
+        self.definir_dados([])
+
+    def filtrar(self, texto):
+        """Mantém só os registros em que algum campo contém o texto (sem diferenciar maiúsculas)."""
+        self._filtro = texto.strip().lower()
+        self._reordenar()
+
+    def ordenar_por(self, coluna, decrescente=None):
+        """Ordena pela coluna; sem 'decrescente', clicar de novo na mesma coluna inverte a ordem."""
+        if decrescente is None:
+            decrescente = coluna == self._coluna_ordenacao and not self._ordem_decrescente
+        self._coluna_ordenacao = coluna
+        self._ordem_decrescente = decrescente
+        for c in self.colunas:
+            titulo = self.tree.heading(c, "text").rstrip(" ▲▼")
+            if c == coluna:
+                titulo += " ▼" if decrescente else " ▲"
+            self.tree.heading(c, text=titulo)
+        self._reordenar()
+
+    def selecionado(self):
+        """Registro selecionado (como foi passado em definir_dados), ou None."""
+        return self._dados[self._selecionado] if self._selecionado is not None else None
+
+    def __len__(self):
+        return len(self._ordem)
+
+    def _reordenar(self, topo=None):
+        indices = range(len(self._dados))
+        if self._filtro:
+            filtro = self._filtro
+            indices = [i for i in indices if any(filtro in str(campo).lower() for campo in self._dados[i])]
+        indices = list(indices)
+        if self._coluna_ordenacao is not None:
+            posicao = self.colunas.index(self._coluna_ordenacao)
+            dados = self._dados
+            indices.sort(key=lambda i: _chave_ordenacao(dados[i][posicao] if posicao < len(dados[i]) else ""),
+                         reverse=self._ordem_decrescente)
+        self._ordem = indices
+        if self._selecionado is not None and self._filtro and self._selecionado not in set(indices):
+            self._selecionado = None  # Não deixa agir sobre um registro que sumiu da tela
+        if self.rotulo_total is not None:
+            self.rotulo_total.config(text=f"{len(indices)} de {len(self._dados)}")
+        self._inicio = 0
+        if topo is not None:
+            try:
+                self._inicio = indices.index(topo)
+            except ValueError:
+                pass
+        self._redesenhar()
+
+    # --- Janela visível ---
+    def _redesenhar(self):
+        self._inicio = max(0, min(self._inicio, len(self._ordem) - self._linhas))
+        janela = self._ordem[self._inicio:self._inicio + self._linhas]
+
+        existentes = self.tree.get_children()
+        for iid in existentes[len(janela):]:
+            self.tree.delete(iid)
+            del self._exibidos[iid]
+        for posicao, indice in enumerate(janela):
+            iid = str(posicao)
+            valores = tuple(self._dados[indice])
+            if posicao >= len(existentes):
+                self.tree.insert("", "end", iid=iid, values=valores)
+            elif self._exibidos[iid] != valores:
+                self.tree.item(iid, values=valores)
+            self._exibidos[iid] = valores
+
+        if self._selecionado in janela:
+            iid = str(janela.index(self._selecionado))
+            self.tree.selection_set(iid)
+            self.tree.focus(iid)
+        elif self.tree.selection():
+            self.tree.selection_set(())
+
+        total = len(self._ordem)
+        if total > self._linhas:
+            self.barra_rolagem.set(self._inicio / total, (self._inicio + len(janela)) / total)
+        else:
+            self.barra_rolagem.set(0.0, 1.0)
+
+    def _rolar(self, acao, quantidade, unidade=None):
+        if acao == "moveto":
+            self._inicio = int(float(quantidade) * len(self._ordem))
+        elif acao == "scroll":
+            passo = self._linhas if unidade == "pages" else 1
+            self._inicio += int(quantidade) * passo
+        self._redesenhar()
+        return "break"
+
+    def _mover_selecao(self, deslocamento):
+        if not self._ordem:
+            return "break"
+        atual = self._ordem.index(self._selecionado) if self._selecionado in self._ordem else self._inicio - 1
+        posicao = max(0, min(len(self._ordem) - 1, atual + deslocamento))
+        self._selecionado = self._ordem[posicao]
+        if posicao < self._inicio:
+            self._inicio = posicao
+        elif posicao >= self._inicio + self._linhas:
+            self._inicio = posicao - self._linhas + 1
+        self._redesenhar()
+        return "break"
+
+    def _ao_selecionar(self, event):
+        selecao = self.tree.selection()
+        if selecao:
+            posicao = self._inicio + int(selecao[0])
+            if posicao < len(self._ordem):
+                self._selecionado = self._ordem[posicao]
+
+    def _ao_redimensionar(self, event):
+        linhas = max(1, (event.height - self._cabecalho()) // self._altura_linha())
+        if linhas != self._linhas:
+            self._linhas = linhas
+            self._redesenhar()
+
+    def _altura_linha(self):
+        altura = ttk.Style(self).lookup("Treeview", "rowheight")
+        try:
+            return int(altura) or ALTURA_LINHA_PADRAO
+        except (TypeError, ValueError):
+            return ALTURA_LINHA_PADRAO
+
+    def _cabecalho(self):
+        if self._altura_cabecalho is None:
+            filhos = self.tree.get_children()
+            caixa = self.tree.bbox(filhos[0]) if filhos else None
+            if not caixa:
+                return ALTURA_LINHA_PADRAO  # Estimativa até a primeira linha ser desenhada
+            self._altura_cabecalho = caixa[1]
+        return self._altura_cabecalho
@@ -0,0 +1,130 @@
+"""Execução de requisições fora da thread do Tk, com entrega dos resultados via after()."""
+import queue
+import sys
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+INTERVALO_ENTREGA_MS = 20
+INTERVALO_AVISOS_MS = 200  # Sem tarefas pendentes, só avisos: a fila é olhada com menos frequência
+
+
+class ExecutorTk:
+    """Roda funções bloqueantes em threads de apoio e entrega os resultados na thread do Tk.
+
+    Requisições com a mesma chave se substituem: ao submeter uma nova, a anterior
+    é cancelada ou, se já estiver em andamento, tem o resultado descartado.
+    """
+    def __init__(self, raiz, max_workers=4):
+        self.raiz = raiz
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="conectapro")
+        self._concluidos = queue.SimpleQueue()
+        self._avisos = queue.SimpleQueue()  # (geracao, funcao, args) vindos das threads de apoio
+        self._por_chave = {}
+        self._pendentes = 0
+        self._geracao = 0
+        self._ouvintes = 0
+        self._agendado = None
+        self._intervalo_agendado = None
+
+    def submeter(self, funcao, *args, ao_concluir=None, ao_falhar=None, chave=None):
+        """Agenda funcao(*args) numa thread de apoio. Deve ser chamado na thread do Tk."""
+        if chave is not None:
+            anterior = self._por_chave.get(chave)
+            if anterior is not None:
+                anterior.cancel()
+
+        futuro = self._executor.submit(funcao, *args)
+        if chave is not None:
+            self._por_chave[chave] = futuro
+        entrega = (chave, self._geracao, ao_concluir, ao_falhar)
+        futuro.add_done_callback(lambda f: self._concluidos.put((f,) + entrega))
+        self._pendentes += 1
+        self._agendar()
+        return futuro
+
+    def notificar(self, funcao, *args):
+        """Agenda funcao(*args) na thread do Tk; pode ser chamado de qualquer thread.
+
+        Serve para tarefas em andamento informarem progresso. Os avisos são
+        entregues junto com os resultados, então só chegam enquanto houver
+        alguma tarefa pendente ou alguém ouvindo (ver ouvir), e são
+        descartados por cancelar_todos.
+        """
+        self._avisos.put((self._geracao, funcao, args))
+
+    def ouvir(self):
+        """Mantém a entrega de avisos ativa mesmo sem tarefas pendentes, até deixar_de_ouvir."""
+        self._ouvintes += 1
+        self._agendar(INTERVALO_AVISOS_MS)
+
+    def deixar_de_ouvir(self):
+        self._ouvintes = max(self._ouvintes - 1, 0)
+
+    def cancelar_todos(self):
+        """Descarta tudo o que estiver pendente (ex.: ao trocar de tela)."""
+        self._geracao += 1
+        for futuro in self._por_chave.values():
+            futuro.cancel()
+        self._por_chave.clear()
+
+    def encerrar(self):
+        self.cancelar_todos()
+        if self._agendado is not None:
+            try:
+                self.raiz.after_cancel(self._agendado)
+            except tk.TclError:
+                pass  # A janela já foi destruída
+            self._agendado = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _agendar(self, intervalo=INTERVALO_ENTREGA_MS):
+        if self._agendado is not None:
+            if self._intervalo_agendado <= intervalo:
+                return
+            self.raiz.after_cancel(self._agendado)  # Uma tarefa nova não espera o intervalo dos avisos
+        self._agendado = self.raiz.after(intervalo, self._entregar)
+        self._intervalo_agendado = intervalo
+
+    def _entregar(self):
+        self._agendado = None
+        while True:
+            try:
+                geracao, funcao, args = self._avisos.get_nowait()
+            except queue.Empty:
+                break
+            if geracao == self._geracao:
+                try:
+                    funcao(*args)
+                except Exception:
+                    self.raiz.report_callback_exception(*sys.exc_info())
+
+        while True:
+            try:
+                futuro, chave, geracao, ao_concluir, ao_falhar = self._concluidos.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes -= 1
+
+            if chave is not None:
+                if self._por_chave.get(chave) is not futuro:
+                    continue  # Substituída por uma requisição mais nova
+                del self._por_chave[chave]
+            if futuro.cancelled() or geracao != self._geracao:
+                continue
+
+            try:
+                erro = futuro.exception()
+                if erro is None:
+                    if ao_concluir is not None:
+                        ao_concluir(futuro.result())
+                elif ao_falhar is not None:
+                    ao_falhar(erro)
+                else:
+                    raise erro
+            except Exception:
+                self.raiz.report_callback_exception(*sys.exc_info())
+
+        if self._pendentes:
+            self._agendar()
+        elif self._ouvintes:
+            self._agendar(INTERVALO_AVISOS_MS)
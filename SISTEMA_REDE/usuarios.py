@@ -0,0 +1,196 @@
+"""Armazenamento local de usuários: índice em memória e diário de alterações."""
+import os
+import threading
+from collections import Counter
+
+from arquivos import TravaArquivo, escrever_atomicamente
+
+LIMITE_DIARIO = 200  # Alterações acumuladas no diário antes de compactar
+
+# --- Formato do diário (uma alteração por linha) ---
+#   R;usuario;senha;perfil;status   cria ou substitui o usuário
+#   X;usuario                       exclui o usuário
+OP_REGISTRAR = "R"
+OP_EXCLUIR = "X"
+
+
+def versao_registro(registro):
+    """Versão de um usuário para checagem otimista: o próprio conteúdo da linha."""
+    return ';'.join(registro) if registro is not None else None
+
+
+class RepositorioUsuarios:
+    """Usuários do arquivo CSV indexados por nome, compartilháveis entre estações.
+
+    Consultas são O(1) no índice. Alterações não reescrevem o CSV: são
+    acrescentadas ao diário e aplicadas no índice. Quando o diário cresce,
+    o CSV é regravado de forma atômica a partir do índice e o diário é
+    zerado. Reaplicar o diário é idempotente, então uma queda entre essas
+    duas etapas não perde nem duplica nada.
+
+    Toda alteração acontece sob uma trava de arquivo. Antes de usar o índice,
+    o repositório lê só o trecho do diário gravado por outros processos desde
+    a última leitura; o CSV só é relido quando outro processo o compactou.
+    """
+    def __init__(self, arquivo, limite_diario=LIMITE_DIARIO):
+        self.arquivo = arquivo
+        self.arquivo_diario = arquivo + ".diario"
+        self.limite_diario = limite_diario
+        self._trava = TravaArquivo(arquivo)
+        self._lock = threading.RLock()
+        self._indice = None  # usuario -> [usuario, senha, perfil, status]
+        self._assinatura = None  # Identifica a versão do CSV carregada no índice
+        self._posicao_diario = 0  # Bytes do diário já aplicados
+        self._alteracoes_no_diario = 0
+
+    def _assinatura_arquivo(self):
+        try:
+            st = os.stat(self.arquivo)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _carregar_base(self):
+        indice = {}
+        assinatura = self._assinatura_arquivo()
+        if assinatura is not None:
+            with open(self.arquivo, "r", encoding="utf-8") as f:
+                for linha in f:
+                    partes = linha.strip().split(';')
+                    if not partes[0]:
+                        continue
+                    while len(partes) < 4:
+                        partes.append('ativo')
+                    indice[partes[0]] = partes[:4]
+        self._indice = indice
+        self._assinatura = assinatura
+        self._posicao_diario = 0
+        self._alteracoes_no_diario = 0
+
+    def _sincronizar(self, travado=False):
+        """Atualiza o índice com o que outras estações gravaram desde a última leitura.
+
+        Com a trava obtida, uma linha incompleta no fim do diário só pode ser
+        resto de uma gravação interrompida e é descartada; sem a trava ela pode
+        estar sendo escrita agora e apenas fica para a próxima leitura.
+        """
+        if self._indice is None or self._assinatura_arquivo() != self._assinatura:
+            self._carregar_base()
+
+        try:
+            tamanho = os.path.getsize(self.arquivo_diario)
+        except FileNotFoundError:
+            tamanho = 0
+        if tamanho < self._posicao_diario:
+            # O diário foi zerado por uma compactação que cruzou com o stat acima.
+            self._carregar_base()
+        if tamanho == self._posicao_diario:
+            return
+
+        with open(self.arquivo_diario, "rb+" if travado else "rb") as f:
+            f.seek(self._posicao_diario)
+            conteudo = f.read()
+            completo = conteudo[:conteudo.rfind(b"\n") + 1]
+            if travado and len(completo) < len(conteudo):
+                f.truncate(self._posicao_diario + len(completo))
+        if not travado and self._assinatura_arquivo() != self._assinatura:
+            return self._sincronizar()  # Outra estação compactou durante a leitura
+        for linha in completo.decode("utf-8").splitlines():
+            if _aplicar(self._indice, linha):
+                self._alteracoes_no_diario += 1
+        self._posicao_diario += len(completo)
+
+    def _registrar_alteracao(self, linha):
+        """Acrescenta uma alteração ao diário. Deve ser chamado com a trava obtida."""
+        with open(self.arquivo_diario, "ab") as f:
+            f.write((linha + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            self._posicao_diario = f.tell()
+        _aplicar(self._indice, linha)
+        self._alteracoes_no_diario += 1
+        if self._alteracoes_no_diario >= self.limite_diario:
+            self._compactar()
+
+    def _compactar(self):
+        escrever_atomicamente(self.arquivo, "".join(f"{';'.join(u)}\n" for u in self._indice.values()))
+        with open(self.arquivo_diario, "w", encoding="utf-8"):
+            pass
+        self._assinatura = self._assinatura_arquivo()
+        self._posicao_diario = 0
+        self._alteracoes_no_diario = 0
+
+    def compactar(self):
+        """Regrava o CSV a partir do índice e descarta o diário."""
+        with self._lock, self._trava:
+            self._sincronizar(travado=True)
+            self._compactar()
+
+    # --- Consultas ---
+    def autenticar(self, usuario, senha):
+        with self._lock:
+            self._sincronizar()
+            registro = self._indice.get(usuario)
+        if registro is None or registro[1] != senha:
+            return None, None
+        return registro[2], registro[3]
+
+    def obter(self, usuario):
+        with self._lock:
+            self._sincronizar()
+            registro = self._indice.get(usuario)
+            return list(registro) if registro is not None else None
+
+    def listar(self):
+        with self._lock:
+            self._sincronizar()
+            return [list(u) for u in self._indice.values()]
+
+    def contar_por_perfil(self):
+        """{perfil: quantidade de usuários}, direto do índice, sem copiar os registros."""
+        with self._lock:
+            self._sincronizar()
+            return dict(Counter(registro[2] for registro in self._indice.values()))
+
+    # --- Alterações ---
+    # 'versao' é o valor de versao_registro() visto pela tela. Se o usuário foi
+    # alterado ou removido por outra estação desde então, nada é gravado e o
+    # método retorna False.
+    def registrar(self, usuario, senha, perfil, status="ativo"):
+        with self._lock, self._trava:
+            self._sincronizar(travado=True)
+            if usuario in self._indice:
+                return False, "Usuário já existe."
+            self._registrar_alteracao(';'.join((OP_REGISTRAR, usuario, senha, perfil, status)))
+        return True, "Usuário registrado com sucesso."
+
+    def excluir(self, usuario, versao=None):
+        with self._lock, self._trava:
+            self._sincronizar(travado=True)
+            registro = self._indice.get(usuario)
+            if versao is not None and versao_registro(registro) != versao:
+                return False
+            if registro is not None:
+                self._registrar_alteracao(f"{OP_EXCLUIR};{usuario}")
+        return True
+
+    def autorizar(self, usuario, versao=None):
+        with self._lock, self._trava:
+            self._sincronizar(travado=True)
+            registro = self._indice.get(usuario)
+            if versao is not None and versao_registro(registro) != versao:
+                return False
+            if registro is not None and registro[3] != "ativo":
+                self._registrar_alteracao(';'.join((OP_REGISTRAR, registro[0], registro[1], registro[2], "ativo")))
+        return True
+
+
+def _aplicar(indice, linha):
+    partes = linha.rstrip("\n").split(';')
+    if partes[0] == OP_REGISTRAR and len(partes) >= 5:
+        indice[partes[1]] = partes[1:5]
+        return True
+    if partes[0] == OP_EXCLUIR and len(partes) >= 2:
+        indice.pop(partes[1], None)
+        return True
+    return False